@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 
 import environ
@@ -55,6 +56,18 @@ def relativedelta_months(value: int) -> relativedelta:
     AUDIT_LOG_ES_USERNAME=(str, None),
     AUDIT_LOG_ES_PASSWORD=(str, None),
     AUDIT_LOG_ES_INDEX=(str, None),
+    AUDIT_LOG_FILE=(str, None),
+    AUDIT_LOG_SHIPPING_CONCURRENCY=(int, 4),
+    SLOW_QUERY_EXPLAIN_THRESHOLD_MS=(int, 0),
+    SLOW_QUERY_EXPLAIN_MAX_PER_MINUTE=(int, 10),
+    REQUEST_PROFILING_ENABLED=(bool, False),
+    REQUEST_PROFILING_DIR=(str, None),
+    PDF_RENDERER_MAX_CONCURRENT=(int, 4),
+    PDF_RENDERER_MAX_BATCH_CONCURRENT=(int, 2),
+    PDF_RENDERER_RENDER_TIMEOUT=(float, 60.0),
+    PDF_RENDERER_SLOT_TIMEOUT=(float, 10.0),
+    PDF_RENDERER_LOCK_DIR=(str, None),
+    EXCEL_UPLOAD_MAX_SIZE=(int, 20 * 1024 * 1024),
 )
 env.read_env(BASE_DIR / ".env")
 
@@ -135,6 +148,12 @@ def relativedelta_months(value: int) -> relativedelta:
     "auditlog.middleware.AuditlogMiddleware",
 ]
 
+# Allow staff users to profile single requests, see 'hitas.profiling.RequestProfilerMiddleware'
+REQUEST_PROFILING_ENABLED = env("REQUEST_PROFILING_ENABLED")
+REQUEST_PROFILING_DIR = env("REQUEST_PROFILING_DIR") or BASE_DIR / "profiles"
+if REQUEST_PROFILING_ENABLED:
+    MIDDLEWARE.append("hitas.profiling.RequestProfilerMiddleware")
+
 # ----- Database ---------------------------------------------------------------------------------------
 
 DATABASES = {"default": env.db("DATABASE_URL")}
@@ -143,6 +162,11 @@ def relativedelta_months(value: int) -> relativedelta:
     DATABASES["default"]["PASSWORD"] = env("DATABASE_PASSWORD")
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Run 'EXPLAIN (ANALYZE, BUFFERS)' for read queries slower than this and log the plan. Zero disables.
+SLOW_QUERY_EXPLAIN_THRESHOLD_MS: int = env("SLOW_QUERY_EXPLAIN_THRESHOLD_MS")
+# How many query plans each process is allowed to capture per minute
+SLOW_QUERY_EXPLAIN_MAX_PER_MINUTE: int = env("SLOW_QUERY_EXPLAIN_MAX_PER_MINUTE")
+
 # ----- Templates --------------------------------------------------------------------------------------
 
 TEMPLATES = [
@@ -166,6 +190,19 @@ def relativedelta_months(value: int) -> relativedelta:
     },
 ]
 
+# How many PDF documents all the processes on the host are allowed to render at a time,
+# see 'hitas.services.pdf_renderer.PDFRenderer'.
+# Keep this below the number of uWSGI processes, so that some are always free for other requests.
+PDF_RENDERER_MAX_CONCURRENT: int = env("PDF_RENDERER_MAX_CONCURRENT")
+# How many documents of a single batch (e.g. a ZIP download) are rendered at a time
+PDF_RENDERER_MAX_BATCH_CONCURRENT: int = env("PDF_RENDERER_MAX_BATCH_CONCURRENT")
+# Seconds a single document may take to render before its rendering process is killed
+PDF_RENDERER_RENDER_TIMEOUT: float = env("PDF_RENDERER_RENDER_TIMEOUT")
+# Seconds a document waits for a free slot before it is rejected
+PDF_RENDERER_SLOT_TIMEOUT: float = env("PDF_RENDERER_SLOT_TIMEOUT")
+# Directory for the lock files of the rendering slots. Must be on a local file system shared by the processes.
+PDF_RENDERER_LOCK_DIR = env("PDF_RENDERER_LOCK_DIR") or Path(tempfile.gettempdir()) / "hitas-pdf-renderer"
+
 # ----- Storages ---------------------------------------------------------------------------------------
 STORAGES = {
     "default": {
@@ -186,6 +223,9 @@ def relativedelta_months(value: int) -> relativedelta:
 MEDIA_ROOT = BASE_DIR / "mediaroot"
 MEDIA_URL = "media/"
 
+# Maximum size of uploaded Excel files (sales catalogs and external sales data) in bytes
+EXCEL_UPLOAD_MAX_SIZE: int = env("EXCEL_UPLOAD_MAX_SIZE")
+
 AZURE_ACCOUNT_NAME = env("AZURE_ACCOUNT_NAME")
 AZURE_ACCOUNT_KEY = env("AZURE_ACCOUNT_KEY")
 AZURE_CONTAINER = env("AZURE_CONTAINER")
@@ -263,17 +303,30 @@ def relativedelta_months(value: int) -> relativedelta:
         {"class": "resilient_logger.sources.DjangoAuditLogSource"},
     ],
     "targets": [
-        {
-            "class": "resilient_logger.targets.ElasticsearchLogTarget",
-            "es_url": env("AUDIT_LOG_ES_URL"),
-            "es_username": env("AUDIT_LOG_ES_USERNAME"),
-            "es_password": env("AUDIT_LOG_ES_PASSWORD"),
-            "es_index": env("AUDIT_LOG_ES_INDEX"),
-            "required": True,
-        }
+        (
+            # Local stand-in for Elasticsearch, e.g. for testing
+            {
+                "class": "hitas.services.audit_log_shipping.FileLogTarget",
+                "path": env("AUDIT_LOG_FILE"),
+                "required": True,
+            }
+            if env("AUDIT_LOG_FILE")
+            else {
+                "class": "hitas.services.audit_log_shipping.BulkElasticsearchLogTarget",
+                "es_url": env("AUDIT_LOG_ES_URL"),
+                "es_username": env("AUDIT_LOG_ES_USERNAME"),
+                "es_password": env("AUDIT_LOG_ES_PASSWORD"),
+                "es_index": env("AUDIT_LOG_ES_INDEX"),
+                "required": True,
+            }
+        )
     ],
     "batch_limit": 5000,
+    # Entries per bulk request when shipped with 'hitasshipauditlogs'
     "chunk_size": 500,
+    # Concurrent bulk requests when shipped with 'hitasshipauditlogs'
+    "concurrency": env("AUDIT_LOG_SHIPPING_CONCURRENCY"),
+    "max_retries": 5,
     "submit_unsent_entries": True,
     "clear_sent_entries": True,
 }
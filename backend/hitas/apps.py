@@ -1,4 +1,6 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 from health_check.plugins import plugin_dir
 
 from hitas.healthcheck import HitasDatabaseHealthCheck
@@ -10,3 +12,8 @@ class HitasConfig(AppConfig):
 
     def ready(self):
         plugin_dir.register(HitasDatabaseHealthCheck)
+
+        if settings.SLOW_QUERY_EXPLAIN_THRESHOLD_MS:
+            from hitas.slow_queries import install_slow_query_wrapper
+
+            connection_created.connect(install_slow_query_wrapper, dispatch_uid="hitas_slow_query_explain")
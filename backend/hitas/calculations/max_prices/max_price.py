@@ -37,6 +37,7 @@
     get_first_sale_purchase_price,
     prefetch_latest_sale,
 )
+from hitas.tracing import trace_phase
 from hitas.utils import SQSum, max_date_if_all_not_null, monthify, safe_attrgetter
 
 
@@ -56,62 +57,70 @@ def create_max_price_calculation(
     apartment_share_of_housing_company_loans_date: datetime.date,
     additional_info: Optional[str],
 ) -> Dict[str, Any]:
-    non_deleted = Q(real_estates__buildings__apartments__deleted__isnull=True)
-    housing_company = HousingCompany.objects.annotate(
-        _completion_date=max_date_if_all_not_null("real_estates__buildings__apartments__completion_date"),
-        _last_apartment_completion_date=Max("real_estates__buildings__apartments__completion_date", filter=non_deleted),
-        sum_surface_area=Sum("real_estates__buildings__apartments__surface_area", filter=non_deleted),
-    ).get(uuid=housing_company_uuid)
-
-    # For RR_NEW_HITAS housing companies (Ryhmärakentamiskohde kohde), the completion date is the date of the last
-    # completed apartment to allow for re-sale of completed apartments while some are still under construction
-    if housing_company.hitas_type == HitasType.RR_NEW_HITAS:
-        housing_company._completion_date = housing_company._last_apartment_completion_date
-        validate_rr_housing_company_for_max_price_calculation(housing_company)
-
-    if housing_company.completion_date is None:
-        raise InvalidCalculationResultException(
-            error_code="missing_housing_company_completion_date",
-            message="Cannot create max price calculation for a housing company without completion date.",
-        )
-    elif housing_company.completion_date > timezone.now().date():
-        raise InvalidCalculationResultException(
-            error_code="completion_date_in_future",
-            message="Cannot create max price calculation for a housing company with completion date in the future.",
-        )
+    with trace_phase("max_price.fetch_housing_company"):
+        non_deleted = Q(real_estates__buildings__apartments__deleted__isnull=True)
+        housing_company = HousingCompany.objects.annotate(
+            _completion_date=max_date_if_all_not_null("real_estates__buildings__apartments__completion_date"),
+            _last_apartment_completion_date=Max(
+                "real_estates__buildings__apartments__completion_date", filter=non_deleted
+            ),
+            sum_surface_area=Sum("real_estates__buildings__apartments__surface_area", filter=non_deleted),
+        ).get(uuid=housing_company_uuid)
 
-    apartment = fetch_apartment(
-        housing_company=housing_company,
-        apartment_uuid=apartment_uuid,
-        calculation_month=monthify(calculation_date),
-    )
+    with trace_phase("max_price.validate"):
+        # For RR_NEW_HITAS housing companies (Ryhmärakentamiskohde kohde), the completion date is the date of the last
+        # completed apartment to allow for re-sale of completed apartments while some are still under construction
+        if housing_company.hitas_type == HitasType.RR_NEW_HITAS:
+            housing_company._completion_date = housing_company._last_apartment_completion_date
+            validate_rr_housing_company_for_max_price_calculation(housing_company)
 
-    validate_apartment_for_max_price_calculation(apartment)
+        if housing_company.completion_date is None:
+            raise InvalidCalculationResultException(
+                error_code="missing_housing_company_completion_date",
+                message="Cannot create max price calculation for a housing company without completion date.",
+            )
+        elif housing_company.completion_date > timezone.now().date():
+            raise InvalidCalculationResultException(
+                error_code="completion_date_in_future",
+                message="Cannot create max price calculation for a housing company with completion date in the future.",
+            )
+
+    with trace_phase("max_price.fetch_apartment"):
+        apartment = fetch_apartment(
+            housing_company=housing_company,
+            apartment_uuid=apartment_uuid,
+            calculation_month=monthify(calculation_date),
+        )
+
+    with trace_phase("max_price.validate_apartment"):
+        validate_apartment_for_max_price_calculation(apartment)
 
     #
     # Do the calculation
     #
-    calculation = calculate_max_price(
-        housing_company,
-        apartment,
-        calculation_date,
-        apartment_share_of_housing_company_loans,
-        apartment_share_of_housing_company_loans_date,
-        additional_info,
-    )
+    with trace_phase("max_price.calculate", new_hitas_ruleset=housing_company.hitas_type.new_hitas_ruleset):
+        calculation = calculate_max_price(
+            housing_company,
+            apartment,
+            calculation_date,
+            apartment_share_of_housing_company_loans,
+            apartment_share_of_housing_company_loans_date,
+            additional_info,
+        )
 
     #
     # Save the calculation
     #
-    ApartmentMaximumPriceCalculation.objects.create(
-        uuid=calculation["id"],
-        apartment=apartment,
-        maximum_price=calculation["maximum_price"],
-        created_at=calculation["created_at"],
-        valid_until=calculation["valid_until"],
-        calculation_date=calculation_date,
-        json=calculation,
-    )
+    with trace_phase("max_price.persist"):
+        ApartmentMaximumPriceCalculation.objects.create(
+            uuid=calculation["id"],
+            apartment=apartment,
+            maximum_price=calculation["maximum_price"],
+            created_at=calculation["created_at"],
+            valid_until=calculation["valid_until"],
+            calculation_date=calculation_date,
+            json=calculation,
+        )
 
     # Don't save this to calculation json
     calculation["confirmed_at"] = None
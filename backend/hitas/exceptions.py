@@ -216,6 +216,32 @@ def __init__(self, missing: list[str] | dict[str, str], *, message: str):
         )
 
 
+class RequestEntityTooLarge(HitasException):
+    def __init__(self, message: str):
+        super().__init__(
+            status_code=413,
+            data={
+                "status": 413,
+                "reason": "Request Entity Too Large",
+                "message": message,
+                "error": "request_entity_too_large",
+            },
+        )
+
+
+class ServiceUnavailable(HitasException):
+    def __init__(self, message: str):
+        super().__init__(
+            status_code=503,
+            data={
+                "status": 503,
+                "reason": "Service Unavailable",
+                "message": message,
+                "error": "service_unavailable",
+            },
+        )
+
+
 def _convert_fields(field_name: str, error: dict[str, Any] | list[dict[str, Any]]) -> list[dict[str, Any]]:
     if isinstance(error, list):
         return _convert_field_errors_list(field_name, error)
@@ -0,0 +1,76 @@
+import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from hitas.services.audit_log import (
+    archive_log_entry_partitions,
+    create_log_entry_partitions,
+    find_log_entry_partitions,
+    log_entries_are_partitioned,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintain the monthly partitions of the audit log table. "
+        "Creates partitions for the upcoming months, and optionally archives partitions older than a given date. "
+        "Should be run periodically, e.g. once a month."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Create partitions until this many months from now (default: 3).",
+        )
+        parser.add_argument(
+            "--archive-before",
+            type=datetime.date.fromisoformat,
+            default=None,
+            help="Detach partitions that only contain entries from before this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--output-dir",
+            type=Path,
+            default=None,
+            help="Export archived partitions to this directory as gzipped CSV files.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop archived partitions after detaching (and exporting) them.",
+        )
+        parser.add_argument("--list", action="store_true", help="Only list the current partitions.")
+
+    def handle(self, *args, **options) -> None:
+        if not log_entries_are_partitioned():
+            raise CommandError("The audit log table is not partitioned. Run the migrations first.")
+
+        if options["list"]:
+            for partition in find_log_entry_partitions():
+                bounds = "DEFAULT" if partition.is_default else f"{partition.start} - {partition.end}"
+                self.stdout.write(f"{partition.name}: {bounds}")
+            return
+
+        if options["drop"] and options["archive_before"] is None:
+            raise CommandError("'--drop' requires '--archive-before'.")
+
+        if options["output_dir"] is not None:
+            if options["archive_before"] is None:
+                raise CommandError("'--output-dir' requires '--archive-before'.")
+            options["output_dir"].mkdir(parents=True, exist_ok=True)
+
+        created = create_log_entry_partitions(options["months_ahead"])
+        self.stdout.write(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+
+        if options["archive_before"] is not None:
+            archived = archive_log_entry_partitions(
+                before=options["archive_before"],
+                output_dir=options["output_dir"],
+                drop=options["drop"],
+            )
+            self.stdout.write(f"Archived {len(archived)} partitions: {', '.join(archived) or '-'}")
+
+        self.stdout.write(self.style.SUCCESS("Done!"))
@@ -0,0 +1,289 @@
+import datetime
+import random
+import uuid
+from decimal import Decimal
+from typing import Any, Iterable, TypeVar
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import models, transaction
+from django.utils import timezone
+
+from hitas.models import (
+    Apartment,
+    ApartmentMarketPriceImprovement,
+    ApartmentSale,
+    Building,
+    ConditionOfSale,
+    ConstructionPriceIndex,
+    ConstructionPriceIndex2005Equal100,
+    HousingCompany,
+    HousingCompanyMarketPriceImprovement,
+    MarketPriceIndex,
+    MarketPriceIndex2005Equal100,
+    MaximumPriceIndex,
+    Owner,
+    Ownership,
+    RealEstate,
+    SurfaceAreaPriceCeiling,
+)
+from hitas.models.housing_company import HitasType
+from hitas.models.utils import check_business_id, check_social_security_number
+
+TModel = TypeVar("TModel", bound=models.Model)
+
+INDEX_MODELS = [
+    MaximumPriceIndex,
+    MarketPriceIndex,
+    MarketPriceIndex2005Equal100,
+    ConstructionPriceIndex,
+    ConstructionPriceIndex2005Equal100,
+    SurfaceAreaPriceCeiling,
+]
+
+# Date when the new hitas ruleset came to effect
+NEW_HITAS_RULESET_START = datetime.date(2011, 1, 1)
+
+
+def bulk_insert(model: type[TModel], objs: list[TModel], batch_size: int) -> list[TModel]:
+    """
+    Insert the objects with a plain queryset, which bypasses the audit logging of
+    'AuditableBulkCreateMixin' so that the synthetic data doesn't flood the audit log.
+    """
+    return models.QuerySet(model=model).bulk_create(objs, batch_size=batch_size)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset for load testing and benchmarks. "
+        "Requires the development dependencies (factory-boy), since the data is built with the test factories."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--housing-companies", type=int, default=100, help="Number of housing companies (default: 100)."
+        )
+        parser.add_argument(
+            "--apartments",
+            type=int,
+            default=3_000,
+            help="Total number of apartments, divided evenly between housing companies (default: 3000).",
+        )
+        parser.add_argument(
+            "--max-sales-per-apartment",
+            type=int,
+            default=3,
+            help="Maximum number of sales per apartment, the first sale is always created (default: 3).",
+        )
+        parser.add_argument(
+            "--condition-of-sale-ratio",
+            type=float,
+            default=0.05,
+            help="Share of new apartment sales where the buyer already owns an apartment (default: 0.05).",
+        )
+        parser.add_argument(
+            "--improvement-ratio",
+            type=float,
+            default=0.1,
+            help="Share of apartments and housing companies with an improvement (default: 0.1).",
+        )
+        parser.add_argument(
+            "--index-years", type=int, default=40, help="Years of monthly indices to generate (default: 40)."
+        )
+        parser.add_argument("--batch-size", type=int, default=100, help="Housing companies per batch (default: 100).")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible datasets.")
+
+    def handle(self, *args, **options) -> None:
+        # Import factories here so that their dependencies (like factory-boy) are only required for this command
+        try:
+            import factory.random
+
+            from hitas.tests import factories
+            from hitas.tests.factories.owner import faker as owner_faker
+        except ImportError as error:
+            raise CommandError(f"Test factories not available, install development dependencies: {error}")
+
+        if options["seed"] is not None:
+            random.seed(options["seed"])
+            factory.random.reseed_random(options["seed"])
+            owner_faker.seed_instance(options["seed"])
+
+        self.factories = factories
+        self.owner_faker = owner_faker
+        self.options = options
+        self.today = timezone.now().date()
+        self.run_id = uuid.uuid4().hex[:8]
+
+        self.stdout.write("Generating indices...")
+        self.generate_indices(options["index_years"])
+
+        self.stdout.write("Generating codes, postal codes and property managers...")
+        self.postal_codes = [factories.HitasPostalCodeFactory.create() for _ in range(50)]
+        self.building_types = [factories.BuildingTypeFactory.create() for _ in range(12)]
+        self.apartment_types = [factories.ApartmentTypeFactory.create() for _ in range(8)]
+        self.developers = [factories.DeveloperFactory.create() for _ in range(20)]
+        self.property_managers = [factories.PropertyManagerFactory.create() for _ in range(50)]
+
+        total = options["housing_companies"]
+        apartments_per_company = max(1, options["apartments"] // max(1, total))
+        batch_size = options["batch_size"]
+
+        for start in range(0, total, batch_size):
+            count = min(batch_size, total - start)
+            with transaction.atomic():
+                self.generate_batch(start, count, apartments_per_company)
+            self.stdout.write(f"Housing companies: {start + count}/{total}")
+
+        self.stdout.write(self.style.SUCCESS("Dataset generated!"))
+
+    def generate_indices(self, years: int) -> None:
+        start = (self.today - relativedelta(years=years)).replace(day=1)
+        months = (years * 12) + 1
+        for model in INDEX_MODELS:
+            value = Decimal("100")
+            objs = []
+            for i in range(months):
+                # Indices grow a few percent a year, with some monthly noise
+                value = (value * Decimal(str(random.uniform(0.998, 1.006)))).quantize(Decimal("0.01"))
+                objs.append(model(month=start + relativedelta(months=i), value=value))
+            models.QuerySet(model=model).bulk_create(objs, ignore_conflicts=True)
+
+    def generate_batch(self, offset: int, count: int, apartments_per_company: int) -> None:  # NOSONAR
+        f = self.factories
+        batch_size = 1000
+
+        # Housing companies
+        housing_companies: list[HousingCompany] = []
+        for i in range(offset, offset + count):
+            hitas_type = random.choice(list(HitasType))
+            housing_companies.append(
+                f.HousingCompanyFactory.build(
+                    display_name=f"Synthetic {self.run_id} {i:06}",
+                    hitas_type=hitas_type,
+                    postal_code=random.choice(self.postal_codes),
+                    building_type=random.choice(self.building_types),
+                    developer=random.choice(self.developers),
+                    property_manager=random.choice(self.property_managers),
+                    notes="",
+                )
+            )
+        bulk_insert(HousingCompany, housing_companies, batch_size)
+
+        real_estates = [f.RealEstateFactory.build(housing_company=hc) for hc in housing_companies]
+        bulk_insert(RealEstate, real_estates, batch_size)
+
+        buildings = [
+            f.BuildingFactory.build(real_estate=real_estate)
+            for real_estate in real_estates
+            for _ in range(random.randint(1, 3))
+        ]
+        bulk_insert(Building, buildings, batch_size)
+
+        buildings_by_company: dict[int, list[Building]] = {}
+        for building in buildings:
+            buildings_by_company.setdefault(building.real_estate.housing_company_id, []).append(building)
+
+        # Apartments
+        apartments: list[Apartment] = []
+        for hc in housing_companies:
+            completion_date = self._completion_date(hc.hitas_type)
+            for n in range(apartments_per_company):
+                apartments.append(
+                    f.ApartmentFactory.build(
+                        building=random.choice(buildings_by_company[hc.id]),
+                        apartment_type=random.choice(self.apartment_types),
+                        completion_date=completion_date,
+                        apartment_number=str(n + 1),
+                        share_number_start=(n * 50) + 1,
+                        share_number_end=(n * 50) + 50,
+                        notes="",
+                    )
+                )
+        bulk_insert(Apartment, apartments, batch_size)
+
+        # Sales
+        sales: list[ApartmentSale] = []
+        first_sales: set[int] = set()
+        for apartment in apartments:
+            purchase_date = apartment.completion_date
+            for n in range(random.randint(1, self.options["max_sales_per_apartment"])):
+                if purchase_date > self.today:
+                    break
+                sale = f.ApartmentSaleFactory.build(
+                    apartment=apartment,
+                    purchase_date=purchase_date,
+                    notification_date=purchase_date,
+                )
+                sales.append(sale)
+                if n == 0:
+                    first_sales.add(id(sale))
+                purchase_date += datetime.timedelta(days=random.randint(365, 365 * 10))
+        bulk_insert(ApartmentSale, sales, batch_size)
+
+        # Owners and ownerships
+        ownerships: list[Ownership] = []
+        for sale in sales:
+            owner_count = random.choice([1, 1, 1, 2])
+            for _ in range(owner_count):
+                owner: Owner = f.OwnerFactory.build(identifier=self.owner_faker.identifier())
+                owner.valid_identifier = check_social_security_number(owner.identifier) or check_business_id(
+                    owner.identifier
+                )
+                ownerships.append(
+                    f.OwnershipFactory.build(owner=owner, sale=sale, percentage=Decimal(100) / owner_count)
+                )
+
+        # Conditions of sale: the buyer in a new apartment sale already owns an older apartment
+        new_ownerships = [ownership for ownership in ownerships if id(ownership.sale) in first_sales]
+        old_ownerships = [ownership for ownership in ownerships if id(ownership.sale) not in first_sales]
+        conditions_of_sale: list[ConditionOfSale] = []
+        if old_ownerships:
+            used_sales: set[int] = set()
+            for new_ownership in new_ownerships:
+                if random.random() >= self.options["condition_of_sale_ratio"] or id(new_ownership.sale) in used_sales:
+                    continue
+                old_ownership = random.choice(old_ownerships)
+                if old_ownership.sale.apartment is new_ownership.sale.apartment:
+                    continue
+                used_sales.add(id(new_ownership.sale))
+                new_ownership.owner = old_ownership.owner
+                conditions_of_sale.append(
+                    f.ConditionOfSaleFactory.build(new_ownership=new_ownership, old_ownership=old_ownership)
+                )
+
+        owners = list({id(ownership.owner): ownership.owner for ownership in ownerships}.values())
+        bulk_insert(Owner, owners, batch_size)
+        bulk_insert(Ownership, ownerships, batch_size)
+        bulk_insert(ConditionOfSale, conditions_of_sale, batch_size)
+
+        # Improvements
+        ratio = self.options["improvement_ratio"]
+        bulk_insert(
+            ApartmentMarketPriceImprovement,
+            [
+                f.ApartmentMarketPriceImprovementFactory.build(apartment=apartment)
+                for apartment in self._sample(apartments, ratio)
+            ],
+            batch_size,
+        )
+        bulk_insert(
+            HousingCompanyMarketPriceImprovement,
+            [
+                f.HousingCompanyMarketPriceImprovementFactory.build(housing_company=hc)
+                for hc in self._sample(housing_companies, ratio)
+            ],
+            batch_size,
+        )
+
+    def _completion_date(self, hitas_type: HitasType) -> datetime.date:
+        """Old hitas ruleset housing companies have been completed before 2011, new ones after that."""
+        earliest = (self.today - relativedelta(years=self.options["index_years"])).replace(day=1)
+        if hitas_type.old_hitas_ruleset:
+            start, end = earliest, NEW_HITAS_RULESET_START
+        else:
+            start, end = NEW_HITAS_RULESET_START, self.today
+        return start + datetime.timedelta(days=random.randint(0, max(0, (end - start).days - 1)))
+
+    @staticmethod
+    def _sample(objs: Iterable[Any], ratio: float) -> list[Any]:
+        return [obj for obj in objs if random.random() < ratio]
@@ -0,0 +1,392 @@
+import datetime
+import json
+import math
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+from urllib.parse import urlencode, urlparse
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+# Environment variable for the API token, so that it doesn't end up in the shell history
+API_AUTH_ENV = "HITAS_LOADTEST_TOKEN"
+
+# Approximate mix of what staff users do during a normal day
+DEFAULT_MIX = {
+    "apartment_search": 30,
+    "housing_company_detail": 20,
+    "apartment_detail": 20,
+    "sale_create": 5,
+    "pdf_download": 10,
+    "report_download": 15,
+}
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+@dataclass
+class EndpointResult:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class LoadTestResults:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.endpoints: dict[str, EndpointResult] = defaultdict(EndpointResult)
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, endpoint: str, duration: float, status: int) -> None:
+        with self.lock:
+            result = self.endpoints[endpoint]
+            result.latencies.append(duration)
+            result.statuses[status] += 1
+            if not 200 <= status < 300:
+                result.errors += 1
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        summary: dict[str, dict[str, Any]] = {}
+        for name, result in sorted(self.endpoints.items()):
+            latencies = sorted(result.latencies)
+            summary[name] = {
+                "requests": len(latencies),
+                "errors": result.errors,
+                "statuses": dict(sorted(result.statuses.items())),
+                "throughput": len(latencies) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+            }
+        return summary
+
+
+class HitasClient:
+    def __init__(self, base_url: str, token: str, timeout: float, results: LoadTestResults) -> None:
+        # 'urlopen' would also open e.g. 'file:' URLs
+        if urlparse(base_url).scheme not in ("http", "https"):
+            raise CommandError(f"Invalid URL {base_url!r}, only http and https URLs are allowed.")
+
+        self.base_url = base_url.rstrip("/") + "/api/v1/"
+        self.token = token
+        self.timeout = timeout
+        self.results = results
+
+    def request(
+        self,
+        endpoint: str,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        data: Optional[dict[str, Any]] = None,
+        record: bool = True,
+    ) -> Any:
+        """
+        Make a request to the API and record its latency under the given endpoint name.
+        Returns the parsed JSON response for successful JSON responses, otherwise None.
+        """
+        url = self.base_url + path
+        if params:
+            url += "?" + urlencode(params)
+
+        # The scheme of the URL is checked in '__init__'
+        request = urllib.request.Request(  # noqa: S310
+            url,
+            data=json.dumps(data).encode() if data is not None else None,
+            method=method,
+            headers={"Authorization": f"Bearer {self.token}", "Content-Type": "application/json"},
+        )
+
+        content_type = ""
+        content = b""
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:  # noqa: S310  # nosec B310
+                content = response.read()
+                status = response.status
+                content_type = response.headers.get("Content-Type", "")
+        except urllib.error.HTTPError as error:
+            error.read()
+            status = error.code
+        except (urllib.error.URLError, TimeoutError, ConnectionError):
+            # Connection failures and timeouts (e.g. harakiri) are recorded with status 0
+            status = 0
+        duration = time.perf_counter() - start
+
+        if record:
+            self.results.record(endpoint, duration, status)
+
+        if 200 <= status < 300 and content_type.startswith("application/json"):
+            return json.loads(content)
+        return None
+
+
+@dataclass
+class TestData:
+    # (housing company id, apartment id) pairs of regulated apartments
+    apartments: list[tuple[str, str]]
+    housing_companies: list[str]
+    housing_company_names: list[str]
+    postal_codes: list[str]
+    owners: list[str]
+
+
+class Scenarios:
+    """Scripted user flows, each one picks its targets randomly from the discovered test data."""
+
+    def __init__(self, client: HitasClient, data: TestData, rng: random.Random) -> None:
+        self.client = client
+        self.data = data
+        self.rng = rng
+        self.today = datetime.date.today().isoformat()
+
+    def apartment_search(self) -> None:
+        params: dict[str, Any] = {"page": 1}
+        search = self.rng.choice(["housing_company_name", "postal_code", "is_regulated", "none"])
+        if search == "housing_company_name" and self.data.housing_company_names:
+            name = self.rng.choice(self.data.housing_company_names)
+            params["housing_company_name"] = name[: self.rng.randint(3, max(3, len(name)))]
+        elif search == "postal_code" and self.data.postal_codes:
+            params["postal_code"] = self.rng.choice(self.data.postal_codes)
+        elif search == "is_regulated":
+            params["is_regulated"] = "true"
+
+        response = self.client.request("apartment_search", "GET", "apartments", params=params)
+        # Staff often browse to the next page of the results
+        if response and response["page"]["total_pages"] > 1 and self.rng.random() < 0.3:
+            params["page"] = self.rng.randint(2, response["page"]["total_pages"])
+            self.client.request("apartment_search", "GET", "apartments", params=params)
+
+    def housing_company_detail(self) -> None:
+        housing_company_id = self.rng.choice(self.data.housing_companies)
+        self.client.request("housing_company_detail", "GET", f"housing-companies/{housing_company_id}")
+        self.client.request(
+            "housing_company_apartments",
+            "GET",
+            f"housing-companies/{housing_company_id}/apartments",
+            params={"page": 1},
+        )
+
+    def apartment_detail(self) -> None:
+        housing_company_id, apartment_id = self.rng.choice(self.data.apartments)
+        path = f"housing-companies/{housing_company_id}/apartments/{apartment_id}"
+        self.client.request("apartment_detail", "GET", path)
+        self.client.request(
+            "apartment_unconfirmed_prices",
+            "GET",
+            f"{path}/retrieve-unconfirmed-prices-for-date",
+            params={"calculation_date": self.today},
+        )
+
+    def sale_create(self) -> None:
+        housing_company_id, apartment_id = self.rng.choice(self.data.apartments)
+        self.client.request(
+            "sale_create",
+            "POST",
+            f"housing-companies/{housing_company_id}/apartments/{apartment_id}/sales",
+            data={
+                "ownerships": [{"owner": {"id": self.rng.choice(self.data.owners)}, "percentage": 100.0}],
+                "notification_date": self.today,
+                "purchase_date": self.today,
+                "purchase_price": self.rng.randint(50_000, 300_000),
+                "apartment_share_of_housing_company_loans": self.rng.randint(0, 50_000),
+                "exclude_from_statistics": True,
+            },
+        )
+
+    def pdf_download(self) -> None:
+        housing_company_id, apartment_id = self.rng.choice(self.data.apartments)
+        path = f"housing-companies/{housing_company_id}/apartments/{apartment_id}"
+        self.client.request(
+            "pdf_unconfirmed_prices",
+            "POST",
+            f"{path}/reports/download-latest-unconfirmed-prices",
+            data={"request_date": self.today, "calculation_date": self.today},
+        )
+
+    def report_download(self) -> None:
+        start_date = (datetime.date.today() - datetime.timedelta(days=365)).isoformat()
+        housing_company_id = self.rng.choice(self.data.housing_companies)
+        path, params = self.rng.choice(
+            [
+                ("reports/download-sales-report", {"start_date": start_date, "end_date": self.today}),
+                ("reports/download-regulated-housing-companies-report", None),
+                ("reports/download-unregulated-housing-companies-report", None),
+                ("reports/download-property-managers-report", None),
+                ("reports/download-housing-company-states-report", None),
+                ("reports/download-multiple-ownerships-report", None),
+                (f"reports/download-ownership-by-housing-company-report/{housing_company_id}", None),
+                (f"reports/download-apartment-by-housing-company-report/{housing_company_id}", None),
+            ]
+        )
+        endpoint = "report_" + path.split("/")[1].removeprefix("download-").replace("-", "_")
+        self.client.request(endpoint, "GET", path, params=params)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run scripted load test scenarios against a running Hitas instance (e.g. the local uwsgi.ini deployment) "
+        "and report latency percentiles and throughput per endpoint. "
+        "Creates sales, so only run this against a disposable database (e.g. one created with 'hitasgenerate')."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--url", default="http://localhost:8080", help="Base URL of the instance (default: http://localhost:8080)."
+        )
+        parser.add_argument(
+            "--token",
+            default=os.environ.get(API_AUTH_ENV),
+            help=f"API token of a staff user (default: the {API_AUTH_ENV} environment variable).",
+        )
+        parser.add_argument("--users", type=int, default=8, help="Number of concurrent users (default: 8).")
+        parser.add_argument("--duration", type=int, default=60, help="Duration of the test in seconds (default: 60).")
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=0.0,
+            help="Maximum random pause in seconds between the scenarios of a single user (default: 0).",
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=300, help="Request timeout in seconds (default: 300, same as harakiri)."
+        )
+        parser.add_argument(
+            "--mix",
+            nargs="*",
+            metavar="SCENARIO=WEIGHT",
+            default=[],
+            help=(
+                "Override scenario weights, e.g. '--mix sale_create=0 pdf_download=50'. "
+                f"Scenarios: {', '.join(DEFAULT_MIX)}."
+            ),
+        )
+        parser.add_argument("--discovery-pages", type=int, default=5, help="Apartment list pages used as test data.")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible scenario order.")
+
+    def handle(self, *args, **options) -> None:
+        if not options["token"]:
+            raise CommandError(f"Give the API token of a staff user with '--token' or {API_AUTH_ENV}.")
+
+        mix = self.parse_mix(options["mix"])
+        results = LoadTestResults()
+        client = HitasClient(options["url"], options["token"], options["timeout"], results)
+
+        self.stdout.write("Discovering test data...")
+        data = self.discover(client, options["discovery_pages"])
+        self.stdout.write(
+            f"Found {len(data.apartments)} apartments, {len(data.housing_companies)} housing companies "
+            f"and {len(data.owners)} owners."
+        )
+
+        seed_rng = random.Random(options["seed"])
+        seeds = [seed_rng.random() for _ in range(options["users"])]
+        deadline = time.perf_counter() + options["duration"]
+
+        def run_user(seed: float) -> None:
+            rng = random.Random(seed)
+            scenarios = Scenarios(client, data, rng)
+            names, weights = zip(*mix.items())
+            while time.perf_counter() < deadline:
+                scenario: Callable[[], None] = getattr(scenarios, rng.choices(names, weights)[0])
+                scenario()
+                if options["think_time"]:
+                    time.sleep(rng.uniform(0, options["think_time"]))
+
+        self.stdout.write(f"Running {options['users']} users for {options['duration']} seconds...")
+        results.started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["users"]) as executor:
+            for future in [executor.submit(run_user, seed) for seed in seeds]:
+                future.result()
+        results.finished = time.perf_counter()
+
+        summary = results.summary()
+        self.print_summary(summary)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(
+                    {
+                        "url": options["url"],
+                        "users": options["users"],
+                        "duration": options["duration"],
+                        "mix": mix,
+                        "endpoints": summary,
+                    },
+                    f,
+                    indent=2,
+                )
+            self.stdout.write(f"Results written to {options['output']!r}")
+
+    @staticmethod
+    def parse_mix(overrides: list[str]) -> dict[str, int]:
+        mix = dict(DEFAULT_MIX)
+        for override in overrides:
+            name, _, weight = override.partition("=")
+            if name not in DEFAULT_MIX or not weight.isdigit():
+                raise CommandError(f"Invalid scenario weight {override!r}.")
+            mix[name] = int(weight)
+
+        mix = {name: weight for name, weight in mix.items() if weight > 0}
+        if not mix:
+            raise CommandError("At least one scenario must have a positive weight.")
+        return mix
+
+    @staticmethod
+    def discover(client: HitasClient, pages: int) -> TestData:
+        """Find regulated apartments and owners to use in the scenarios. Discovery requests are not recorded."""
+        data = TestData(apartments=[], housing_companies=[], housing_company_names=[], postal_codes=[], owners=[])
+        housing_companies: dict[str, str] = {}
+        postal_codes: set[str] = set()
+
+        for page in range(1, pages + 1):
+            response = client.request(
+                "discovery", "GET", "apartments", params={"is_regulated": "true", "page": page}, record=False
+            )
+            if response is None:
+                raise CommandError(f"Could not fetch apartments from {client.base_url!r}, check the URL and token.")
+            for apartment in response["contents"]:
+                housing_company = apartment["links"]["housing_company"]
+                data.apartments.append((housing_company["id"], apartment["id"]))
+                housing_companies[housing_company["id"]] = housing_company["display_name"]
+                postal_codes.add(apartment["address"]["postal_code"])
+            if response["page"]["links"]["next"] is None:
+                break
+
+        response = client.request("discovery", "GET", "owners", params={"page": 1}, record=False)
+        if response is not None:
+            data.owners = [owner["id"] for owner in response["contents"]]
+
+        if not data.apartments or not data.owners:
+            raise CommandError("No regulated apartments or owners found, generate data first with 'hitasgenerate'.")
+
+        data.housing_companies = list(housing_companies)
+        data.housing_company_names = list(housing_companies.values())
+        data.postal_codes = sorted(postal_codes)
+        return data
+
+    def print_summary(self, summary: dict[str, dict[str, Any]]) -> None:
+        self.stdout.write(
+            f"{'Endpoint':<45} {'reqs':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        for name, result in summary.items():
+            self.stdout.write(
+                f"{name:<45} {result['requests']:>7} {result['errors']:>7} {result['throughput']:>8.2f} "
+                f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+            )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+
+class Command(BaseCommand):
+    help = (
+        "Create a local stand-in for the Hitas Oracle database with generated legacy data, "
+        "e.g. for running and profiling the migration without Oracle: "
+        "'hitasmigrate --oracle-url <url>'."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--url",
+            default="sqlite:///oracle.sqlite3",
+            help="SQLAlchemy URL of the database to create the tables to (default: 'sqlite:///oracle.sqlite3').",
+        )
+        parser.add_argument(
+            "--housing-companies",
+            type=int,
+            default=100,
+            help="Number of housing companies to generate (default: 100).",
+        )
+        parser.add_argument(
+            "--apartments",
+            type=int,
+            default=30,
+            help="Number of apartments to generate per housing company (default: 30).",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the generated data (default: 0).")
+
+    def handle(self, *args, **options) -> None:
+        # Import here so that the dependencies of the migration (like sqlalchemy) are only required when used
+        from hitas.oracle_migration.local_database import LocalDatabaseSize, create_local_database
+
+        size = LocalDatabaseSize(
+            housing_companies=options["housing_companies"],
+            apartments_per_housing_company=options["apartments"],
+        )
+        create_local_database(options["url"], size, seed=options["seed"])
+
+        self.stdout.write(self.style.SUCCESS("Done!"))
@@ -2,9 +2,10 @@
 import sys
 
 import cx_Oracle
-from django.core.management.base import BaseCommand, CommandParser
+from django.core.management.base import BaseCommand, CommandError, CommandParser
 
 from hitas.models import MigrationDone
+from hitas.oracle_migration.checkpoint import DEFAULT_CHECKPOINT_PATH, CheckpointError
 
 
 class Command(BaseCommand):
@@ -21,6 +22,12 @@ def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument("--oracle-host", default="localhost", help="Oracle database host (default: 'localhost').")
         parser.add_argument("--oracle-port", type=int, default=1521, help="Oracle database port (default: 1521).")
         parser.add_argument("--oracle-user", default="system", help="Oracle database user (default: 'system').")
+        parser.add_argument(
+            "--oracle-url",
+            default=None,
+            help="Migrate from the database in this SQLAlchemy URL instead of the Oracle host and port, "
+            "e.g. a local database created with 'hitaslocaloracle'.",
+        )
         parser.add_argument(
             "--oracle-password",
             default="oracle",
@@ -45,6 +52,22 @@ def add_arguments(self, parser: CommandParser) -> None:
             action="store_true",
             help="Only migrate a regulated housing companies for testing purposes",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes to migrate housing companies with (default: 1).",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue a failed migration from the step after the last completed one.",
+        )
+        parser.add_argument(
+            "--checkpoint-file",
+            default=DEFAULT_CHECKPOINT_PATH,
+            help=f"File to save the migration progress to after each step (default: '{DEFAULT_CHECKPOINT_PATH}').",
+        )
 
     def handle(self, *args, **options) -> None:
         if sys.platform.startswith("darwin"):  # MacOS
@@ -65,20 +88,29 @@ def handle(self, *args, **options) -> None:
             exit(1)
         if options["check"]:
             return
+        if options["resume"] and (options["truncate"] or options["truncate_only"]):
+            raise CommandError("'--resume' cannot be used with '--truncate' or '--truncate-only'.")
 
         # Import migration runner here so its dependencies (like sqlalchemy) are not required for a simple
         # check if migration is done
         from hitas.oracle_migration.runner import run
 
-        run(
-            options["oracle_host"],
-            options["oracle_port"],
-            options["oracle_user"],
-            oracle_pw,
-            options["debug"],
-            not options["skip_anonymize"],
-            options["truncate"],
-            options["truncate_only"],
-            options["minimal_dataset"],
-            options["regulated_only"],
-        )
+        try:
+            run(
+                options["oracle_host"],
+                options["oracle_port"],
+                options["oracle_user"],
+                oracle_pw,
+                options["debug"],
+                not options["skip_anonymize"],
+                options["truncate"],
+                options["truncate_only"],
+                options["minimal_dataset"],
+                options["regulated_only"],
+                options["workers"],
+                options["resume"],
+                options["checkpoint_file"],
+                options["oracle_url"],
+            )
+        except CheckpointError as error:
+            raise CommandError(str(error)) from error
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from hitas.services.owner import obfuscate_owners_without_regulated_apartments
+
+
+class Command(BaseCommand):
+    help = (
+        "Obfuscate all owners who do not own any regulated apartments. "
+        "Regulation runs check all owners once a year, and otherwise only the owners of the housing companies "
+        "they release, so this catches owners whose situation changed in between, e.g. after selling an apartment."
+    )
+
+    def handle(self, *args, **options) -> None:
+        obfuscated_owners = obfuscate_owners_without_regulated_apartments()
+        self.stdout.write(self.style.SUCCESS(f"Obfuscated {len(obfuscated_owners)} owners."))
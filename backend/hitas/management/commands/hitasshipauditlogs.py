@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from hitas.services.audit_log_shipping import AuditLogShipper
+
+
+class Command(BaseCommand):
+    help = (
+        "Ship unsent audit log entries to the log targets configured in 'RESILIENT_LOGGER' using bulk requests. "
+        "Continues from where the previous run left off."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--limit", type=int, default=None, help="Ship at most this many entries.")
+        parser.add_argument("--bulk-size", type=int, default=None, help="Entries per bulk request.")
+        parser.add_argument("--concurrency", type=int, default=None, help="Concurrent bulk requests.")
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Look for unsent entries from the beginning of the audit log instead of the last watermark.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        kwargs = {key: options[key] for key in ("bulk_size", "concurrency") if options[key] is not None}
+        shipper = AuditLogShipper.from_settings(**kwargs)
+
+        result = shipper.ship(limit=options["limit"], full=options["full"])
+        self.stdout.write(f"Shipped {result.sent} entries, watermark: {result.watermark}")
+
+        if result.failed:
+            raise CommandError(f"Failed to ship {result.failed} entries.")
+
+        self.stdout.write(self.style.SUCCESS("Done!"))
@@ -0,0 +1,122 @@
+import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import migrations
+from django.db.backends.postgresql.psycopg_any import sql
+from django.utils import timezone
+
+TABLE = "auditlog_logentry"
+UNPARTITIONED_TABLE = "auditlog_logentry_unpartitioned"
+DEFAULT_PARTITION = "auditlog_logentry_default"
+SEQUENCE = "auditlog_logentry_partitioned_id_seq"
+MONTHS_AHEAD = 3
+
+
+def partition_log_entries(apps, schema_editor):
+    """
+    Convert the audit log table to a table partitioned by month on the timestamp.
+
+    Monthly partitions are created from the month of the oldest log entry until the next months,
+    and a default partition catches anything after those. The existing log entries are copied
+    to the partitions, so that the old ones can be archived month by month like the new ones.
+    New monthly partitions are created and old ones archived with the 'hitasauditlogpartitions' command.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [TABLE])
+        if cursor.fetchone() == ("p",):
+            return
+
+        cursor.execute(sql.SQL('SELECT MIN("timestamp") FROM {table}').format(table=sql.Identifier(TABLE)))
+        oldest = cursor.fetchone()[0]
+
+        set_sequence_value = (
+            sql.SQL("SELECT setval({sequence}, (SELECT COALESCE(MAX(id), 0) + 1 FROM {table}), false)")
+            .format(sequence=sql.Literal(SEQUENCE), table=sql.Identifier(TABLE))
+            .as_string(cursor.cursor)
+        )
+        copy_log_entries = (
+            sql.SQL("INSERT INTO {table} SELECT * FROM {unpartitioned_table}")
+            .format(table=sql.Identifier(TABLE), unpartitioned_table=sql.Identifier(UNPARTITIONED_TABLE))
+            .as_string(cursor.cursor)
+        )
+
+    content_type_table = apps.get_model("contenttypes", "ContentType")._meta.db_table
+    user_model = apps.get_model(settings.AUTH_USER_MODEL)
+    user_table = user_model._meta.db_table
+    user_pk = user_model._meta.pk.column
+
+    # Partition bounds are in the UTC time zone of the connection, like the timestamps
+    today = timezone.now().astimezone(datetime.timezone.utc).date()
+    first_month = (oldest.date() if oldest is not None else today).replace(day=1)
+    last_month = today.replace(day=1) + relativedelta(months=MONTHS_AHEAD)
+
+    statements = [
+        # Move the existing table aside, the partitioned table takes its name.
+        # Check and not null constraints are copied, identity columns and sequence defaults are not.
+        f"ALTER TABLE {TABLE} RENAME TO {UNPARTITIONED_TABLE}",
+        (
+            f"CREATE TABLE {TABLE} (LIKE {UNPARTITIONED_TABLE} INCLUDING CONSTRAINTS) "
+            f'PARTITION BY RANGE ("timestamp")'
+        ),
+    ]
+
+    month = first_month
+    while month <= last_month:
+        end = month + relativedelta(months=1)
+        statements.append(
+            f"CREATE TABLE {TABLE}_p{month:%Y%m} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+    statements += [
+        f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT",
+        # Copy the existing entries before creating the keys and indexes, which is faster than updating them per row
+        copy_log_entries,
+        f"DROP TABLE {UNPARTITIONED_TABLE}",
+        f"CREATE SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id",
+        set_sequence_value,
+        f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')",
+        # Unique constraints must include the partition key
+        f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey_partitioned PRIMARY KEY (id, "timestamp")',
+        (
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_content_type_fk FOREIGN KEY (content_type_id) "
+            f"REFERENCES {content_type_table} (id) DEFERRABLE INITIALLY DEFERRED"
+        ),
+        (
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_actor_fk FOREIGN KEY (actor_id) "
+            f"REFERENCES {user_table} ({user_pk}) DEFERRABLE INITIALLY DEFERRED"
+        ),
+        # Same single column indexes as in the auditlog migrations, so that they are created for new partitions
+        f"CREATE INDEX {TABLE}_p_object_pk_idx ON {TABLE} (object_pk)",
+        f"CREATE INDEX {TABLE}_p_object_id_idx ON {TABLE} (object_id)",
+        f"CREATE INDEX {TABLE}_p_action_idx ON {TABLE} (action)",
+        f"CREATE INDEX {TABLE}_p_cid_idx ON {TABLE} (cid)",
+        f'CREATE INDEX {TABLE}_p_timestamp_idx ON {TABLE} ("timestamp")',
+        f"CREATE INDEX {TABLE}_p_actor_id_idx ON {TABLE} (actor_id)",
+        # Latest log entries for an object: 'last_modified', 'last_log', 'get_for_object(...).order_by("-timestamp")'
+        f'CREATE INDEX {TABLE}_object_timestamp_idx ON {TABLE} (content_type_id, object_id, "timestamp" DESC)',
+        # Log entries of a model by action on an interval: 'find_apartment_sale_creations'
+        f'CREATE INDEX {TABLE}_action_timestamp_idx ON {TABLE} (content_type_id, action, "timestamp")',
+    ]
+
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("hitas", "0021_update_external_report_view"),
+        ("auditlog", "0017_add_actor_email"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # The partitioned table works with the auditlog model as is, so it is left in place when reverting.
+        migrations.RunPython(partition_log_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,107 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+import hitas.models._base
+
+# Same as 'hitas.services.audit_log.LAST_MODIFIED_FIELDS' at the time of this migration
+LAST_MODIFIED_FIELDS = {
+    ("hitas", "housingcompany"): ("property_manager",),
+}
+
+
+def populate_last_modified(apps, schema_editor):
+    """Populate the last modified projection from the existing log entries."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    ContentType = apps.get_model("contenttypes", "ContentType")
+
+    # Whole objects
+    schema_editor.execute(
+        """
+        INSERT INTO hitas_lastmodified (content_type_id, object_id, field, "timestamp", actor_id)
+        SELECT DISTINCT ON (content_type_id, object_id) content_type_id, object_id, '', "timestamp", actor_id
+        FROM auditlog_logentry
+        WHERE object_id IS NOT NULL AND action <> 3
+        ORDER BY content_type_id, object_id, "timestamp" DESC, id DESC
+        """
+    )
+
+    # Tracked fields, ignoring cases where the field was not actually changed
+    for (app_label, model), fields in LAST_MODIFIED_FIELDS.items():
+        content_type = ContentType.objects.filter(app_label=app_label, model=model).first()
+        if content_type is None:
+            continue
+
+        for field in fields:
+            schema_editor.execute(
+                """
+                INSERT INTO hitas_lastmodified (content_type_id, object_id, field, "timestamp", actor_id)
+                SELECT DISTINCT ON (object_id) content_type_id, object_id, %s, "timestamp", actor_id
+                FROM auditlog_logentry
+                WHERE content_type_id = %s
+                    AND object_id IS NOT NULL
+                    AND action <> 3
+                    AND changes ? %s
+                    AND changes -> %s ->> 0 IS DISTINCT FROM changes -> %s ->> 1
+                ORDER BY object_id, "timestamp" DESC, id DESC
+                """,
+                params=[field, content_type.id, field, field, field],
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("hitas", "0022_partition_auditlog_logentry"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LastModified",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("object_id", models.PositiveBigIntegerField(editable=False)),
+                ("field", models.CharField(blank=True, default="", editable=False, max_length=255)),
+                ("timestamp", models.DateTimeField(editable=False)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        editable=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Last modified",
+                "verbose_name_plural": "Last modified",
+            },
+            bases=(
+                hitas.models._base.PostFetchModelMixin,
+                hitas.models._base.AuditLogAdditionalDataMixin,
+                models.Model,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="lastmodified",
+            constraint=models.UniqueConstraint(
+                fields=("content_type", "object_id", "field"),
+                name="hitas_lastmodified_unique_object_field",
+            ),
+        ),
+        migrations.RunPython(populate_last_modified, migrations.RunPython.noop),
+    ]
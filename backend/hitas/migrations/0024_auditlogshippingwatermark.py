@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+import hitas.models._base
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("hitas", "0023_lastmodified"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditLogShippingWatermark",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=64, unique=True)),
+                ("timestamp", models.DateTimeField()),
+                ("modified_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Audit log shipping watermark",
+                "verbose_name_plural": "Audit log shipping watermarks",
+            },
+            bases=(
+                hitas.models._base.PostFetchModelMixin,
+                hitas.models._base.AuditLogAdditionalDataMixin,
+                models.Model,
+            ),
+        ),
+    ]
@@ -6,6 +6,7 @@
     DepreciationPercentage,
 )
 from hitas.models.apartment_sale import ApartmentSale
+from hitas.models.audit_log import AuditLogShippingWatermark, LastModified
 from hitas.models.building import Building
 from hitas.models.codes import AbstractCode, ApartmentType, BuildingType, Developer
 from hitas.models.condition_of_sale import ConditionOfSale
@@ -1,17 +1,21 @@
 import datetime
 from decimal import Decimal
-from typing import Any, Iterable, Optional, TypeAlias, TypedDict, TypeVar
+from functools import cache
+from typing import Any, Iterable, Iterator, Optional, TypeAlias, TypedDict, TypeVar
 from uuid import UUID, uuid4
 
-from auditlog.diff import model_instance_diff
 from auditlog.models import LogEntry
 from auditlog.receivers import log_delete, log_update
 from auditlog.registry import auditlog
 from django.core.validators import MinValueValidator
-from django.db import models, transaction
-from django.db.models import Model, QuerySet
+from django.db import connections, models, transaction
+from django.db.models import Case, Model, QuerySet, Value, When
+from django.db.models.expressions import Col
 from django.db.models.functions import Cast
+from django.db.models.lookups import Exact
 from django.db.models.manager import BaseManager
+from django.db.models.sql import Query
+from django.db.models.sql.compiler import SQLCompiler
 from django.utils.functional import classproperty
 from post_fetch_hook import mixins
 from safedelete.managers import SafeDeleteAllManager, SafeDeleteDeletedManager, SafeDeleteManager
@@ -19,7 +23,7 @@
 from safedelete.queryset import SafeDeleteQueryset
 from safedelete.signals import post_softdelete, post_undelete
 
-from hitas.services.audit_log import bulk_create_log_entries
+from hitas.services.audit_log import bulk_create_log_entries, bulk_model_instance_diff
 
 PK: TypeAlias = int
 FieldName: TypeAlias = str
@@ -27,6 +31,9 @@
 NewValue: TypeAlias = str
 TModel = TypeVar("TModel", bound=Model)
 
+# How many objects are compared at a time when creating audit logs for queryset updates
+AUDIT_LOG_CHUNK_SIZE = 2000
+
 # Create audit logs when soft-delete models are soft-deleted or undeleted
 auditlog._signals[post_softdelete] = log_delete
 auditlog._signals[post_undelete] = log_update
@@ -37,8 +44,6 @@ def update(self, **kwargs: Any) -> int:  # NOSONAR
         if self.model not in auditlog.get_models():
             return super().update(**kwargs)
 
-        objs: dict[int, Model] = {obj.pk: obj for obj in self.all()}
-
         # Convert Cast-ed Case-statements from 'bulk_update' to plain values.
         # 'bulk_update' calls this method with 'kwargs' like this:
         #
@@ -61,38 +66,60 @@ def update(self, **kwargs: Any) -> int:  # NOSONAR
         #   ),
         # }
         #
-        # This needs to be converted to 'changes' like this:
+        # This needs to be converted to 'new_values' like this:
         #
         # {
-        #   1: {"field_1": (objs[1].field_1, 1), "field_2": (objs[1].field_2, "foo")},
-        #   2: {"field_1": (objs[2].field_1, 2), "field_2": (objs[2].field_2, "bar")},
+        #   1: {"field_1": 1, "field_2": "foo"},
+        #   2: {"field_1": 2, "field_2": "bar"},
         # }
         #
+        new_values: Optional[dict[PK, dict[FieldName, Any]]] = None
         if any(isinstance(value, Cast) for value in kwargs.values()):
-            changes: dict[PK, dict[FieldName, tuple[OldValue, NewValue]]] = {}
+            new_values = {}
             for key, value in kwargs.items():
                 for expression in value.source_expressions:
                     for case in expression.cases:
-                        next_val = case.result.value
                         for _, pk in case.condition.children:
-                            current_val = getattr(objs[pk], key, None)
-                            if current_val != next_val:
-                                changes.setdefault(pk, {})
-                                changes[pk].update({key: (str(current_val), str(next_val))})
-        else:
-            changes: dict[PK, dict[FieldName, tuple[OldValue, NewValue]]] = {
-                pk: {key: (str(getattr(objs[pk], key, None)), str(value)) for key, value in kwargs.items()}
-                for pk in objs
-            }
-
-        if not changes:
-            return 0
+                            new_values.setdefault(pk, {})[key] = case.result.value
 
         with transaction.atomic():
-            ret = super().update(**kwargs)
-            bulk_create_log_entries(objs.values(), LogEntry.Action.UPDATE, changes)
+            # Compare the current values to the new ones in chunks, so that large updates
+            # don't need to hold all the updated objects in memory at once.
+            has_changes = False
+            for objs in self._chunked(AUDIT_LOG_CHUNK_SIZE):
+                changes: dict[PK, dict[FieldName, tuple[OldValue, NewValue]]] = {}
+                for obj in objs:
+                    if new_values is None:
+                        changes[obj.pk] = {
+                            key: (str(getattr(obj, key, None)), str(value)) for key, value in kwargs.items()
+                        }
+                        continue
+
+                    for key, next_val in new_values.get(obj.pk, {}).items():
+                        current_val = getattr(obj, key, None)
+                        if current_val != next_val:
+                            changes.setdefault(obj.pk, {})
+                            changes[obj.pk].update({key: (str(current_val), str(next_val))})
+
+                if changes:
+                    has_changes = True
+                    bulk_create_log_entries(objs, LogEntry.Action.UPDATE, changes)
+
+            if not has_changes:
+                return 0
 
-        return ret
+            return super().update(**kwargs)
+
+    def _chunked(self, chunk_size: int) -> Iterator[list[Model]]:
+        """Iterate the objects in the queryset in chunks in primary key order."""
+        queryset = self.order_by("pk")
+        last_pk: Optional[PK] = None
+        while True:
+            chunk = list((queryset if last_pk is None else queryset.filter(pk__gt=last_pk))[:chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            last_pk = chunk[-1].pk
 
 
 class AuditableBulkCreateMixin:
@@ -106,58 +133,123 @@ def bulk_create(
             return super().bulk_create(objs, batch_size, ignore_conflicts)
 
         with transaction.atomic():
-            # Bulk create does not always return the created object IDs, so we need to fetch them separately.
+            # When conflicts are not ignored, the database returns the IDs of the inserted rows
+            # (INSERT ... RETURNING), so the created objects can be logged as they are.
+            if not ignore_conflicts and connections[self.db].features.can_return_rows_from_bulk_insert:
+                objs = super().bulk_create(objs, batch_size, ignore_conflicts)
+                bulk_create_log_entries(objs, LogEntry.Action.CREATE, bulk_model_instance_diff(objs))
+                return objs
+
+            # Otherwise, bulk create does not return the created object IDs, so we need to fetch them separately.
             # Previously we fetched the existing IDs before 'bulk_create' but that caused problems with thousands of ids
             # Instead, get the existing last ID, and assume all the created objects have a greater ID than that.
             last_id: int = _last_obj.id if (_last_obj := self.order_by("-id").first()) is not None else 0
             objs = super().bulk_create(objs, batch_size, ignore_conflicts)
             new_objs: list[TModel] = list(self.filter(id__gt=last_id))
-
-            changes: dict[PK, dict[FieldName, tuple[OldValue, NewValue]]]
-            changes = {obj.pk: model_instance_diff(None, obj) for obj in new_objs}
-            bulk_create_log_entries(new_objs, LogEntry.Action.CREATE, changes)
+            bulk_create_log_entries(new_objs, LogEntry.Action.CREATE, bulk_model_instance_diff(new_objs))
 
         return objs
 
 
-class AuditableMaskedModelMixin:
-    def fully_mask_object_latest_log(self) -> None:
-        """
-        Vanilla masking only masks the first half of the data.
-        This method overwrites the whole field value in the log entry after the object is saved.
-        """
-        last_log = LogEntry.objects.get_for_object(self).order_by("-timestamp", "-id").first()
-        if last_log is not None:
-            # Get the fields that should be masked, which are defined in `auditlog.register(MODEL, mask_fields=[...])`.
-            mask_fields = auditlog.get_model_fields(self.__class__).get("mask_fields", [])
-            changes = last_log.changes_dict
-            # Changes to a field that should be masked were made
-            if changes is not None and any(x in mask_fields for x in changes):
-                for field in mask_fields:
-                    if field in changes:
-                        # Replace every character in the before and after fields value with *
-                        for i, _ in enumerate(changes[field]):
-                            # Fix auditlog masking 'empty' values
-                            if changes[field][i] == "**ne":
-                                changes[field][i] = "None"
-                            else:
-                                changes[field][i] = "*" * len(changes[field][i])
-                last_log.changes = changes
-                last_log.save()
-
-    def save(self, **kwargs):
-        super().save(**kwargs)
-        self.fully_mask_object_latest_log()
-
-    def delete(self, **kwargs):
-        retval = super().delete(**kwargs)
-        self.fully_mask_object_latest_log()
-        return retval
+class DatabaseObfuscationCompilerMixin:
+    """
+    Replace the selected columns of obfuscated models with
+    'CASE WHEN <obfuscation_field> THEN <obfuscated value> ELSE <column> END' expressions.
+    """
+
+    query: Query
+
+    def get_select(self, *args: Any, **kwargs: Any) -> tuple[list[Any], Any, dict[str, int]]:
+        select, klass_info, annotations = super().get_select(*args, **kwargs)
+
+        for i, (expression, _, alias) in enumerate(select):
+            if not isinstance(expression, Col):
+                continue
+
+            # Proxy models (e.g. 'NonObfuscatedOwner') can have different rules than the model the field belongs to
+            model = self.query.model if expression.alias == self.query.base_table else expression.target.model
+            rules = getattr(model, "obfuscation_rules", NotImplemented)
+            condition_field = getattr(model, "obfuscation_field", NotImplemented)
+            if rules is NotImplemented or condition_field is NotImplemented or expression.target.name not in rules:
+                continue
+
+            condition = Col(expression.alias, model._meta.get_field(condition_field))
+            value = Value(rules[expression.target.name], output_field=expression.output_field)
+            obfuscated = Case(
+                When(Exact(condition, True), then=value),
+                default=expression,
+                output_field=expression.output_field,
+            )
+            sql, params = self.compile(obfuscated)
+            select[i] = (obfuscated, obfuscated.select_format(self, sql, params), alias)
+
+        return select, klass_info, annotations
+
+
+class DatabaseObfuscationQueryMixin:
+    def get_compiler(self, *args: Any, **kwargs: Any) -> SQLCompiler:
+        compiler = super().get_compiler(*args, **kwargs)
+        compiler.__class__ = _with_mixin(DatabaseObfuscationCompilerMixin, type(compiler))
+        return compiler
+
+
+@cache
+def _with_mixin(mixin: type, cls: type) -> type:
+    if issubclass(cls, mixin):
+        return cls
+    return type(f"{mixin.__name__.removesuffix('Mixin')}{cls.__name__}", (mixin, cls), {})
+
+
+class DatabaseObfuscationMixin:
+    """
+    Obfuscate 'values()' and 'values_list()' queries in the database instead of the post fetch hooks.
+
+    The obfuscation rules of the model (and of related models, e.g. 'owner__name' from ownerships)
+    are compiled into the SQL, so the obfuscation field (e.g. 'non_disclosure') doesn't need to be selected,
+    and the rows can be streamed with '.iterator()' without any per-row processing.
+    Filtering and ordering still use the actual values, like with the post fetch hooks.
+    """
+
+    query: Query
+
+    def obfuscated_values(self, *fields: str, **expressions: Any) -> QuerySet:
+        return self.values(*fields, **expressions)._obfuscate_in_database()
+
+    def obfuscated_values_list(self, *fields: str, flat: bool = False, named: bool = False) -> QuerySet:
+        return self.values_list(*fields, flat=flat, named=named)._obfuscate_in_database()
+
+    def _obfuscate_in_database(self) -> QuerySet:
+        clone = self._chain()
+        iterable_class = clone._iterable_class
+        clone.query = clone.query.chain(_with_mixin(DatabaseObfuscationQueryMixin, type(clone.query)))
+        # Setting the query resets the iterable class of 'values_list()' to the one of 'values()'
+        clone._iterable_class = iterable_class
+        return clone
+
+    def _post_fetch(self, rows: list[Any], select_related: dict[str, Any]) -> list[Any]:
+        # Already obfuscated in the database
+        if isinstance(self.query, DatabaseObfuscationQueryMixin):
+            return rows
+        return super()._post_fetch(rows, select_related)
+
+
+class DatabaseObfuscationManagerMixin:
+    """
+    Safe delete managers are not created with 'from_queryset', since that would also
+    expose e.g. the 'delete()' of the queryset, so the queryset methods are proxied here.
+    """
+
+    def obfuscated_values(self, *fields: str, **expressions: Any) -> QuerySet:
+        return self.get_queryset().obfuscated_values(*fields, **expressions)
+
+    def obfuscated_values_list(self, *fields: str, flat: bool = False, named: bool = False) -> QuerySet:
+        return self.get_queryset().obfuscated_values_list(*fields, flat=flat, named=named)
 
 
 class HitasQuerySet(
     AuditableUpdateMixin,
     AuditableBulkCreateMixin,
+    DatabaseObfuscationMixin,
     # Model send signals to auditlog, so queryset "fast deletes" are not possible.
     # See `django.db.models.deletion.Collector.can_fast_delete`.
     # Therefore, log entries are created with the model's delete,
@@ -183,6 +275,11 @@ def should_obfuscate(self) -> bool:
         """Whether the model should be obfuscated or not."""
         return NotImplemented
 
+    @classproperty
+    def obfuscation_field(cls) -> str:
+        """Boolean field which tells whether the model should be obfuscated, for obfuscating in the database."""
+        return NotImplemented
+
 
 class AuditLogAdditionalDataT(TypedDict):
     is_sent: bool
@@ -217,6 +314,7 @@ def __repr__(self) -> str:
 class HitasSafeDeleteQuerySet(
     AuditableUpdateMixin,
     AuditableBulkCreateMixin,
+    DatabaseObfuscationMixin,
     mixins.PostFetchQuerySetMixin,
     # SafeDelete models override queryset's delete() method
     # so that the model's delete() is called for each object.
@@ -227,15 +325,15 @@ class HitasSafeDeleteQuerySet(
     pass
 
 
-class HitasSafeDeleteManager(SafeDeleteManager):
+class HitasSafeDeleteManager(DatabaseObfuscationManagerMixin, SafeDeleteManager):
     _queryset_class = HitasSafeDeleteQuerySet
 
 
-class HitasSafeDeleteAllManager(SafeDeleteAllManager):
+class HitasSafeDeleteAllManager(DatabaseObfuscationManagerMixin, SafeDeleteAllManager):
     _queryset_class = HitasSafeDeleteQuerySet
 
 
-class HitasSafeDeleteDeletedManager(SafeDeleteDeletedManager):
+class HitasSafeDeleteDeletedManager(DatabaseObfuscationManagerMixin, SafeDeleteDeletedManager):
     _queryset_class = HitasSafeDeleteQuerySet
 
 
@@ -270,7 +270,11 @@ def sell_by_date(self):
         Apartment should have its ownerships with their conditions of sales prefetched,
         and each condition of sale should have its apartment's completion date joined,
         and the apartment's first sale date annotated as 'first_purchase_date'.
+        Alternatively, the sell by date can be annotated as '_sell_by_date' with 'get_sell_by_date'.
         """
+        if hasattr(self, "_sell_by_date"):
+            return self._sell_by_date
+
         sell_by_dates: set[date] = set()
 
         latest_sale = self.latest_sale(include_first_sale=True)
@@ -294,6 +298,10 @@ def sell_by_date(self):
 
     @property
     def has_grace_period(self) -> bool:
+        # Use annotation from 'get_has_grace_period' if available
+        if hasattr(self, "_has_grace_period"):
+            return self._has_grace_period
+
         latest_sale = self.latest_sale(include_first_sale=True)
         if latest_sale is None:
             return False
@@ -386,6 +394,8 @@ def __repr__(self) -> str:
 # This is for typing only
 class ApartmentWithListAnnotations(Apartment):
     has_conditions_of_sale: Optional[bool]
+    _sell_by_date: Optional[date]
+    _has_grace_period: bool
 
     class Meta:
         abstract = True
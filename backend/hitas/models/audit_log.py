@@ -0,0 +1,68 @@
+import datetime
+
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+
+from hitas.models._base import HitasModel
+from hitas.services.audit_log import update_last_modified
+
+
+# Projection of the audit log: when, and by whom, an object (or one of its fields) was last modified.
+# Kept up to date whenever log entries are written, see 'hitas.services.audit_log.update_last_modified'.
+class LastModified(HitasModel):
+    content_type = models.ForeignKey(
+        to="contenttypes.ContentType",
+        on_delete=models.CASCADE,
+        related_name="+",
+        editable=False,
+    )
+    object_id: int = models.PositiveBigIntegerField(editable=False)
+    # Empty for the object itself
+    field: str = models.CharField(max_length=255, blank=True, default="", editable=False)
+    timestamp: datetime.datetime = models.DateTimeField(editable=False)
+    actor = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        editable=False,
+        null=True,
+    )
+
+    class Meta:
+        verbose_name = _("Last modified")
+        verbose_name_plural = _("Last modified")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id", "field"],
+                name="hitas_lastmodified_unique_object_field",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        field = f".{self.field}" if self.field else ""
+        return f"{self.content_type_id}:{self.object_id}{field} last modified at {self.timestamp.isoformat()}"
+
+
+# How far the audit log has been shipped to the log targets, see 'hitas.services.audit_log_shipping'.
+class AuditLogShippingWatermark(HitasModel):
+    name: str = models.CharField(max_length=64, unique=True)
+    # All log entries before this have been shipped
+    timestamp: datetime.datetime = models.DateTimeField()
+    modified_at: datetime.datetime = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Audit log shipping watermark")
+        verbose_name_plural = _("Audit log shipping watermarks")
+
+    def __str__(self) -> str:
+        return f"Audit log shipped until {self.timestamp.isoformat()} ({self.name})"
+
+
+@receiver(post_save, sender=LogEntry, dispatch_uid="hitas_update_last_modified")
+def update_last_modified_on_log_entry(sender, instance: LogEntry, created: bool, raw: bool = False, **kwargs) -> None:
+    if created and not raw:
+        update_last_modified([instance])
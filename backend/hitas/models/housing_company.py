@@ -21,6 +21,7 @@
     HitasModelDecimalField,
 )
 from hitas.models.utils import validate_business_id
+from hitas.services.audit_log import last_modified
 from hitas.utils import max_date_if_all_not_null
 
 
@@ -281,21 +282,7 @@ def release_date(self) -> Optional[datetime.date]:
 
     @property
     def property_manager_changed_at(self) -> Optional[datetime.datetime]:
-        latest_logentry: LogEntry = (
-            LogEntry.objects.get_for_object(self)
-            .annotate(changes_as_json=Cast("changes", output_field=models.JSONField()))
-            .filter(
-                action__in=[LogEntry.Action.UPDATE, LogEntry.Action.CREATE],
-                changes_as_json__property_manager__isnull=False,
-            )
-            # Ignore cases where property manager was not actually changed
-            .exclude(changes_as_json__property_manager__0=F("changes_as_json__property_manager__1"))
-            .order_by("-timestamp", "-id")
-            .first()
-        )
-        if latest_logentry is not None:
-            return latest_logentry.timestamp
-        return None
+        return last_modified(HousingCompany, model_id=self.id, field="property_manager")
 
     class Meta:
         verbose_name = _("Housing company")
@@ -5,7 +5,7 @@
 from django.utils.functional import classproperty
 from django.utils.translation import gettext_lazy as _
 
-from hitas.models._base import AuditableMaskedModelMixin, ExternalSafeDeleteHitasModel
+from hitas.models._base import ExternalSafeDeleteHitasModel
 from hitas.models.utils import check_business_id, check_social_security_number, lift_obfuscation, obfuscate
 from hitas.utils import index_of
 
@@ -16,7 +16,7 @@ class OwnerT(TypedDict):
     email: Optional[str]
 
 
-class Owner(AuditableMaskedModelMixin, ExternalSafeDeleteHitasModel):
+class Owner(ExternalSafeDeleteHitasModel):
     OBFUSCATED_OWNER_NAME = "***"
 
     name: str = models.CharField(max_length=256, blank=True)
@@ -30,6 +30,10 @@ class Owner(AuditableMaskedModelMixin, ExternalSafeDeleteHitasModel):
     def obfuscation_rules(cls) -> dict[str, Any]:
         return {"name": "", "identifier": None, "email": None}
 
+    @classproperty
+    def obfuscation_field(cls) -> str:
+        return "non_disclosure"
+
     @property
     def should_obfuscate(self) -> bool:
         return self.non_disclosure
@@ -111,5 +115,14 @@ class Meta:
         proxy = True
 
 
-auditlog.register(Owner, mask_fields=["name", "identifier", "email"])
-auditlog.register(NonObfuscatedOwner, mask_fields=["name", "identifier", "email"])
+# Sensitive fields are fully masked already when the log entries are created
+auditlog.register(
+    Owner,
+    mask_fields=["name", "identifier", "email"],
+    mask_callable="hitas.services.audit_log.mask_fully",
+)
+auditlog.register(
+    NonObfuscatedOwner,
+    mask_fields=["name", "identifier", "email"],
+    mask_callable="hitas.services.audit_log.mask_fully",
+)
@@ -1,3 +1,4 @@
+import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING, Iterable, Optional, TypedDict, Union
 
@@ -12,6 +13,7 @@
 
 if TYPE_CHECKING:
     from hitas.models.apartment import Apartment
+    from hitas.models.housing_company import HitasType, RegulationStatus
     from hitas.models.owner import Owner
 
 
@@ -80,6 +82,19 @@ class Meta:
         abstract = True
 
 
+# This is for typing only
+class OwnershipWithConditionOfSaleFlags(Ownership):
+    _apartment_id: int
+    _regulation_status: "RegulationStatus"
+    _hitas_type: "HitasType"
+    _first_sale_id: Optional[int]
+    _first_sale_purchase_date: Optional["datetime.date"]
+    _is_new: bool
+
+    class Meta:
+        abstract = True
+
+
 class OwnershipLike(TypedDict):
     percentage: Decimal
     owner: "Owner"
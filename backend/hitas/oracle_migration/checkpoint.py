@@ -0,0 +1,97 @@
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = "hitasmigrate.checkpoint"
+# HMAC-SHA256 of the pickled state, written before it
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+
+class CheckpointError(Exception):
+    pass
+
+
+@dataclass
+class MigrationCheckpoint:
+    """
+    Progress of the Oracle migration, saved to a local file after each completed step.
+
+    The converted data (e.g. the created objects by their Oracle ids) is saved with the completed steps,
+    so that the migration can be resumed from the next step after a failure.
+    """
+
+    path: Path
+    options: dict[str, Any]
+    completed_steps: list[str] = field(default_factory=list)
+    # 'ConvertedData' of the migration runner, as it was after the last completed step
+    converted_data: Optional[Any] = None
+
+    @classmethod
+    def start(cls, path: Path, options: dict[str, Any]) -> "MigrationCheckpoint":
+        checkpoint = cls(path=path, options=options)
+        checkpoint.delete()
+        return checkpoint
+
+    @classmethod
+    def resume(cls, path: Path, options: dict[str, Any]) -> "MigrationCheckpoint":
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError as error:
+            raise CheckpointError(f"Cannot resume the migration: checkpoint file '{path}' not found.") from error
+
+        # Unpickling can run arbitrary code, so only files written by this installation are loaded
+        signature, data = content[:SIGNATURE_SIZE], content[SIGNATURE_SIZE:]
+        if not hmac.compare_digest(signature, _sign(data)):
+            raise CheckpointError(f"Cannot resume the migration: checkpoint file '{path}' has an invalid signature.")
+
+        state: dict[str, Any] = pickle.loads(data)  # noqa: S301  # nosec B301
+
+        if state["options"] != options:
+            raise CheckpointError(
+                f"Cannot resume the migration with different options: {options} (checkpoint has {state['options']})."
+            )
+
+        logger.info(f"Resuming the migration after steps: {', '.join(state['completed_steps']) or '-'}.\n")
+        return cls(
+            path=path,
+            options=options,
+            completed_steps=state["completed_steps"],
+            converted_data=state["converted_data"],
+        )
+
+    def is_completed(self, step: str) -> bool:
+        return step in self.completed_steps
+
+    def complete(self, step: str, converted_data: Any) -> None:
+        self.completed_steps.append(step)
+        self.converted_data = converted_data
+
+        state = {
+            "options": self.options,
+            "completed_steps": self.completed_steps,
+            "converted_data": self.converted_data,
+        }
+
+        # Write to a temporary file first, so that a failure while writing doesn't corrupt the previous checkpoint
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        temp_path = self.path.with_name(f"{self.path.name}.tmp")
+        temp_path.write_bytes(_sign(data) + data)
+        os.replace(temp_path, self.path)
+
+        logger.debug(f"Checkpoint saved after step '{step}'.")
+
+    def delete(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def _sign(data: bytes) -> bytes:
+    return hmac.new(settings.SECRET_KEY.encode(), data, hashlib.sha256).digest()
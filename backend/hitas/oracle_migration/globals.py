@@ -1,4 +1,8 @@
+import logging
+
+import django
 import faker
+from django.conf import settings
 
 _anonymize = False
 _faker = faker.Factory.create("fi_FI")
@@ -15,3 +19,21 @@ def anonymize_data() -> None:
 
 def faker():
     return _faker
+
+
+def init_worker_process(anonymize: bool, debug: bool, database_name: str) -> None:
+    """
+    Set up a spawned worker process of the migration.
+    This is here, since the modules that use the models can only be imported after Django has been set up.
+    """
+    # Use the same database as the main process, which is not the one in the settings e.g. in tests
+    settings.DATABASES["default"]["NAME"] = database_name
+    django.setup()
+
+    if debug:
+        from hitas.oracle_migration import runner
+
+        logging.basicConfig()
+        runner.logger.setLevel(logging.DEBUG)
+    if anonymize:
+        anonymize_data()
@@ -0,0 +1,495 @@
+"""
+Local stand-in for the Hitas Oracle database, for running and profiling the migration without Oracle.
+
+The tables are created from the definitions in 'oracle_schema' to e.g. SQLite or PostgreSQL,
+and filled with generated rows that look like the legacy data closely enough for the migration to run.
+"""
+
+import datetime
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from faker import Faker
+from sqlalchemy import Column, Date, Float, Integer, String, Table, create_engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex, CreateTable, DropTable
+from sqlalchemy.types import TypeDecorator
+
+from hitas.oracle_migration.financing_types import FINANCING_METHOD_TO_HITAS_TYPE_MAP
+from hitas.oracle_migration.oracle_schema import (
+    apartment_construction_price_indices,
+    apartment_market_price_indices,
+    apartment_ownerships,
+    apartment_payments,
+    apartments,
+    codebooks,
+    codes,
+    companies,
+    company_addresses,
+    company_construction_price_indices,
+    company_market_price_indices,
+    construction_price_indices,
+    hitas_monitoring,
+    market_price_indices,
+    property_managers,
+    real_estates,
+    users,
+)
+from hitas.oracle_migration.oracle_schema.metadata import metadata_obj
+from hitas.oracle_migration.types import HitasBoolean, HitasDuration, HitasYearMonth
+from hitas.oracle_migration.utils import ApartmentSaleMonitoringState
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE: int = 1000
+
+INDEX_CODEBOOKS = ["HITASEHIND", "MARKHINTAIND", "MARKHINTAIND2005", "RAKUSTIND", "RAKUSTIND2005", "RAJAHINNAT"]
+BUILDING_TYPES = ["KERROSTALO", "RIVITALO", "PARITALO", "PIENTALO"]
+APARTMENT_TYPES = ["1h+k", "1h+kk", "2h+k", "3h+k", "4h+k", "5h+k"]
+POSTAL_CODES = ["00100", "00200", "00530", "00550", "00560", "00710", "00800", "00980"]
+CPI_IMPROVEMENTS = ["Hissien rakentaminen", "Julkisivuremontti", "Ullakkohuoneen rakentaminen"]
+MPI_IMPROVEMENTS = ["Hissien rakentaminen", "Parvekkeiden lasitus", "Rakennusvirheistä johtuvat korjauskustannukset"]
+
+
+def create_oracle_engine(url: str) -> Engine:
+    """
+    Create an engine for the Oracle database in the given URL.
+    Local stand-ins don't have the 'HIDAS' schema, so their tables are in the default schema.
+    """
+    if url.startswith("oracle"):
+        return create_engine(url)
+    return create_engine(url, execution_options={"schema_translate_map": {metadata_obj.schema: None}})
+
+
+@dataclass
+class LocalDatabaseSize:
+    housing_companies: int = 100
+    apartments_per_housing_company: int = 30
+    property_managers: int = 20
+    users: int = 5
+
+
+def create_local_database(url: str, size: LocalDatabaseSize, seed: int = 0) -> None:
+    """
+    Create the Oracle tables to the database in the given URL, and fill them with generated legacy data.
+    Existing tables are dropped first.
+    """
+    engine = create_oracle_engine(url)
+    generator = _LegacyDataGenerator(size, seed)
+
+    with engine.begin() as connection:
+        create_tables(connection)
+
+        for table, rows in generator.rows():
+            _insert(connection, table, rows)
+
+    engine.dispose()
+    logger.info(f"Created a local Oracle database with {size.housing_companies} housing companies.\n")
+
+
+def create_tables(connection: Connection) -> None:
+    # Foreign keys are left out, since some of the tables refer to tables that are not migrated
+    # (and not defined), and the rows are inserted in no particular order.
+    for table in metadata_obj.tables.values():
+        connection.execute(DropTable(table, if_exists=True))
+        connection.execute(CreateTable(table, include_foreign_key_constraints=[]))
+        for index in table.indexes:
+            connection.execute(CreateIndex(index))
+
+
+def _insert(connection: Connection, table: Table, rows: list[dict[str, Any]]) -> None:
+    # Columns not given are filled with a default value of their type, since most columns are not nullable
+    rows = [{column.key: row.get(column.key, _default_value(column)) for column in table.columns} for row in rows]
+
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        connection.execute(table.insert(), rows[i : i + INSERT_BATCH_SIZE])
+
+    logger.debug(f"Inserted {len(rows)} rows to {table.name!r}.")
+
+
+def _default_value(column: Column) -> Any:
+    if column.nullable:
+        return None
+
+    column_type = column.type
+    if isinstance(column_type, HitasBoolean):
+        return False
+    if isinstance(column_type, HitasYearMonth):
+        return datetime.date(2000, 1, 1)
+    if isinstance(column_type, HitasDuration):
+        return HitasDuration.Duration(0, 0)
+    if isinstance(column_type, TypeDecorator):
+        column_type = column_type.impl
+
+    if isinstance(column_type, Integer):
+        return 0
+    if isinstance(column_type, Float):
+        return 0.0
+    if isinstance(column_type, Date):
+        return datetime.date(2000, 1, 1)
+    if isinstance(column_type, String):
+        return ""
+    raise ValueError(f"No default value for column {column.name!r} of type {column.type!r}.")
+
+
+class _LegacyDataGenerator:
+    def __init__(self, size: LocalDatabaseSize, seed: int) -> None:
+        self.size = size
+        self.random = random.Random(seed)
+        self.faker = Faker("fi_FI")
+        self.faker.seed_instance(seed)
+        self.today = datetime.date.today()
+
+        self.financing_method_codes = [f"{i:03d}" for i in range(len(FINANCING_METHOD_TO_HITAS_TYPE_MAP))]
+        self.owners: list[tuple[str, str]] = []
+
+        # Apartments the migration handles specially by their id are left out
+        self._ids: dict[str, int] = {apartments.name: 100_000}
+
+    def next_id(self, table: Table) -> int:
+        self._ids[table.name] = self._ids.get(table.name, 0) + 1
+        return self._ids[table.name]
+
+    def rows(self) -> Iterator[tuple[Table, list[dict[str, Any]]]]:
+        yield from self.codebooks()
+        yield users, [self.user() for _ in range(self.size.users)]
+        yield property_managers, [self.property_manager() for _ in range(self.size.property_managers)]
+
+        rows: dict[Table, list[dict[str, Any]]] = {}
+        for _ in range(self.size.housing_companies):
+            for table, table_rows in self.housing_company():
+                rows.setdefault(table, []).extend(table_rows)
+
+        yield from rows.items()
+
+    #
+    # Codebooks
+    #
+
+    def codebooks(self) -> Iterator[tuple[Table, list[dict[str, Any]]]]:
+        values_by_codebook: dict[str, list[tuple[str, str]]] = {
+            "TALOTYYPPI": [(f"{i:03d}", value) for i, value in enumerate(BUILDING_TYPES)],
+            "RAKENTAJA": [(f"{i:03d}", self.faker.company()) for i in range(10)],
+            "RAHMUOTO": [
+                (code, f"{name} ({code})")
+                for code, name in zip(self.financing_method_codes, FINANCING_METHOD_TO_HITAS_TYPE_MAP, strict=True)
+            ],
+            "HUONETYYPPI": [(f"{i:03d}", value) for i, value in enumerate(APARTMENT_TYPES)],
+            "POSTINROT": [(postal_code, "HELSINKI") for postal_code in POSTAL_CODES],
+        }
+        for codebook in INDEX_CODEBOOKS:
+            values_by_codebook[codebook] = self.index_values()
+
+        codebook_rows: list[dict[str, Any]] = []
+        code_rows: list[dict[str, Any]] = []
+        for codebook, values in values_by_codebook.items():
+            codebook_id = self.next_id(codebooks)
+            codebook_rows.append({"id": codebook_id, "code_type": codebook, "C_NIMI": codebook})
+            for order, (code_id, value) in enumerate(values):
+                code_rows.append(
+                    {
+                        "id": self.next_id(codes),
+                        "code_type": codebook,
+                        "code_id": code_id,
+                        "start_date": datetime.date(1990, 1, 1),
+                        "end_date": datetime.date(2099, 12, 31),
+                        "value": value,
+                        "codebook_id": codebook_id,
+                        "in_use": True,
+                        "order": order,
+                    }
+                )
+
+        yield codebooks, codebook_rows
+        yield codes, code_rows
+
+    def index_values(self) -> list[tuple[str, str]]:
+        month = datetime.date(1983, 1, 1)
+        value = 100.0
+        values: list[tuple[str, str]] = []
+        while month <= self.today:
+            values.append((month.strftime("%Y%m"), f"{value:.2f}"))
+            value *= self.random.uniform(0.998, 1.006)
+            month = (month + datetime.timedelta(days=32)).replace(day=1)
+        return values
+
+    #
+    # Users and property managers
+    #
+
+    def user(self) -> dict[str, Any]:
+        return {
+            "id": self.next_id(users),
+            "username": f"user{self._ids[users.name]}",
+            "password": self.faker.password(length=10),
+            "name": f"{self.faker.first_name()} {self.faker.last_name()}",
+            "is_active": True,
+        }
+
+    def property_manager(self) -> dict[str, Any]:
+        return {
+            "id": self.next_id(property_managers),
+            "name": self.faker.company(),
+            "address": self.faker.street_address(),
+            "postal_code": self.random.choice(POSTAL_CODES),
+            "city": "HELSINKI",
+            "email": self.faker.email(),
+        }
+
+    #
+    # Housing companies and their contents
+    #
+
+    def housing_company(self) -> Iterator[tuple[Table, list[dict[str, Any]]]]:
+        company_id = self.next_id(companies)
+        completion_date = self.date_between(datetime.date(1985, 1, 1), self.today + datetime.timedelta(days=365))
+        name = f"As Oy {self.faker.last_name()} {company_id}"
+        address = self.faker.street_address()
+
+        yield companies, [
+            {
+                "id": company_id,
+                "official_name": name,
+                "display_name": name,
+                "address": address,
+                "postal_code_code": self.random.choice(POSTAL_CODES),
+                "property_identifier": self.property_identifier(),
+                "acquisition_price": self.random.randint(1_000_000, 20_000_000),
+                "primary_loan": self.random.randint(0, 5_000_000),
+                "construction_time_interest_rate": self.random.choice([6.0, 14.0]),
+                "building_type_code": f"{self.random.randrange(len(BUILDING_TYPES)):03d}",
+                "developer_code": f"{self.random.randrange(10):03d}",
+                "financing_method_code": self.random.choice(self.financing_method_codes),
+                "property_manager_id": self.random.randint(1, self.size.property_managers),
+                "additional_info_key": "HITYHTIO",
+                "last_modified": completion_date,
+                "state_codebook": "HITVAPAUTUS",
+                "state_code": self.random.choices(["001", "002", "003", "004"], weights=[6, 2, 1, 1])[0],
+            }
+        ]
+        yield company_addresses, [
+            {
+                "id": self.next_id(company_addresses),
+                "company_id": company_id,
+                "street_address": self.faker.street_address(),
+            }
+            for _ in range(self.random.randint(0, 2))
+        ]
+        yield real_estates, [
+            {
+                "id": self.next_id(real_estates),
+                "company_id": company_id,
+                "property_identifier": self.property_identifier(),
+            }
+        ]
+
+        for table, rows in self.company_improvements(company_id, completion_date):
+            yield table, rows
+
+        for _ in range(self.size.apartments_per_housing_company):
+            yield from self.apartment(company_id, address, completion_date)
+
+    def company_improvements(
+        self, company_id: int, completion_date: datetime.date
+    ) -> Iterator[tuple[Table, list[dict[str, Any]]]]:
+        for index_table, improvements_table, names in [
+            (construction_price_indices, company_construction_price_indices, CPI_IMPROVEMENTS),
+            (market_price_indices, company_market_price_indices, MPI_IMPROVEMENTS),
+        ]:
+            if completion_date > self.today or self.random.random() < 0.5:
+                continue
+
+            calculation_date = self.date_between(completion_date, self.today)
+            calculation = self.max_price_calculation(index_table, 0, company_id, calculation_date)
+            yield index_table, [calculation]
+            yield improvements_table, [
+                {
+                    "id": self.next_id(improvements_table),
+                    "max_price_index_id": calculation["id"],
+                    "company_id": company_id,
+                    "calculation_date": calculation_date,
+                    "completion_date": self.date_between(completion_date, calculation_date).replace(day=1),
+                    "name": self.random.choice(names),
+                    "value": self.random.randint(10_000, 500_000),
+                }
+                for _ in range(self.random.randint(1, 3))
+            ]
+
+    def apartment(
+        self,
+        company_id: int,
+        address: str,
+        completion_date: datetime.date,
+    ) -> Iterator[tuple[Table, list[dict[str, Any]]]]:
+        apartment_id = self.next_id(apartments)
+        is_completed = completion_date <= self.today
+        purchase_price = self.random.randint(50_000, 400_000)
+        primary_loan_amount = self.random.randint(0, purchase_price // 2)
+        share_number_start = apartment_id * 100 + 1
+
+        sales = self.sales(apartment_id, company_id, completion_date) if is_completed else []
+        purchase_dates = [sale["purchase_date"] for sale in sales if sale["purchase_date"] is not None]
+
+        yield apartments, [
+            {
+                "id": apartment_id,
+                "company_id": company_id,
+                "street_address": address,
+                "stair": self.random.choice("ABC"),
+                "apartment_number": self.random.randint(1, 99),
+                "C_OSOITE": address,
+                "postal_code_code": self.random.choice(POSTAL_CODES),
+                "floor": str(self.random.randint(1, 8)),
+                "rooms": self.random.randint(1, 5),
+                "apartment_type_code": f"{self.random.randrange(len(APARTMENT_TYPES)):03d}",
+                "surface_area": round(self.random.uniform(20, 120), 1),
+                "share_number_start": share_number_start,
+                "share_number_end": share_number_start + self.random.randint(10, 99),
+                "completion_date": completion_date,
+                "debt_free_purchase_price": purchase_price + primary_loan_amount,
+                "purchase_price": purchase_price,
+                "primary_loan_amount": primary_loan_amount,
+                "acquisition_price": purchase_price + primary_loan_amount,
+                "first_purchase_date": min(purchase_dates, default=None),
+                "latest_purchase_date": max(purchase_dates, default=None),
+                "loans_during_construction": self.random.randint(0, primary_loan_amount),
+                "debt_free_purchase_price_during_construction": purchase_price + primary_loan_amount,
+                "additional_info_key": "HITHUONE",
+                "additional_work_during_construction": 0,
+            }
+        ]
+        yield apartment_payments, [
+            {
+                "apartment_id": apartment_id,
+                "KG_MTUNNUS": i + 1,
+                "percentage": percentage,
+                "date": completion_date - datetime.timedelta(days=180 * (3 - i)),
+            }
+            for i, percentage in enumerate([20, 30, 50])
+        ]
+        yield hitas_monitoring, sales
+        yield apartment_ownerships, self.ownerships(apartment_id)
+
+        if is_completed:
+            yield from self.apartment_improvements(apartment_id, company_id, completion_date)
+
+    def sales(self, apartment_id: int, company_id: int, completion_date: datetime.date) -> list[dict[str, Any]]:
+        sales: list[dict[str, Any]] = []
+        purchase_date = completion_date
+        for i in range(self.random.randint(1, 4)):
+            if purchase_date > self.today:
+                break
+
+            buyer_name, buyer_identifier = self.owner()
+            purchase_price = self.random.randint(50_000, 500_000)
+            sales.append(
+                {
+                    "id": self.next_id(hitas_monitoring),
+                    "apartment_id": apartment_id,
+                    "company_id": company_id,
+                    "max_price_index_name": self.random.choice(["RAKINDEKSI", "MHINDEKSI", "RAJAHINTA"]),
+                    "calculation_date": purchase_date - datetime.timedelta(days=30),
+                    "notification_date": purchase_date,
+                    "seller_name": self.faker.name(),
+                    "maximum_price": int(purchase_price * self.random.uniform(1.0, 1.3)),
+                    "purchase_price": purchase_price,
+                    "purchase_date": purchase_date,
+                    "buyer_name_1": buyer_name,
+                    "buyer_identifier_1": buyer_identifier,
+                    "apartment_share_of_housing_company_loans": self.random.randint(0, 50_000),
+                    "C_VALVKOODI": "VALVTILA",
+                    "monitoring_state": (
+                        ApartmentSaleMonitoringState.COMPLETE.value
+                        if i > 0 or self.random.random() < 0.9
+                        else ApartmentSaleMonitoringState.RELATIVE_SALE.value
+                    ),
+                    "C_LISATIETO": "E",
+                    "C_LISATVIITE": "HITVALVO",
+                }
+            )
+            purchase_date = self.date_between(purchase_date, purchase_date + datetime.timedelta(days=365 * 8))
+
+        return sales
+
+    def ownerships(self, apartment_id: int) -> list[dict[str, Any]]:
+        owner_count = self.random.choice([1, 1, 2])
+        return [
+            {
+                "id": self.next_id(apartment_ownerships),
+                "apartment_id": apartment_id,
+                "name": name,
+                "social_security_number": identifier,
+                "C_OMNIMIUPPER": name.upper(),
+                "percentage": 100.0 / owner_count,
+            }
+            for name, identifier in (self.owner() for _ in range(owner_count))
+        ]
+
+    def apartment_improvements(
+        self, apartment_id: int, company_id: int, completion_date: datetime.date
+    ) -> Iterator[tuple[Table, list[dict[str, Any]]]]:
+        for index_table, improvements_table, names in [
+            (construction_price_indices, apartment_construction_price_indices, CPI_IMPROVEMENTS),
+            (market_price_indices, apartment_market_price_indices, MPI_IMPROVEMENTS),
+        ]:
+            if self.random.random() < 0.5:
+                continue
+
+            calculation_date = self.date_between(completion_date, self.today)
+            calculation = self.max_price_calculation(index_table, apartment_id, company_id, calculation_date)
+            yield index_table, [calculation]
+
+            improvements: list[dict[str, Any]] = []
+            for _ in range(self.random.randint(0, 2)):
+                value = self.random.randint(1_000, 50_000)
+                improvement = {
+                    "id": self.next_id(improvements_table),
+                    "max_price_index_id": calculation["id"],
+                    "apartment_id": apartment_id,
+                    "calculation_date": calculation_date,
+                    "completion_date": self.date_between(completion_date, calculation_date).replace(day=1),
+                    "name": self.random.choice(names),
+                    "value": value,
+                    "accepted_value": value * self.random.uniform(0.5, 1.5),
+                    "depreciation_period": HitasDuration.Duration(self.random.randint(1, 30), 1),
+                }
+                if improvements_table is apartment_construction_price_indices:
+                    improvement["depreciation_percentage"] = self.random.choice(["000", "001", "002"])
+                else:
+                    improvement["excess"] = self.random.choice(["000", "004"])
+                improvements.append(improvement)
+
+            yield improvements_table, improvements
+
+    def max_price_calculation(
+        self, index_table: Table, apartment_id: int, company_id: int, calculation_date: datetime.date
+    ) -> dict[str, Any]:
+        return {
+            "id": self.next_id(index_table),
+            "apartment_id": apartment_id,
+            "company_id": company_id,
+            "calculation_date": calculation_date,
+            "max_price": self.random.randint(100_000, 600_000),
+            "last_modified": calculation_date,
+        }
+
+    #
+    # Helpers
+    #
+
+    def owner(self) -> tuple[str, Optional[str]]:
+        # Some owners own many apartments, so that owners are combined like in the real data
+        if self.owners and self.random.random() < 0.2:
+            return self.random.choice(self.owners)
+
+        owner = (f"{self.faker.last_name()}, {self.faker.first_name()}", self.faker.ssn())
+        self.owners.append(owner)
+        return owner
+
+    def property_identifier(self) -> str:
+        return f"091{self.random.randint(1, 99):03d}{self.random.randint(1, 999):04d}{self.random.randint(1, 99):04d}"
+
+    def date_between(self, start: datetime.date, end: datetime.date) -> datetime.date:
+        return start + datetime.timedelta(days=self.random.randint(0, max((end - start).days, 0)))
@@ -1,22 +1,28 @@
 import logging
+import multiprocessing
 import re
 import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import date
 from decimal import Decimal
 from difflib import SequenceMatcher
+from pathlib import Path
 from typing import Callable, Dict, List, Optional, TypeVar
 
 from dateutil.relativedelta import relativedelta
 from django.contrib.auth import get_user_model
 from django.db import connection as django_connection
+from django.db import connections as django_connections
+from django.db import transaction
 from django.db.models import Max, OuterRef, Prefetch, Subquery
 from django.utils import timezone
 from safedelete import HARD_DELETE
-from sqlalchemy import create_engine, desc, func
+from sqlalchemy import Column, Table, desc, func
 from sqlalchemy.engine import LegacyRow
 from sqlalchemy.engine.base import Connection
-from sqlalchemy.sql import select
+from sqlalchemy.sql import Select, select
 
 from hitas.calculations.construction_time_interest import Payment, total_construction_time_interest
 from hitas.models import (
@@ -50,12 +56,14 @@
 from hitas.models.housing_company import HitasType
 from hitas.models.indices import AbstractIndex
 from hitas.models.utils import check_business_id, check_social_security_number
+from hitas.oracle_migration.checkpoint import DEFAULT_CHECKPOINT_PATH, MigrationCheckpoint
 from hitas.oracle_migration.cost_areas import hitas_cost_area, init_cost_areas
 from hitas.oracle_migration.financing_types import (
     FINANCING_METHOD_TO_HITAS_TYPE_MAP,
     strip_financing_method_id,
 )
-from hitas.oracle_migration.globals import anonymize_data, faker, should_anonymize
+from hitas.oracle_migration.globals import anonymize_data, faker, init_worker_process, should_anonymize
+from hitas.oracle_migration.local_database import create_oracle_engine
 from hitas.oracle_migration.oracle_schema import (
     additional_infos,
     apartment_construction_price_indices,
@@ -85,6 +93,7 @@
     str_to_year_month,
     value_to_depreciation_percentage,
 )
+from hitas.services.bulk_load import copy_bulk_create
 from hitas.utils import monthify
 
 logger = logging.getLogger(__name__)
@@ -117,6 +126,68 @@ class OwnerKey:
     name: str
 
 
+class OracleRows:
+    """
+    Child tables of the Oracle database, each loaded with a single query and grouped by their parent id
+    (e.g. apartment id), instead of querying them separately for each apartment.
+    Tables are loaded when first needed and reused by the later steps of the migration.
+    """
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+        self._grouped_rows: dict[str, dict[int, list[LegacyRow]]] = {}
+
+    def payments(self, apartment_id: int) -> list[Payment]:
+        payments = self._grouped("payments", select(apartment_payments), apartment_payments.c.apartment_id)
+        return [
+            Payment(date=payment.date, percentage=Decimal(payment.percentage))
+            for payment in payments.get(apartment_id, [])
+        ]
+
+    def apartment(self, apartment_id: int) -> Optional[LegacyRow]:
+        rows = self._grouped("apartments", select(apartments), apartments.c.id).get(apartment_id)
+        return rows[0] if rows else None
+
+    def apartment_sales(self, apartment_id: int) -> list[LegacyRow]:
+        """All sales of the given apartment, from newest to oldest"""
+        query = (
+            select(hitas_monitoring)
+            .where(
+                hitas_monitoring.c.monitoring_state.in_(
+                    (
+                        ApartmentSaleMonitoringState.ACTIVE.value,
+                        ApartmentSaleMonitoringState.COMPLETE.value,
+                        ApartmentSaleMonitoringState.RELATIVE_SALE.value,
+                    )
+                )
+            )
+            .order_by(desc(hitas_monitoring.c.purchase_date), desc(hitas_monitoring.c.id))
+        )
+        return self._grouped("apartment_sales", query, hitas_monitoring.c.apartment_id).get(apartment_id, [])
+
+    def apartment_improvements(
+        self,
+        index_table: Table,
+        improvements_table: Table,
+        apartment_id: int,
+    ) -> list[LegacyRow]:
+        """Improvements from all maximum price calculations of the given apartment, from newest to oldest"""
+        query = (
+            select(index_table, improvements_table)
+            .join(index_table, (improvements_table.c.max_price_index_id == index_table.c.id))
+            .order_by(desc(index_table.c.calculation_date), desc(index_table.c.id))
+        )
+        return self._grouped(improvements_table.name, query, index_table.c.apartment_id).get(apartment_id, [])
+
+    def _grouped(self, name: str, query: Select, key: Column) -> dict[int, list[LegacyRow]]:
+        if name not in self._grouped_rows:
+            grouped: dict[int, list[LegacyRow]] = defaultdict(list)
+            for row in self.connection.execute(query):
+                grouped[row[key]].append(row)
+            self._grouped_rows[name] = dict(grouped)
+        return self._grouped_rows[name]
+
+
 @dataclass
 class ConvertedData:
     created_housing_companies_by_oracle_id: Dict[int, CreatedHousingCompany] = None
@@ -134,6 +205,17 @@ class ConvertedData:
     owners: Dict[str, Owner] = None
     current_ownerships_by_oracle_apartment_id: dict[int, list[Ownership]] = None
 
+    oracle_rows: OracleRows = None
+
+    def get_oracle_rows(self, connection: Connection) -> OracleRows:
+        if self.oracle_rows is None or self.oracle_rows.connection is not connection:
+            self.oracle_rows = OracleRows(connection)
+        return self.oracle_rows
+
+    def __getstate__(self) -> dict:
+        # Oracle rows are bound to the connection, and are loaded again when needed
+        return {**self.__dict__, "oracle_rows": None}
+
 
 BULK_INSERT_THRESHOLD: int = 1000
 APARTMENTS_WITH_OWNER_CHANGES_WITHOUT_SALES: list[int] = [
@@ -179,6 +261,16 @@ class ConvertedData:
 ]
 
 
+@dataclass
+class MigrationStep:
+    name: str
+    run: Callable[[], None]
+    atomic: bool = True
+    # Removes the partial results of an interrupted step before it is run again. It runs whenever the step is
+    # resumed, since the failed run might not have been atomic even if this one is (e.g. with other '--workers').
+    cleanup: Optional[Callable[[], None]] = None
+
+
 def run(
     oracle_host: str,
     oracle_port: str,
@@ -190,6 +282,10 @@ def run(
     truncate_only: bool,
     minimal_dataset: bool,
     regulated_only: bool,
+    workers: int = 1,
+    resume: bool = False,
+    checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+    oracle_url: Optional[str] = None,
 ) -> None:
     if debug:
         logging.basicConfig()
@@ -202,6 +298,16 @@ def run(
     else:
         logger.info("Creating *REAL* non-anonymized data...\n")
 
+    checkpoint_options = {
+        "anonymize": anonymize,
+        "minimal_dataset": minimal_dataset,
+        "regulated_only": regulated_only,
+    }
+    if resume:
+        checkpoint = MigrationCheckpoint.resume(Path(checkpoint_path), checkpoint_options)
+    else:
+        checkpoint = MigrationCheckpoint.start(Path(checkpoint_path), checkpoint_options)
+
     if truncate or truncate_only:
         logger.info("Removing existing data...\n")
         do_truncate()
@@ -211,92 +317,249 @@ def run(
 
     init_cost_areas()
 
-    converted_data = ConvertedData()
+    converted_data = checkpoint.converted_data or ConvertedData()
 
-    engine = create_engine(
-        f"oracle+cx_oracle://{oracle_user}:{oracle_pw}@{oracle_host}:{oracle_port}/xe?" "encoding=UTF-8&nencoding=UTF-8"
-    )
+    # Given URL can be e.g. a local stand-in for the Oracle database, see 'local_database'
+    if oracle_url is None:
+        oracle_url = (
+            f"oracle+cx_oracle://{oracle_user}:{oracle_pw}@{oracle_host}:{oracle_port}/xe?"
+            "encoding=UTF-8&nencoding=UTF-8"
+        )
+    engine = create_oracle_engine(oracle_url)
 
     with engine.connect() as connection:
         with connection.begin():
-            logger.info(f"Connected to oracle database at {oracle_host}:{oracle_port}.\n")
+            logger.info(f"Connected to oracle database at {engine.url!r}.\n")
+
+            steps = migration_steps(
+                connection,
+                converted_data,
+                oracle_url=oracle_url,
+                workers=workers,
+                anonymize=anonymize,
+                debug=debug,
+                minimal_dataset=minimal_dataset,
+                regulated_only=regulated_only,
+            )
+            run_migration_steps(steps, checkpoint, converted_data, resume)
 
-            # Codebooks by id
-            codebooks_by_id = read_codebooks(connection)
+    MigrationDone.objects.create()
+    checkpoint.delete()
 
-            # Users
-            converted_data.users_by_username = create_users(connection)
 
-            # Codebooks
-            converted_data.building_types_by_code_number = create_codes(
-                codebooks_by_id["TALOTYYPPI"], BuildingType, modify_fn=format_building_type
-            )
-            converted_data.developers_by_code_number = create_codes(
-                codebooks_by_id["RAKENTAJA"], Developer, sensitive=True
-            )
-            converted_data.hitas_types_by_code_number = create_hitas_types(codebooks_by_id["RAHMUOTO"])
+def migration_steps(
+    connection: Connection,
+    converted_data: ConvertedData,
+    *,
+    oracle_url: str,
+    workers: int,
+    anonymize: bool,
+    debug: bool,
+    minimal_dataset: bool,
+    regulated_only: bool,
+) -> list[MigrationStep]:
+    # Codebooks by id
+    codebooks_by_id = read_codebooks(connection)
 
-            converted_data.apartment_types_by_code_number = create_codes(codebooks_by_id["HUONETYYPPI"], ApartmentType)
+    def users() -> None:
+        converted_data.users_by_username = create_users(connection)
 
-            # Indices
-            create_indices(codebooks_by_id["HITASEHIND"], MaximumPriceIndex)
-            create_indices(codebooks_by_id["MARKHINTAIND"], MarketPriceIndex)
-            create_indices(codebooks_by_id["MARKHINTAIND2005"], MarketPriceIndex2005Equal100)
-            create_indices(codebooks_by_id["RAKUSTIND"], ConstructionPriceIndex)
-            create_indices(codebooks_by_id["RAKUSTIND2005"], ConstructionPriceIndex2005Equal100)
-            create_indices(codebooks_by_id["RAJAHINNAT"], SurfaceAreaPriceCeiling)
+    def codebooks() -> None:
+        converted_data.building_types_by_code_number = create_codes(
+            codebooks_by_id["TALOTYYPPI"], BuildingType, modify_fn=format_building_type
+        )
+        converted_data.developers_by_code_number = create_codes(codebooks_by_id["RAKENTAJA"], Developer, sensitive=True)
+        converted_data.hitas_types_by_code_number = create_hitas_types(codebooks_by_id["RAHMUOTO"])
 
-            # Postal codes
-            converted_data.postal_codes_by_postal_code = create_unsaved_postal_codes(codebooks_by_id["POSTINROT"])
+        converted_data.apartment_types_by_code_number = create_codes(codebooks_by_id["HUONETYYPPI"], ApartmentType)
 
-            # Property managers
-            converted_data.property_managers_by_oracle_id = create_property_managers(connection)
+    def indices() -> None:
+        create_indices(codebooks_by_id["HITASEHIND"], MaximumPriceIndex)
+        create_indices(codebooks_by_id["MARKHINTAIND"], MarketPriceIndex)
+        create_indices(codebooks_by_id["MARKHINTAIND2005"], MarketPriceIndex2005Equal100)
+        create_indices(codebooks_by_id["RAKUSTIND"], ConstructionPriceIndex)
+        create_indices(codebooks_by_id["RAKUSTIND2005"], ConstructionPriceIndex2005Equal100)
+        create_indices(codebooks_by_id["RAJAHINNAT"], SurfaceAreaPriceCeiling)
 
-            # Housing companies
-            converted_data.created_housing_companies_by_oracle_id = create_housing_companies(
-                connection, converted_data, minimal_dataset, regulated_only
-            )
+    def property_managers() -> None:
+        converted_data.property_managers_by_oracle_id = create_property_managers(connection)
 
-            # Housing company improvements
-            create_housing_company_improvements(connection, converted_data)
+    def housing_companies() -> None:
+        # Postal codes are saved with the housing companies they are linked to
+        converted_data.postal_codes_by_postal_code = create_unsaved_postal_codes(codebooks_by_id["POSTINROT"])
 
-            # Real estates (and buildings) and apartments
-            converted_data.apartments_by_oracle_id = {}
-            for chc in converted_data.created_housing_companies_by_oracle_id.values():
-                chc.real_estates = create_real_estates_and_buildings(chc.value, chc.addresses, connection)
-                created_building = chc.real_estates[0].buildings[0]
+        converted_data.created_housing_companies_by_oracle_id = create_housing_companies(
+            connection, converted_data, minimal_dataset, regulated_only
+        )
 
-                # Create apartments
-                created_apartments = create_apartments(created_building.value, connection, converted_data)
-                created_building.apartments = created_apartments.values()
-                converted_data.apartments_by_oracle_id.update(created_apartments)
+    def housing_company_contents() -> None:
+        if workers > 1:
+            create_housing_company_contents_in_parallel(oracle_url, converted_data, workers, anonymize, debug)
+        else:
+            create_housing_company_contents(connection, converted_data)
+
+    return [
+        MigrationStep("users", users),
+        MigrationStep("codebooks", codebooks),
+        MigrationStep("indices", indices),
+        MigrationStep("property_managers", property_managers),
+        MigrationStep("housing_companies", housing_companies),
+        MigrationStep(
+            "housing_company_improvements",
+            lambda: create_housing_company_improvements(connection, converted_data),
+        ),
+        # Real estates (and buildings), apartments, apartment improvements
+        # and apartment maximum price calculations.
+        # Worker processes commit their own transactions, so the parallel migration cannot be atomic.
+        MigrationStep(
+            "housing_company_contents",
+            housing_company_contents,
+            atomic=workers <= 1,
+            cleanup=lambda: delete_housing_company_contents(converted_data),
+        ),
+        # Apartment owners
+        MigrationStep("owners_and_ownerships", lambda: create_owners_and_ownerships(connection, converted_data)),
+        # Apartment sales history
+        MigrationStep("apartment_sales", lambda: create_apartment_sales(connection, converted_data)),
+        # Remove apartments owned by housing companies
+        MigrationStep("remove_apartments_owned_by_housing_companies", remove_apartments_owned_by_housing_companies),
+        MigrationStep("recalculate_interests", lambda: recalculate_interests(connection, converted_data)),
+    ]
+
+
+def run_migration_steps(
+    steps: list[MigrationStep],
+    checkpoint: MigrationCheckpoint,
+    converted_data: ConvertedData,
+    resume: bool,
+) -> None:
+    for step in steps:
+        if checkpoint.is_completed(step.name):
+            logger.info(f"Skipping completed step '{step.name}'.\n")
+            continue
 
-            total_real_estates = sum(
-                len(hc.real_estates) for hc in converted_data.created_housing_companies_by_oracle_id.values()
-            )
+        if resume and step.cleanup is not None:
+            step.cleanup()
+
+        if step.atomic:
+            with transaction.atomic():
+                step.run()
+        else:
+            step.run()
 
-            logger.info(f"Loaded {total_real_estates} real estates.\n")
-            logger.info(f"Loaded {total_real_estates} buildings.\n")
-            logger.info(f"Loaded {len(converted_data.apartments_by_oracle_id)} apartments.\n")
+        checkpoint.complete(step.name, converted_data)
 
-            # Apartment improvements
-            create_apartment_improvements(connection, converted_data)
 
-            # Apartment maximum price calculations
-            create_apartment_max_price_calculations(connection, converted_data)
+def create_housing_company_contents(connection: Connection, converted_data: ConvertedData) -> None:
+    """
+    Create real estates, buildings and apartments for the housing companies in 'converted_data',
+    and the improvements and maximum price calculations of the apartments.
+    """
+    converted_data.apartments_by_oracle_id = {}
+    for chc in converted_data.created_housing_companies_by_oracle_id.values():
+        chc.real_estates = create_real_estates_and_buildings(chc.value, chc.addresses, connection)
+        created_building = chc.real_estates[0].buildings[0]
+
+        # Create apartments
+        created_apartments = create_apartments(created_building.value, connection, converted_data)
+        created_building.apartments = list(created_apartments.values())
+        converted_data.apartments_by_oracle_id.update(created_apartments)
+
+    total_real_estates = sum(
+        len(hc.real_estates) for hc in converted_data.created_housing_companies_by_oracle_id.values()
+    )
 
-            # Apartment owners
-            create_owners_and_ownerships(connection, converted_data)
+    logger.info(f"Loaded {total_real_estates} real estates.\n")
+    logger.info(f"Loaded {total_real_estates} buildings.\n")
+    logger.info(f"Loaded {len(converted_data.apartments_by_oracle_id)} apartments.\n")
 
-            # Apartment sales history
-            create_apartment_sales(connection, converted_data)
+    # Apartment improvements
+    create_apartment_improvements(connection, converted_data)
 
-            # Remove apartments owned by housing companies
-            remove_apartments_owned_by_housing_companies()
+    # Apartment maximum price calculations
+    create_apartment_max_price_calculations(connection, converted_data)
 
-            recalculate_interests(connection, converted_data)
 
-    MigrationDone.objects.create()
+def create_housing_company_contents_in_parallel(
+    oracle_url: str,
+    converted_data: ConvertedData,
+    workers: int,
+    anonymize: bool,
+    debug: bool,
+) -> None:
+    """
+    Same as 'create_housing_company_contents', but the housing companies are partitioned across
+    a pool of worker processes, each with its own Oracle and PostgreSQL connection.
+    The housing companies and apartments created by the workers are merged back to 'converted_data'.
+
+    Owners and sales are still created in one process, since owners are combined across housing companies.
+    """
+    housing_companies = sorted(converted_data.created_housing_companies_by_oracle_id.items())
+    partitions = [dict(housing_companies[i::workers]) for i in range(workers)]
+    partitions = [partition for partition in partitions if partition]
+
+    logger.info(f"Migrating {len(housing_companies)} housing companies with {len(partitions)} workers.\n")
+
+    # Worker processes cannot share the database connections of this process
+    django_connections.close_all()
+
+    # Use 'spawn' so that the workers don't inherit the open Oracle connection
+    with ProcessPoolExecutor(
+        max_workers=len(partitions),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker_process,
+        initargs=(anonymize, debug, django_connections["default"].settings_dict["NAME"]),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _create_housing_company_contents_worker,
+                oracle_url,
+                partition,
+                converted_data.apartment_types_by_code_number,
+            )
+            for partition in partitions
+        ]
+        results = [future.result() for future in futures]
+
+    converted_data.apartments_by_oracle_id = {}
+    for created_housing_companies, apartments_by_oracle_id in results:
+        converted_data.created_housing_companies_by_oracle_id.update(created_housing_companies)
+        converted_data.apartments_by_oracle_id.update(apartments_by_oracle_id)
+
+    logger.info(f"Loaded {len(converted_data.apartments_by_oracle_id)} apartments in total.\n")
+
+
+def _create_housing_company_contents_worker(
+    oracle_url: str,
+    created_housing_companies_by_oracle_id: dict[int, CreatedHousingCompany],
+    apartment_types_by_code_number: dict[str, ApartmentType],
+) -> tuple[dict[int, CreatedHousingCompany], dict[int, Apartment]]:
+    converted_data = ConvertedData(
+        created_housing_companies_by_oracle_id=created_housing_companies_by_oracle_id,
+        apartment_types_by_code_number=apartment_types_by_code_number,
+    )
+
+    engine = create_oracle_engine(oracle_url)
+    try:
+        with engine.connect() as connection:
+            with connection.begin():
+                create_housing_company_contents(connection, converted_data)
+    finally:
+        engine.dispose()
+        django_connections.close_all()
+
+    return converted_data.created_housing_companies_by_oracle_id, converted_data.apartments_by_oracle_id
+
+
+def delete_housing_company_contents(converted_data: ConvertedData) -> None:
+    """Remove the real estates, buildings and apartments created for the housing companies in 'converted_data'"""
+    housing_companies = [chc.value for chc in converted_data.created_housing_companies_by_oracle_id.values()]
+    for model_class, lookup in [
+        (Apartment, "building__real_estate__housing_company__in"),
+        (Building, "real_estate__housing_company__in"),
+        (RealEstate, "housing_company__in"),
+    ]:
+        model_class.objects.all_with_deleted().filter(**{lookup: housing_companies}).delete(force_policy=HARD_DELETE)
 
 
 def do_truncate():
@@ -459,7 +722,7 @@ def create_housing_company_improvements(connection: Connection, converted_data:
             count += 1
 
         if len(bulk_cpi) >= BULK_INSERT_THRESHOLD:
-            HousingCompanyConstructionPriceImprovement.objects.bulk_create(bulk_cpi)
+            copy_bulk_create(HousingCompanyConstructionPriceImprovement, bulk_cpi)
             bulk_cpi = []
 
         #
@@ -506,13 +769,13 @@ def create_housing_company_improvements(connection: Connection, converted_data:
             count += 1
 
         if len(bulk_mpi) >= BULK_INSERT_THRESHOLD:
-            HousingCompanyMarketPriceImprovement.objects.bulk_create(bulk_mpi)
+            copy_bulk_create(HousingCompanyMarketPriceImprovement, bulk_mpi)
             bulk_mpi = []
 
     if bulk_cpi:
-        HousingCompanyConstructionPriceImprovement.objects.bulk_create(bulk_cpi)
+        copy_bulk_create(HousingCompanyConstructionPriceImprovement, bulk_cpi)
     if bulk_mpi:
-        HousingCompanyMarketPriceImprovement.objects.bulk_create(bulk_mpi)
+        copy_bulk_create(HousingCompanyMarketPriceImprovement, bulk_mpi)
 
     logger.info(f"Loaded {count} housing company improvements.\n")
 
@@ -550,14 +813,7 @@ def create_real_estates_and_buildings(
 def create_apartments(
     building: Building, connection: Connection, converted_data: ConvertedData
 ) -> Dict[int, Apartment]:
-    def fetch_payments(connection: Connection, apartment_id: int):
-        retval = []
-        for payment in connection.execute(
-            select(apartment_payments).where(apartment_payments.c.apartment_id == apartment_id)
-        ).fetchall():
-            retval.append(Payment(date=payment.date, percentage=Decimal(payment.percentage)))
-        return retval
-
+    oracle_rows = converted_data.get_oracle_rows(connection)
     apartments_by_id = {}
     bulk_apartments = []
 
@@ -580,12 +836,13 @@ def fetch_payments(connection: Connection, apartment_id: int):
         new.loans_during_construction = apartment["loans_during_construction"]
 
         if apartment["completion_date"]:
+            payments = oracle_rows.payments(apartment["id"])
             new.interest_during_construction_mpi = total_construction_time_interest(
                 loan_rate=Decimal(6.0),
                 apartment_completion_date=apartment["completion_date"],
                 apartment_transfer_price=Decimal(apartment["debt_free_purchase_price"]),
                 apartment_loans_during_construction=Decimal(apartment["loans_during_construction"]),
-                payments=fetch_payments(connection, apartment["id"]),
+                payments=payments,
             )
 
             new.interest_during_construction_cpi = total_construction_time_interest(
@@ -593,7 +850,7 @@ def fetch_payments(connection: Connection, apartment_id: int):
                 apartment_completion_date=apartment["completion_date"],
                 apartment_transfer_price=Decimal(apartment["debt_free_purchase_price"]),
                 apartment_loans_during_construction=Decimal(apartment["loans_during_construction"]),
-                payments=fetch_payments(connection, apartment["id"]),
+                payments=payments,
             )
 
         new.debt_free_purchase_price_during_construction = apartment["debt_free_purchase_price_during_construction"]
@@ -607,13 +864,13 @@ def fetch_payments(connection: Connection, apartment_id: int):
         bulk_apartments.append(new)
 
         if len(bulk_apartments) == BULK_INSERT_THRESHOLD:
-            Apartment.objects.bulk_create(bulk_apartments)
+            copy_bulk_create(Apartment, bulk_apartments)
             bulk_apartments = []
 
         apartments_by_id[apartment[apartments.c.id]] = new
 
     if len(bulk_apartments):
-        Apartment.objects.bulk_create(bulk_apartments)
+        copy_bulk_create(Apartment, bulk_apartments)
 
     return apartments_by_id
 
@@ -624,19 +881,11 @@ def create_apartment_improvements(connection: Connection, converted_data: Conver
     Detect improvements that are 'Additional work during construction' and move their values to the Apartment model
     """
 
+    oracle_rows = converted_data.get_oracle_rows(connection)
+
     def get_latest_improvements(index_table, improvements_table, apartment_oracle_id):
         # Get all calculations that have improvements
-        improvements_list = list(
-            connection.execute(
-                select(index_table, improvements_table)
-                .join(
-                    index_table,
-                    (improvements_table.c.max_price_index_id == index_table.c.id),
-                )
-                .where(index_table.c.apartment_id == apartment_oracle_id and improvements_table.c.value > 0)
-                .order_by(desc(index_table.c.calculation_date), desc(index_table.c.id))
-            )
-        )
+        improvements_list = oracle_rows.apartment_improvements(index_table, improvements_table, apartment_oracle_id)
 
         if not improvements_list:
             return []
@@ -699,7 +948,7 @@ def is_date_within_one_month(date1: date, date2: date):
             count += 1
 
         if len(bulk_cpi) >= BULK_INSERT_THRESHOLD:
-            ApartmentConstructionPriceImprovement.objects.bulk_create(bulk_cpi)
+            copy_bulk_create(ApartmentConstructionPriceImprovement, bulk_cpi)
             bulk_cpi = []
 
         #
@@ -738,7 +987,7 @@ def is_date_within_one_month(date1: date, date2: date):
             bulk_mpi.append(new)
             count += 1
         if len(bulk_mpi) >= BULK_INSERT_THRESHOLD:
-            ApartmentMarketPriceImprovement.objects.bulk_create(bulk_mpi)
+            copy_bulk_create(ApartmentMarketPriceImprovement, bulk_mpi)
             bulk_mpi = []
 
         #
@@ -777,9 +1026,9 @@ def is_date_within_one_month(date1: date, date2: date):
         v.save()
 
     if bulk_cpi:
-        ApartmentConstructionPriceImprovement.objects.bulk_create(bulk_cpi)
+        copy_bulk_create(ApartmentConstructionPriceImprovement, bulk_cpi)
     if bulk_mpi:
-        ApartmentMarketPriceImprovement.objects.bulk_create(bulk_mpi)
+        copy_bulk_create(ApartmentMarketPriceImprovement, bulk_mpi)
 
     logger.info(f"Loaded {count} apartment improvements.\n")
 
@@ -866,11 +1115,11 @@ def create_owner(_ownership: apartment_ownerships) -> tuple[Owner, bool]:
         converted_data.current_ownerships_by_oracle_apartment_id[ownership["apartment_id"]].append(new)
 
         if len(bulk_owners) == BULK_INSERT_THRESHOLD:
-            Owner.objects.bulk_create(bulk_owners)
+            copy_bulk_create(Owner, bulk_owners)
             bulk_owners = []
 
     if len(bulk_owners):
-        Owner.objects.bulk_create(bulk_owners)
+        copy_bulk_create(Owner, bulk_owners)
 
     converted_data.owners = already_created
     logger.info(f"Loaded {count} owners.\n")
@@ -1026,13 +1275,7 @@ def create_hitas_types(financing_methods: List[LegacyRow]) -> dict[str, HitasTyp
 
 
 def recalculate_interests(connection, converted_data):
-    def fetch_payments(apartment_id: int):
-        retval = []
-        for payment in connection.execute(
-            select(apartment_payments).where(apartment_payments.c.apartment_id == apartment_id)
-        ).fetchall():
-            retval.append(Payment(date=payment.date, percentage=Decimal(payment.percentage)))
-        return retval
+    oracle_rows = converted_data.get_oracle_rows(connection)
 
     for _apartment_oracle_id, apartment in converted_data.apartments_by_oracle_id.items():
         first_sale = apartment.first_sale()
@@ -1053,7 +1296,7 @@ def fetch_payments(apartment_id: int):
                 apartment_completion_date=first_sale.purchase_date,
                 apartment_transfer_price=first_sale.purchase_price,
                 apartment_loans_during_construction=apartment.loans_during_construction,
-                payments=fetch_payments(_apartment_oracle_id),
+                payments=oracle_rows.payments(_apartment_oracle_id),
             )
 
             apartment.interest_during_construction_cpi = interest
@@ -1062,27 +1305,7 @@ def fetch_payments(apartment_id: int):
 
 # @prints_to_file("log.txt")
 def create_apartment_sales(connection: Connection, converted_data: ConvertedData) -> None:  # noqa: C901
-    def get_oracle_apartment(_apartment_oracle_id: int) -> apartments:
-        return connection.execute(select(apartments).where(apartments.c.id == _apartment_oracle_id)).first()
-
-    def get_all_apartment_sales(_apartment_oracle_id: int) -> list[hitas_monitoring]:
-        """Fetch all sales for given apartment"""
-        return list(
-            connection.execute(
-                select(hitas_monitoring)
-                .where(hitas_monitoring.c.apartment_id == _apartment_oracle_id)
-                .where(
-                    hitas_monitoring.c.monitoring_state.in_(
-                        (
-                            ApartmentSaleMonitoringState.ACTIVE.value,
-                            ApartmentSaleMonitoringState.COMPLETE.value,
-                            ApartmentSaleMonitoringState.RELATIVE_SALE.value,
-                        )
-                    )
-                )
-                .order_by(desc(hitas_monitoring.c.purchase_date), desc(hitas_monitoring.c.id))
-            )
-        )
+    oracle_rows = converted_data.get_oracle_rows(connection)
 
     def create_ownerships_for_buyers(_oracle_sale: hitas_monitoring, _sale: ApartmentSale) -> list[Ownership]:
         """Get buyers (Owner) from already converted data, or create new ones."""
@@ -1162,8 +1385,8 @@ def create_ownerships_for_buyers(_oracle_sale: hitas_monitoring, _sale: Apartmen
     bulk_ownerships: list[Ownership] = []
 
     for apartment_oracle_id, apartment in converted_data.apartments_by_oracle_id.items():
-        oracle_apartment = get_oracle_apartment(apartment_oracle_id)
-        oracle_sales = get_all_apartment_sales(apartment_oracle_id)
+        oracle_apartment = oracle_rows.apartment(apartment_oracle_id)
+        oracle_sales = oracle_rows.apartment_sales(apartment_oracle_id)
         latest_owners = converted_data.current_ownerships_by_oracle_apartment_id.pop(apartment_oracle_id, None)
 
         sales: dict[tuple[int, date], ApartmentSale] = {}
@@ -1572,17 +1795,17 @@ def create_ownerships_for_buyers(_oracle_sale: hitas_monitoring, _sale: Apartmen
         bulk_ownerships += [ownership for sale_ownerships in ownerships.values() for ownership in sale_ownerships]
 
         if max(len(bulk_apartment_sales), len(bulk_owners), len(bulk_ownerships)) >= BULK_INSERT_THRESHOLD:
-            ApartmentSale.objects.bulk_create(bulk_apartment_sales)
-            Owner.objects.bulk_create(bulk_owners)
-            Ownership.objects.bulk_create(bulk_ownerships)
+            copy_bulk_create(ApartmentSale, bulk_apartment_sales)
+            copy_bulk_create(Owner, bulk_owners)
+            copy_bulk_create(Ownership, bulk_ownerships)
             bulk_apartment_sales = []
             bulk_owners = []
             bulk_ownerships = []
 
     if len(bulk_apartment_sales) or len(bulk_owners) or len(bulk_ownerships):
-        ApartmentSale.objects.bulk_create(bulk_apartment_sales)
-        Owner.objects.bulk_create(bulk_owners)
-        Ownership.objects.bulk_create(bulk_ownerships)
+        copy_bulk_create(ApartmentSale, bulk_apartment_sales)
+        copy_bulk_create(Owner, bulk_owners)
+        copy_bulk_create(Ownership, bulk_ownerships)
 
     logger.info("\n----------------------------------------------------------------------------------------\n\n")
     logger.info(f"Loaded {count} apartment sales.")
@@ -0,0 +1,89 @@
+import cProfile
+import logging
+import marshal
+import pstats
+import re
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from users.permissions import IsAdminOrHasRequiredADGroups
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Hitas-Profile"
+PROFILE_QUERY_PARAM = "_profile"
+PROFILE_FILE_HEADER = "X-Hitas-Profile-File"
+
+
+class RequestProfilerMiddleware:
+    """
+    Profile single requests on demand with cProfile.
+
+    Profiling is requested with the 'X-Hitas-Profile' header or the '_profile' query parameter.
+    The value 'download' returns the profile as the response instead of the actual response,
+    any other value saves the profile to 'REQUEST_PROFILING_DIR'. Only staff users are allowed to profile requests.
+
+    The profile can be inspected e.g. with 'python -m pstats <file>' or 'snakeviz <file>'.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        mode = request.headers.get(PROFILE_HEADER) or request.GET.get(PROFILE_QUERY_PARAM)
+        if not mode or not self._is_allowed(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        filename = self._filename(request)
+        stats = pstats.Stats(profiler)
+
+        if mode == "download":
+            response = HttpResponse(marshal.dumps(stats.stats), content_type="application/octet-stream")
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+
+        profile_dir = Path(settings.REQUEST_PROFILING_DIR)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(profile_dir / filename)
+        logger.info(f"Request profile saved to {str(profile_dir / filename)!r}")
+
+        response[PROFILE_FILE_HEADER] = filename
+        return response
+
+    @staticmethod
+    def _is_allowed(request: HttpRequest) -> bool:
+        # Authentication is normally done by DRF in the view, so authenticate the request here
+        # with the same authenticators to find out who is asking for the profile.
+        drf_request = Request(
+            request,
+            authenticators=[authenticator() for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        try:
+            user = drf_request.user
+        except APIException:
+            return False
+
+        if user is None or not user.is_authenticated or not user.is_staff:
+            return False
+
+        return IsAdminOrHasRequiredADGroups().has_permission(drf_request, view=None)
+
+    @staticmethod
+    def _filename(request: HttpRequest) -> str:
+        path = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-") or "root"
+        timestamp = timezone.now().strftime("%Y%m%d-%H%M%S-%f")
+        return f"{timestamp}-{request.method}-{path[:100]}.prof"
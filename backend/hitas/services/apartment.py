@@ -3,11 +3,12 @@
 from uuid import UUID
 
 from django.db import models
-from django.db.models import F, OuterRef, Prefetch, QuerySet, Subquery, Sum, Value
-from django.db.models.functions import Cast, Coalesce, TruncMonth
+from django.db.models import Case, Exists, F, OuterRef, Prefetch, Q, QuerySet, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Greatest, TruncMonth
 
 from hitas.exceptions import HitasModelNotFound
 from hitas.models import (
+    ConditionOfSale,
     ConstructionPriceIndex,
     ConstructionPriceIndex2005Equal100,
     HousingCompany,
@@ -17,8 +18,9 @@
 from hitas.models._base import HitasModelDecimalField
 from hitas.models.apartment import Apartment
 from hitas.models.apartment_sale import ApartmentSale
+from hitas.models.condition_of_sale import GracePeriod
 from hitas.models.housing_company import HitasType
-from hitas.utils import SQSum, monthify, subquery_first_id
+from hitas.utils import AddMonths, SQSum, monthify, subquery_first_id
 
 
 def prefetch_first_sale(lookup_prefix: str = "", ignore: Collection = ()) -> Prefetch:
@@ -205,6 +207,55 @@ def get_latest_sale_purchase_date(apartment_id: str | int, *, include_first_sale
     return queryset.first()
 
 
+def _latest_sale_conditions_of_sale(apartment_id: str) -> QuerySet[ConditionOfSale]:
+    """Unfulfilled conditions of sale on the ownerships of the latest sale of the apartment in the outer query."""
+    latest_sale_id = Subquery(
+        ApartmentSale.objects.filter(apartment_id=OuterRef(OuterRef(apartment_id)))
+        .order_by("-purchase_date", "-id")
+        .values_list("id", flat=True)[:1]
+    )
+    return ConditionOfSale.objects.filter(
+        Q(new_ownership__sale_id=latest_sale_id, new_ownership__deleted__isnull=True)
+        | Q(old_ownership__sale_id=latest_sale_id, old_ownership__deleted__isnull=True)
+    )
+
+
+def get_sell_by_date(apartment_id: str) -> Subquery:
+    """
+    Earliest sell by date of the conditions of sale of the apartment in the outer query.
+    Same as 'Apartment.sell_by_date' and 'ConditionOfSale.sell_by_date', but calculated in the database.
+    """
+    completion_date = F("new_ownership__sale__apartment__completion_date")
+    first_purchase_date = get_first_sale_purchase_date("new_ownership__sale__apartment__id")
+    # If apartment was sold after it was completed, the sell by date is calculated based on first sale date.
+    sell_by_date = Greatest(completion_date, Coalesce(first_purchase_date, completion_date))
+
+    queryset = (
+        _latest_sale_conditions_of_sale(apartment_id)
+        # If the apartment has not been completed, there is no sell by date yet.
+        .filter(new_ownership__sale__apartment__completion_date__isnull=False)
+        .annotate(
+            _sell_by_date=Case(
+                When(grace_period=GracePeriod.THREE_MONTHS, then=AddMonths(sell_by_date, 3)),
+                When(grace_period=GracePeriod.SIX_MONTHS, then=AddMonths(sell_by_date, 6)),
+                default=sell_by_date,
+                output_field=models.DateField(),
+            ),
+        )
+        .order_by("_sell_by_date")
+        .values_list("_sell_by_date", flat=True)
+    )
+    return Subquery(queryset=queryset[:1], output_field=models.DateField(null=True))
+
+
+def get_has_grace_period(apartment_id: str) -> Exists:
+    """
+    Does the apartment in the outer query have conditions of sale with a grace period?
+    Same as 'Apartment.has_grace_period', but calculated in the database.
+    """
+    return Exists(_latest_sale_conditions_of_sale(apartment_id).exclude(grace_period=GracePeriod.NOT_GIVEN))
+
+
 def aggregate_catalog_prices_where_no_sales() -> Coalesce:
     """Add up catalog prices for apartments which do not have any sales."""
     return Coalesce(
@@ -1,14 +1,25 @@
 import datetime
+import gzip
 import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
 from typing import TYPE_CHECKING, Iterable, Literal, Optional, TypeAlias, overload
 
+from auditlog.diff import get_field_value, get_mask_function, track_field
 from auditlog.models import LogEntry
+from auditlog.registry import auditlog
+from dateutil.relativedelta import relativedelta
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import sql
 from django.db.models import DateTimeField, OuterRef, Subquery
+from django.utils import timezone
 from django.utils.encoding import smart_str
 
 if TYPE_CHECKING:
     from hitas.models._base import AuditLogAdditionalDataT, HitasModel, HitasSafeDeleteModel
+    from hitas.models.audit_log import LastModified
 
 
 logger = logging.getLogger(__name__)
@@ -19,13 +30,54 @@
 NewValue: TypeAlias = str
 
 
+def mask_fully(value: str) -> str:
+    """
+    Mask the whole value instead of just the first half like the default 'auditlog.diff.mask_str'.
+    Use with `auditlog.register(MODEL, mask_fields=[...], mask_callable=...)`.
+    """
+    # Empty values don't need masking
+    if value == "None":
+        return value
+    return "*" * len(value)
+
+
+def mask_changes(
+    model: type["HitasModel"] | type["HitasSafeDeleteModel"],
+    changes: dict[PK, Optional[dict[FieldName, tuple[OldValue, NewValue]]]],
+) -> dict[PK, Optional[dict[FieldName, tuple[OldValue, NewValue]]]]:
+    """Mask the fields defined in `auditlog.register(MODEL, mask_fields=[...])` in the given changes."""
+    model_fields = auditlog.get_model_fields(model)
+    mask_fields: set[str] = set(model_fields["mask_fields"])
+    if not mask_fields:
+        return changes
+
+    mask = get_mask_function(model_fields.get("mask_callable"))
+    return {
+        pk: (
+            {
+                field: (mask(values[0]), mask(values[1])) if field in mask_fields else values
+                for field, values in diff.items()
+            }
+            if diff is not None
+            else None
+        )
+        for pk, diff in changes.items()
+    }
+
+
 def bulk_create_log_entries(
     objs: Iterable["HitasSafeDeleteModel"],
     action: Literal[0, 1, 2, 3],
-    changes: dict[PK, dict[FieldName, tuple[OldValue, NewValue]]],
+    changes: dict[PK, Optional[dict[FieldName, tuple[OldValue, NewValue]]]],
 ) -> list[LogEntry]:
-    """Adapted from 'auditlog.models.LogEntryManager.log_create'."""
+    """
+    Adapted from 'auditlog.models.LogEntryManager.log_create'.
 
+    The given changes should not be masked, masking is done here when the log entries are created.
+    """
+
+    content_types: dict[type, ContentType] = {}
+    masked_changes: dict[type, dict[PK, Optional[dict[FieldName, tuple[OldValue, NewValue]]]]] = {}
     log_entries: list[LogEntry] = []
     for obj in objs:
         pk = LogEntry.objects._get_pk_value(obj)
@@ -33,74 +85,187 @@ def bulk_create_log_entries(
         if pk not in changes:
             continue
 
+        model = type(obj)
+        if model not in masked_changes:
+            masked_changes[model] = mask_changes(model, changes) if auditlog.contains(model) else changes
+
         get_additional_data = getattr(obj, "get_additional_data", None)
         additional_data: Optional[AuditLogAdditionalDataT]
         additional_data = get_additional_data() if callable(get_additional_data) else None
         serialized_data = LogEntry.objects._get_serialized_data_or_none(obj)
 
+        content_type = content_types.get(model)
+        if content_type is None:
+            content_type = content_types[model] = ContentType.objects.get_for_model(obj)
+
         log_entries.append(
             LogEntry(
-                content_type=ContentType.objects.get_for_model(obj),
+                content_type=content_type,
                 object_pk=pk,
                 object_id=pk if isinstance(pk, int) else None,
                 object_repr=smart_str(obj),
                 action=action,
-                changes=changes[obj.pk],
+                changes=masked_changes[model][pk],
                 serialized_data=serialized_data,
                 additional_data=additional_data,
             )
         )
 
-    return LogEntry.objects.bulk_create(log_entries, ignore_conflicts=True)
+    log_entries = LogEntry.objects.bulk_create(log_entries, ignore_conflicts=True)
+    update_last_modified(log_entries)
+    return log_entries
+
+
+def bulk_model_instance_diff(
+    objs: list["HitasModel"] | list["HitasSafeDeleteModel"],
+) -> dict[PK, Optional[dict[FieldName, tuple[OldValue, NewValue]]]]:
+    """
+    Same as 'auditlog.diff.model_instance_diff(None, obj)' for each of the given newly created objects
+    of the same model, but the tracked fields are resolved only once for all the objects.
+    Unlike 'model_instance_diff', the changes are not masked, since 'bulk_create_log_entries' masks them.
+    """
+    if not objs:
+        return {}
+
+    model = type(objs[0])
+    model_fields = auditlog.get_model_fields(model)
+    fields = [field for field in model._meta.get_fields() if track_field(field)]
+    if model_fields["include_fields"]:
+        fields = [field for field in fields if field.name in model_fields["include_fields"]]
+    if model_fields["exclude_fields"]:
+        fields = [field for field in fields if field.name not in model_fields["exclude_fields"]]
+
+    # The old value of every field is 'None' for created objects
+    empty: OldValue = smart_str(None)
+
+    changes: dict[PK, Optional[dict[FieldName, tuple[OldValue, NewValue]]]] = {}
+    for obj in objs:
+        diff: dict[FieldName, tuple[OldValue, NewValue]] = {}
+        for field in fields:
+            value = get_field_value(obj, field)
+            if value is not None:
+                diff[field.name] = (empty, smart_str(value))
+        changes[obj.pk] = diff or None
+
+    return changes
+
+
+# Last modified info is kept per field only for these fields ('app_label', 'model'): 'field names'.
+# The info for the whole object is kept for all objects.
+LAST_MODIFIED_FIELDS: dict[tuple[str, str], tuple[FieldName, ...]] = {
+    ("hitas", "housingcompany"): ("property_manager",),
+}
+# Postgres allows at most 65535 query parameters, each row has five
+LAST_MODIFIED_BATCH_SIZE = 5000
+
+
+def update_last_modified(log_entries: Iterable[LogEntry]) -> None:
+    """
+    Update the last modified projection ('hitas.models.LastModified') from the given newly written log entries.
+    Rows are only moved forward in time, so the order in which the log entries are written does not matter.
+    """
+    from hitas.models.audit_log import LastModified
+
+    latest: dict[tuple[int, int, FieldName], tuple[datetime.datetime, Optional[int]]] = {}
+    for log_entry in log_entries:
+        # Reading an object does not modify it, and objects without an integer primary key are not tracked
+        if log_entry.action == LogEntry.Action.ACCESS or log_entry.object_id is None:
+            continue
+
+        fields: list[FieldName] = [""]
+        content_type = ContentType.objects.get_for_id(log_entry.content_type_id)
+        for field in LAST_MODIFIED_FIELDS.get((content_type.app_label, content_type.model), ()):
+            values = (log_entry.changes or {}).get(field)
+            # Ignore cases where the field was not actually changed
+            if values is not None and values[0] != values[1]:
+                fields.append(field)
+
+        for field in fields:
+            key = (log_entry.content_type_id, log_entry.object_id, field)
+            if key not in latest or latest[key][0] <= log_entry.timestamp:
+                latest[key] = (log_entry.timestamp, log_entry.actor_id)
+
+    query = """
+        INSERT INTO {table} (content_type_id, object_id, field, "timestamp", actor_id) VALUES {values}
+        ON CONFLICT (content_type_id, object_id, field) DO UPDATE
+        SET "timestamp" = EXCLUDED."timestamp", actor_id = EXCLUDED.actor_id
+        WHERE {table}."timestamp" <= EXCLUDED."timestamp"
+    """
+    rows = list(latest.items())
+    with connection.cursor() as cursor:
+        for i in range(0, len(rows), LAST_MODIFIED_BATCH_SIZE):
+            batch = rows[i : i + LAST_MODIFIED_BATCH_SIZE]
+            params: list = []
+            for (content_type_id, object_id, field), (timestamp, actor_id) in batch:
+                params += [content_type_id, object_id, field, timestamp, actor_id]
+            values = sql.SQL(", ").join([sql.SQL("(%s, %s, %s, %s, %s)")] * len(batch))
+            cursor.execute(_compose(cursor, query, table=LastModified._meta.db_table, values=values), params)
 
 
 @overload
-def get_last_modified(
+def last_modified(
     model: type["HitasModel"] | type["HitasSafeDeleteModel"],
     *,
     model_id: str,
-    **kwargs: dict,
+    field: FieldName = "",
 ) -> Subquery: ...
 
 
 @overload
-def get_last_modified(
+def last_modified(
     model: type["HitasModel"] | type["HitasSafeDeleteModel"],
     *,
     model_id: int,
-    **kwargs: dict,
-) -> Optional[datetime.date]: ...
+    field: FieldName = "",
+) -> Optional[datetime.datetime]: ...
 
 
 def last_modified(
     model: type["HitasModel"] | type["HitasSafeDeleteModel"],
     *,
     model_id: str | int,
-    **kwargs: dict,
+    field: FieldName = "",
 ):
     """
-    Return the timestamp for the last audit log for the given model object
-    (optionally filtered by `changes__*`).
+    Return the timestamp for the last modification of the given model object, or one of its fields
+    (see `LAST_MODIFIED_FIELDS`). If `model_id` is the name of a field, return a subquery for annotations.
     """
-    changes_filters = {}
-    for key, value in kwargs.items():
-        if key.startswith("changes__"):
-            changes_filters[key] = value
+    from hitas.models.audit_log import LastModified
+
     subquery = isinstance(model_id, str)
-    queryset = (
-        LogEntry.objects.filter(
-            content_type=ContentType.objects.get_for_model(model),
-            object_id=OuterRef(model_id) if subquery else model_id,
-            **changes_filters,
-        )
-        .order_by("-timestamp")
-        .values_list("timestamp", flat=True)
-    )
+    queryset = LastModified.objects.filter(
+        content_type=ContentType.objects.get_for_model(model),
+        object_id=OuterRef(model_id) if subquery else model_id,
+        field=field,
+    ).values_list("timestamp", flat=True)
     if subquery:
         return Subquery(queryset=queryset[:1], output_field=DateTimeField(null=True))
     return queryset.first()
 
 
+def last_modified_entry(
+    model: type["HitasModel"] | type["HitasSafeDeleteModel"],
+    *,
+    model_id: int,
+    field: FieldName = "",
+) -> Optional["LastModified"]:
+    """
+    Return the timestamp and the actor of the last modification of the given model object,
+    or one of its fields (see `LAST_MODIFIED_FIELDS`).
+    """
+    from hitas.models.audit_log import LastModified
+
+    return (
+        LastModified.objects.select_related("actor")
+        .filter(
+            content_type=ContentType.objects.get_for_model(model),
+            object_id=model_id,
+            field=field,
+        )
+        .first()
+    )
+
+
 def last_log(
     model: type["HitasModel"] | type["HitasSafeDeleteModel"],
     *,
@@ -122,3 +287,160 @@ def last_log(
         .order_by("-timestamp")
         .first()
     )
+
+
+LOG_ENTRY_TABLE = "auditlog_logentry"
+LOG_ENTRY_DEFAULT_PARTITION = "auditlog_logentry_default"
+
+
+@dataclass
+class LogEntryPartition:
+    name: str
+    # None for 'MINVALUE' lower bounds and for the default partition
+    start: Optional[datetime.datetime]
+    end: Optional[datetime.datetime]
+    is_default: bool = False
+
+
+def _parse_partition_bound(bound: str) -> tuple[Optional[datetime.datetime], Optional[datetime.datetime], bool]:
+    """
+    Parse a range partition bound from 'pg_get_expr(relpartbound, oid)', e.g.
+    "FOR VALUES FROM ('2024-01-01 00:00:00+00') TO ('2024-02-01 00:00:00+00')" or "DEFAULT".
+    """
+    if bound == "DEFAULT":
+        return None, None, True
+
+    match = re.fullmatch(r"FOR VALUES FROM \((.+)\) TO \((.+)\)", bound)
+    if match is None:
+        raise ValueError(f"Unsupported partition bound: {bound!r}")
+
+    def to_datetime(value: str) -> Optional[datetime.datetime]:
+        if value in ("MINVALUE", "MAXVALUE"):
+            return None
+        return datetime.datetime.fromisoformat(value.strip("'"))
+
+    return to_datetime(match.group(1)), to_datetime(match.group(2)), False
+
+
+def log_entries_are_partitioned() -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [LOG_ENTRY_TABLE])
+        return cursor.fetchone() == ("p",)
+
+
+def find_log_entry_partitions() -> list[LogEntryPartition]:
+    """Find the partitions of the audit log table, ordered by their range."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+            JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+            WHERE parent.relname = %s
+            """,
+            [LOG_ENTRY_TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = [LogEntryPartition(name, *_parse_partition_bound(bound)) for name, bound in rows]
+    return sorted(
+        partitions,
+        key=lambda p: (p.is_default, p.start or datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)),
+    )
+
+
+def create_log_entry_partitions(months_ahead: int) -> list[str]:
+    """
+    Create monthly audit log partitions from the current month until 'months_ahead' months from now.
+    Entries that have already been written to the default partition for these months are moved to the new partitions.
+    """
+    partitions = find_log_entry_partitions()
+    latest_end = max((p.end for p in partitions if p.end is not None), default=None)
+    has_default = any(p.is_default for p in partitions)
+
+    now = timezone.now().astimezone(datetime.timezone.utc)
+    this_month = datetime.datetime.combine(now.date().replace(day=1), datetime.time.min, tzinfo=datetime.timezone.utc)
+    created: list[str] = []
+    for i in range(months_ahead + 1):
+        start = this_month + relativedelta(months=i)
+        end = start + relativedelta(months=1)
+        if latest_end is not None and start < latest_end:
+            continue
+
+        name = f"{LOG_ENTRY_TABLE}_p{start:%Y%m}"
+        with transaction.atomic(), connection.cursor() as cursor:
+            move_from_default = False
+            if has_default:
+                query = """
+                    SELECT EXISTS (
+                        SELECT 1 FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s
+                    )
+                """
+                cursor.execute(_compose(cursor, query, default=LOG_ENTRY_DEFAULT_PARTITION), [start, end])
+                move_from_default = cursor.fetchone()[0]
+
+            # A new partition can't be created if the default partition has rows for its range
+            if move_from_default:
+                cursor.execute(f"ALTER TABLE {LOG_ENTRY_TABLE} DETACH PARTITION {LOG_ENTRY_DEFAULT_PARTITION}")
+
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF {LOG_ENTRY_TABLE} FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+
+            if move_from_default:
+                query = """
+                    WITH moved AS (
+                        DELETE FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *
+                    )
+                    INSERT INTO {table} SELECT * FROM moved
+                """
+                cursor.execute(
+                    _compose(cursor, query, default=LOG_ENTRY_DEFAULT_PARTITION, table=LOG_ENTRY_TABLE),
+                    [start, end],
+                )
+                cursor.execute(f"ALTER TABLE {LOG_ENTRY_TABLE} ATTACH PARTITION {LOG_ENTRY_DEFAULT_PARTITION} DEFAULT")
+
+        logger.info(f"Created audit log partition {name!r}")
+        created.append(name)
+        latest_end = end
+
+    return created
+
+
+def archive_log_entry_partitions(before: datetime.date, output_dir: Optional[Path], drop: bool) -> list[str]:
+    """
+    Detach the audit log partitions that only contain entries from before the given date.
+    Detached partitions are optionally exported as gzipped CSV files to 'output_dir' and dropped.
+    """
+    limit = datetime.datetime.combine(before, datetime.time.min, tzinfo=datetime.timezone.utc)
+    archived: list[str] = []
+    for partition in find_log_entry_partitions():
+        if partition.is_default or partition.end is None or partition.end > limit:
+            continue
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {LOG_ENTRY_TABLE} DETACH PARTITION {partition.name}")
+
+            if output_dir is not None:
+                path = output_dir / f"{partition.name}.csv.gz"
+                with gzip.open(path, "wt", encoding="utf-8") as f:
+                    cursor.copy_expert(f"COPY {partition.name} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+                logger.info(f"Exported audit log partition {partition.name!r} to {str(path)!r}")
+
+            if drop:
+                cursor.execute(f"DROP TABLE {partition.name}")
+
+        logger.info(f"Archived audit log partition {partition.name!r}")
+        archived.append(partition.name)
+
+    return archived
+
+
+def _compose(cursor, query: str, **parts: str | sql.Composable) -> str:
+    """Format the given parts into the query. Strings are quoted as identifiers, e.g. table names."""
+    formatted = sql.SQL(query).format(
+        **{name: sql.Identifier(part) if isinstance(part, str) else part for name, part in parts.items()},
+    )
+    return formatted.as_string(cursor.cursor)
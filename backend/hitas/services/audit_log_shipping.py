@@ -0,0 +1,342 @@
+import datetime
+import json
+import logging
+import threading
+import time
+from abc import abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from auditlog.models import LogEntry
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from elasticsearch import ApiError, TransportError
+from resilient_logger.sources import AbstractLogSource, DjangoAuditLogSource
+from resilient_logger.targets import AbstractLogTarget, ElasticsearchLogTarget
+from resilient_logger.utils import content_hash, dynamic_class, get_resilient_logger_config
+
+from hitas.models.audit_log import AuditLogShippingWatermark
+
+logger = logging.getLogger(__name__)
+
+EntryId = str | int
+
+# Elasticsearch responses that mean the request should be retried later
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class PreparedLogEntry:
+    """
+    Log entry with the document built beforehand, so that it can be submitted from another thread.
+    Has the same getters as the log sources, since those are all that the log targets read.
+    """
+
+    id: EntryId
+    document: dict
+
+    @classmethod
+    def from_source(cls, source: AbstractLogSource) -> "PreparedLogEntry":
+        return cls(id=source.get_id(), document=source.get_document())
+
+    def get_id(self) -> EntryId:
+        return self.id
+
+    def get_document(self) -> dict:
+        return self.document
+
+
+@dataclass
+class BulkSubmitResult:
+    sent: set[EntryId] = field(default_factory=set)
+    # Entries that were not stored because the target was temporarily unavailable or overloaded
+    retryable: list[PreparedLogEntry] = field(default_factory=list)
+
+
+class BulkLogTarget(AbstractLogTarget):
+    """
+    Log target that submits many entries in a single request.
+
+    Single entries are submitted as batches of one, so these targets also work
+    with the 'submit_unsent_entries' command from 'resilient_logger'.
+    """
+
+    def submit(self, entry: AbstractLogSource) -> bool:
+        return entry.get_id() in self.submit_batch([PreparedLogEntry.from_source(entry)]).sent
+
+    @abstractmethod
+    def submit_batch(self, entries: list[PreparedLogEntry]) -> BulkSubmitResult:
+        raise NotImplementedError()
+
+
+class BulkElasticsearchLogTarget(BulkLogTarget, ElasticsearchLogTarget):
+    """
+    Same as 'resilient_logger.targets.ElasticsearchLogTarget', but entries are sent with the bulk API.
+    Documents are still created with the hash of their contents as the id, so resending an entry is harmless.
+    """
+
+    def submit_batch(self, entries: list[PreparedLogEntry]) -> BulkSubmitResult:
+        operations: list[dict[str, Any]] = []
+        for entry in entries:
+            document = entry.get_document()
+            operations.append({"create": {"_index": self._index, "_id": content_hash(document)}})
+            operations.append(document)
+
+        try:
+            response = self._client.bulk(operations=operations)
+        except ApiError as error:
+            if error.meta.status in RETRYABLE_STATUSES:
+                logger.warning(f"Elasticsearch bulk request rejected with status {error.meta.status}")
+                return BulkSubmitResult(retryable=entries)
+            raise
+        except TransportError:
+            logger.warning("Elasticsearch bulk request failed", exc_info=True)
+            return BulkSubmitResult(retryable=entries)
+
+        result = BulkSubmitResult()
+        for entry, item in zip(entries, response["items"], strict=True):
+            status = item["create"]["status"]
+            # Conflict means that the entry has already been sent
+            if status in (200, 201, 409):
+                result.sent.add(entry.get_id())
+            elif status in RETRYABLE_STATUSES:
+                result.retryable.append(entry)
+            else:
+                logger.error(f"Entry {entry.get_id()} failed: {item['create'].get('error')}")
+
+        return result
+
+
+class FileLogTarget(BulkLogTarget):
+    """
+    Local stand-in for Elasticsearch, which appends the documents to a file as JSON lines.
+    Each line has the same id ('_id') that would be used in Elasticsearch.
+    """
+
+    def __init__(self, *, path: str, required: bool = True) -> None:
+        super().__init__(required)
+        self._path = Path(path)
+        self._lock = threading.Lock()
+
+    def submit_batch(self, entries: list[PreparedLogEntry]) -> BulkSubmitResult:
+        lines: list[str] = []
+        for entry in entries:
+            document = entry.get_document()
+            lines.append(json.dumps({"_id": content_hash(document), **document}, cls=DjangoJSONEncoder) + "\n")
+
+        with self._lock, self._path.open("a", encoding="utf-8") as file:
+            file.writelines(lines)
+
+        return BulkSubmitResult(sent={entry.get_id() for entry in entries})
+
+
+@dataclass
+class ShippingResult:
+    sent: int = 0
+    failed: int = 0
+    watermark: Optional[datetime.datetime] = None
+
+
+@dataclass
+class _Batch:
+    sequence: int
+    log_entries: list[LogEntry]
+
+    @property
+    def last_timestamp(self) -> datetime.datetime:
+        return self.log_entries[-1].timestamp
+
+
+class AuditLogShipper:
+    """
+    Ship unsent audit log entries to the log targets in batches.
+
+    Batches are read from the database in order and submitted to the targets from a thread pool.
+    At most `max_in_flight` batches are read ahead of the targets, so a slow target slows down the reading
+    instead of the entries piling up in memory. Rejected batches are retried with exponential backoff.
+
+    Entries are marked sent per batch, and the watermark is moved past a batch once it and all the batches
+    before it have been sent, so an interrupted run continues from where it left off. Entries committed late
+    (e.g. in long transactions) are found by looking back `lookback` from the watermark.
+    """
+
+    def __init__(
+        self,
+        targets: list[AbstractLogTarget],
+        *,
+        bulk_size: int = 500,
+        concurrency: int = 4,
+        max_in_flight: Optional[int] = None,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        lookback: datetime.timedelta = datetime.timedelta(minutes=10),
+        name: str = "default",
+    ) -> None:
+        self.targets = targets
+        self.bulk_size = bulk_size
+        self.concurrency = concurrency
+        self.max_in_flight = max_in_flight or concurrency * 2
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.lookback = lookback
+        self.name = name
+
+    @classmethod
+    def from_settings(cls, **kwargs: Any) -> "AuditLogShipper":
+        """Create a shipper for the targets in the 'RESILIENT_LOGGER' setting."""
+        config = get_resilient_logger_config()
+        targets: list[AbstractLogTarget] = []
+        for target in config["targets"]:
+            target_args = target.copy()
+            target_class = dynamic_class(AbstractLogTarget, target_args.pop("class"))
+            targets.append(target_class(**target_args))
+
+        kwargs.setdefault("bulk_size", config["chunk_size"])
+        kwargs.setdefault("concurrency", config.get("concurrency", 4))
+        kwargs.setdefault("max_retries", config.get("max_retries", 5))
+        return cls(targets, **kwargs)
+
+    def ship(self, limit: Optional[int] = None, full: bool = False) -> ShippingResult:
+        """
+        Ship unsent log entries, at most `limit` of them.
+        If `full` is given, look for unsent entries from the beginning instead of the watermark.
+        """
+        watermark = AuditLogShippingWatermark.objects.filter(name=self.name).first()
+        start = None if full or watermark is None else watermark.timestamp - self.lookback
+
+        result = ShippingResult(watermark=getattr(watermark, "timestamp", None))
+        pending: dict[Future, _Batch] = {}
+        finished: dict[int, tuple[_Batch, bool]] = {}
+        next_sequence = 0
+        failed = False
+
+        def collect(futures: set[Future]) -> None:
+            nonlocal next_sequence, failed
+
+            for future in futures:
+                batch = pending.pop(future)
+                sent = future.result()
+                self._mark_sent(batch, sent)
+                result.sent += len(sent)
+                result.failed += len(batch.log_entries) - len(sent)
+                finished[batch.sequence] = (batch, len(sent) == len(batch.log_entries))
+                failed = failed or len(sent) != len(batch.log_entries)
+
+            # The watermark can only be moved past batches that have been sent completely,
+            # and all the batches before them
+            watermark_timestamp: Optional[datetime.datetime] = None
+            while next_sequence in finished and finished[next_sequence][1]:
+                watermark_timestamp = finished.pop(next_sequence)[0].last_timestamp
+                next_sequence += 1
+
+            if watermark_timestamp is not None and (result.watermark is None or watermark_timestamp > result.watermark):
+                AuditLogShippingWatermark.objects.update_or_create(
+                    name=self.name,
+                    defaults={"timestamp": watermark_timestamp},
+                )
+                result.watermark = watermark_timestamp
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for batch in self._unsent_batches(start, limit):
+                # Backpressure: don't read further ahead than the targets can keep up with
+                while len(pending) >= self.max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+                # Stop reading after a batch has failed, since the watermark can't be moved past it anyway
+                if failed:
+                    break
+
+                # Documents are built here, since they might need the database, which the worker threads don't use
+                entries = [
+                    PreparedLogEntry.from_source(DjangoAuditLogSource(log_entry)) for log_entry in batch.log_entries
+                ]
+                pending[executor.submit(self._submit, entries)] = batch
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        logger.info(f"Shipped {result.sent} audit log entries, {result.failed} failed, watermark {result.watermark}")
+        return result
+
+    def _unsent_batches(self, start: Optional[datetime.datetime], limit: Optional[int]) -> Iterator[_Batch]:
+        queryset = (
+            LogEntry.objects.select_related("actor")
+            .filter(~Q(additional_data__has_key="is_sent") | Q(additional_data__is_sent=False))
+            .order_by("timestamp", "id")
+        )
+        if start is not None:
+            queryset = queryset.filter(timestamp__gte=start)
+
+        read = 0
+        sequence = 0
+        last: Optional[LogEntry] = None
+        while limit is None or read < limit:
+            batch_queryset = queryset
+            if last is not None:
+                batch_queryset = batch_queryset.filter(
+                    Q(timestamp__gt=last.timestamp) | Q(timestamp=last.timestamp, id__gt=last.id)
+                )
+
+            size = self.bulk_size if limit is None else min(self.bulk_size, limit - read)
+            log_entries = list(batch_queryset[:size])
+            if not log_entries:
+                return
+
+            yield _Batch(sequence=sequence, log_entries=log_entries)
+            read += len(log_entries)
+            sequence += 1
+            last = log_entries[-1]
+
+    def _submit(self, entries: list[PreparedLogEntry]) -> set[EntryId]:
+        """Submit the given entries to all targets, and return the ids of the entries all required targets stored."""
+        sent = {entry.id for entry in entries}
+        for target in self.targets:
+            target_sent = self._submit_to_target(target, entries)
+            if target.is_required():
+                sent &= target_sent
+        return sent
+
+    def _submit_to_target(self, target: AbstractLogTarget, entries: list[PreparedLogEntry]) -> set[EntryId]:
+        sent: set[EntryId] = set()
+        remaining = entries
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+
+            try:
+                if isinstance(target, BulkLogTarget):
+                    result = target.submit_batch(remaining)
+                else:
+                    # Other targets only read the document (and the id) of the entry, like the bulk targets
+                    result = BulkSubmitResult(sent={entry.id for entry in remaining if target.submit(entry)})
+            except Exception:
+                logger.exception(f"Log target {type(target).__name__} failed")
+                return sent
+
+            sent |= result.sent
+            remaining = result.retryable
+            if not remaining:
+                break
+
+            logger.warning(f"Retrying {len(remaining)} entries for log target {type(target).__name__}")
+
+        return sent
+
+    @staticmethod
+    def _mark_sent(batch: _Batch, sent: set[EntryId]) -> None:
+        if not sent:
+            return
+
+        # Limiting by the timestamp lets the database skip the partitions the batch can't be in
+        LogEntry.objects.filter(
+            id__in=sent,
+            timestamp__gte=batch.log_entries[0].timestamp,
+            timestamp__lte=batch.last_timestamp,
+        ).update(
+            additional_data=RawSQL("""COALESCE(additional_data, '{}'::jsonb) || '{"is_sent": true}'::jsonb""", []),
+        )
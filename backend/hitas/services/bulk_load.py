@@ -0,0 +1,195 @@
+import io
+import logging
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional, TypeVar
+
+from auditlog.models import LogEntry
+from auditlog.registry import auditlog
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import sql
+from django.db.models import Field, Model
+
+from hitas.services.audit_log import bulk_create_log_entries, bulk_model_instance_diff
+
+logger = logging.getLogger(__name__)
+
+TModel = TypeVar("TModel", bound=Model)
+
+COPY_BATCH_SIZE: int = 10_000
+
+
+def copy_bulk_create(
+    model: type[TModel],
+    objs: Iterable[TModel],
+    *,
+    resolve: Optional[dict[str, str]] = None,
+    batch_size: int = COPY_BATCH_SIZE,
+    audit: bool = True,
+) -> list[TModel]:
+    """
+    Same as 'model.objects.bulk_create(objs)', but the rows are streamed to PostgreSQL with 'COPY FROM STDIN'.
+
+    Each batch is copied to a temporary staging table, and inserted to the model's table from there
+    with a single 'INSERT ... SELECT'. Foreign keys in `resolve` are looked up from the related table
+    with a join on the given unique field (e.g. `{"owner": "uuid"}`), instead of using the primary keys
+    of the related objects, so the related objects don't need to be saved or fetched beforehand.
+
+    The primary keys of the inserted rows, and the resolved foreign keys, are set to the given objects,
+    and audit log entries are created for them if the model is registered to auditlog (unless `audit` is False).
+    On databases other than PostgreSQL, this falls back to 'bulk_create'.
+    """
+    objs = list(objs)
+    if not objs:
+        return objs
+
+    if connection.vendor != "postgresql":
+        return model.objects.bulk_create(objs, batch_size=batch_size)
+
+    loader = _CopyLoader(model, resolve or {})
+    with transaction.atomic(), connection.cursor() as cursor:
+        loader.create_staging_table(cursor)
+        for batch in _batched(objs, batch_size):
+            loader.load(cursor, batch)
+
+            if audit and model in auditlog.get_models():
+                bulk_create_log_entries(batch, LogEntry.Action.CREATE, bulk_model_instance_diff(batch))
+
+        loader.drop_staging_table(cursor)
+
+    logger.debug(f"Loaded {len(objs)} rows to {model._meta.db_table!r} with COPY")
+    return objs
+
+
+class _CopyLoader:
+    def __init__(self, model: type[Model], resolve: dict[str, str]) -> None:
+        opts = model._meta
+
+        self.model = model
+        self.fields: list[Field] = [
+            field for field in opts.concrete_fields if not field.primary_key and not field.generated
+        ]
+        self.resolve: dict[str, Field] = {}
+        for name, key in resolve.items():
+            related_field = opts.get_field(name).related_model._meta.get_field(key)
+            # Otherwise the join could match several rows, or none at all for NULL values
+            if not related_field.unique:
+                raise ValueError(f"Cannot resolve {opts.label}.{name} by {key!r}, since it is not a unique field.")
+            self.resolve[name] = related_field
+
+        table = sql.Identifier(opts.db_table)
+        self.staging_table = sql.Identifier(f"staging_{opts.db_table}")
+        self.resolved_fields: list[Field] = [field for field in self.fields if field.name in self.resolve]
+
+        # Staging table has the same columns as the model table, except that the foreign keys to resolve
+        # have the type of the related field, and the row number keeps the rows in the given order.
+        staging_columns: list[sql.Composable] = [sql.SQL("{} bigint").format(sql.Identifier("_row"))]
+        select_columns: list[sql.Composable] = []
+        joins: list[sql.Composable] = []
+        for i, field in enumerate(self.fields):
+            related_field = self.resolve.get(field.name)
+            if related_field is None:
+                staging_columns.append(
+                    sql.SQL("{} {}").format(sql.Identifier(field.column), sql.SQL(field.db_type(connection)))
+                )
+                select_columns.append(sql.Identifier("s", field.column))
+                continue
+
+            alias = f"r{i}"
+            staging_columns.append(
+                sql.SQL("{} {}").format(sql.Identifier(field.column), sql.SQL(related_field.db_type(connection)))
+            )
+            select_columns.append(sql.Identifier(alias, field.target_field.column))
+            joins.append(
+                sql.SQL("LEFT JOIN {} {} ON {} = {}").format(
+                    sql.Identifier(related_field.model._meta.db_table),
+                    sql.Identifier(alias),
+                    sql.Identifier(alias, related_field.column),
+                    sql.Identifier("s", field.column),
+                )
+            )
+
+        columns = sql.SQL(", ").join(sql.Identifier(field.column) for field in self.fields)
+        returning = [sql.Identifier(opts.db_table, opts.pk.column)]
+        returning += [sql.Identifier(opts.db_table, field.column) for field in self.resolved_fields]
+
+        self.create_sql = sql.SQL("CREATE TEMPORARY TABLE {} ({}) ON COMMIT DROP").format(
+            self.staging_table, sql.SQL(", ").join(staging_columns)
+        )
+        self.copy_sql = sql.SQL("COPY {} ({}, {}) FROM STDIN").format(
+            self.staging_table, sql.Identifier("_row"), columns
+        )
+        # Rows are returned in the order they are inserted, like with 'bulk_create'
+        self.insert_sql = sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} s {} ORDER BY {} RETURNING {}").format(
+            table,
+            columns,
+            sql.SQL(", ").join(select_columns),
+            self.staging_table,
+            sql.SQL(" ").join(joins),
+            sql.Identifier("s", "_row"),
+            sql.SQL(", ").join(returning),
+        )
+
+    def create_staging_table(self, cursor) -> None:
+        cursor.execute(self.create_sql.as_string(cursor.cursor))
+
+    def drop_staging_table(self, cursor) -> None:
+        cursor.execute(sql.SQL("DROP TABLE {}").format(self.staging_table).as_string(cursor.cursor))
+
+    def load(self, cursor, objs: list[Model]) -> None:
+        cursor.execute(sql.SQL("TRUNCATE {}").format(self.staging_table).as_string(cursor.cursor))
+
+        # Rows are written in the text format of COPY, where NULL is '\N'
+        buffer = io.StringIO()
+        for row_number, obj in enumerate(objs):
+            buffer.write("\t".join([str(row_number), *self.values(obj)]) + "\n")
+        buffer.seek(0)
+
+        cursor.copy_expert(self.copy_sql.as_string(cursor.cursor), buffer)
+
+        cursor.execute(self.insert_sql.as_string(cursor.cursor))
+        for obj, (pk, *foreign_keys) in zip(objs, cursor.fetchall(), strict=True):
+            obj.pk = pk
+            # Also clears the cached related object, which was only used for the lookup
+            for field, foreign_key in zip(self.resolved_fields, foreign_keys, strict=True):
+                setattr(obj, field.attname, foreign_key)
+            obj._state.adding = False
+            obj._state.db = connection.alias
+
+    def values(self, obj: Model) -> Iterator[str]:
+        # Same as in 'bulk_create': use the primary keys of related objects saved after they were assigned
+        obj._prepare_related_fields_for_save(
+            operation_name="copy_bulk_create",
+            fields=[field for field in self.fields if field.name not in self.resolve],
+        )
+
+        for field in self.fields:
+            related_field = self.resolve.get(field.name)
+            if related_field is None:
+                value = field.get_db_prep_save(field.pre_save(obj, add=True), connection)
+            else:
+                related_obj = getattr(obj, field.name)
+                value = None if related_obj is None else getattr(related_obj, related_field.attname)
+                value = related_field.get_db_prep_save(value, connection)
+
+            yield _to_copy_value(value)
+
+
+# Backslashes and the delimiters of the COPY text format are escaped with a backslash
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _to_copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    # JSON values are wrapped in an adapter for the database driver
+    if hasattr(value, "adapted") and hasattr(value, "dumps"):
+        value = value.dumps(value.adapted)
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _batched(objs: list[TModel], batch_size: int) -> Iterator[list[TModel]]:
+    iterator = iter(objs)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
@@ -1,11 +1,15 @@
+from typing import Collection
+
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
+from django.db.models import Case, Exists, F, OuterRef, Q, Subquery, Value, When
 from django.utils import timezone
 
 from hitas.models import ConditionOfSale, Owner, Ownership
+from hitas.models.apartment_sale import ApartmentSale
 from hitas.models.condition_of_sale import ConditionOfSaleAnnotated
 from hitas.models.housing_company import HitasType, RegulationStatus
+from hitas.models.ownership import OwnershipWithConditionOfSaleFlags
 from hitas.services.apartment import get_first_sale_purchase_date
 
 
@@ -37,17 +41,33 @@ def condition_of_sale_queryset() -> models.QuerySet[ConditionOfSaleAnnotated]:
     )
 
 
-def create_conditions_of_sale(owners: list["Owner"]) -> list[ConditionOfSale]:
-    ownerships: list[Ownership] = [
-        ownership for owner in owners for ownership in owner.ownerships.all() if not owner.bypass_conditions_of_sale
-    ]
+def create_conditions_of_sale(owners: list["Owner"], ignore_sales: Collection[int] = ()) -> list[ConditionOfSale]:
+    """
+    Create conditions of sale between the ownerships of the given owners.
+
+    Sales in `ignore_sales` are not considered when determining whether an apartment is new,
+    so that an apartment sold for the first time can be treated as new at the time of the sale.
+    """
+    ownerships = list(
+        ownerships_for_conditions_of_sale(
+            owner_ids=[owner.id for owner in owners if not owner.bypass_conditions_of_sale],
+            ignore_sales=ignore_sales,
+        )
+    )
 
     conditions_of_sale = determine_conditions_of_sale(ownerships)
     if not conditions_of_sale:
         return []
 
-    # 'ignore_conflicts' so that we can create all missing conditions of sale if some already exist
-    ConditionOfSale.objects.bulk_create(conditions_of_sale, ignore_conflicts=True)
+    # 'ignore_conflicts' so that we can create all missing conditions of sale if some already exist.
+    # The created conditions of sale are fetched again for the audit log, with everything their
+    # string representations need, so that they are not fetched one by one.
+    ConditionOfSale.objects.select_related(
+        "new_ownership__owner",
+        "new_ownership__sale__apartment",
+        "old_ownership__owner",
+        "old_ownership__sale__apartment",
+    ).bulk_create(conditions_of_sale, ignore_conflicts=True)
 
     # We have to fetch ownerships separately, since if only some conditions of sale in 'to_save' were created,
     # the ids or conditions of sale in the returned list from 'bulk_create' are not correct.
@@ -58,35 +78,81 @@ def create_conditions_of_sale(owners: list["Owner"]) -> list[ConditionOfSale]:
     )
 
 
-def determine_conditions_of_sale(ownerships: list[Ownership]) -> list[ConditionOfSale]:
+def ownerships_for_conditions_of_sale(
+    owner_ids: list[int],
+    ignore_sales: Collection[int] = (),
+) -> models.QuerySet[OwnershipWithConditionOfSaleFlags]:
+    """
+    Fetch the ownerships of the given owners to non-half-hitas apartments with everything needed for
+    determining conditions of sale annotated, so that no further queries are needed per ownership.
+
+    '_is_new' is calculated in the database with the same rules as in 'Apartment.is_new'.
+    """
+    today = timezone.now().date()
+    first_sale = (
+        ApartmentSale.objects.filter(apartment_id=OuterRef("sale__apartment_id"))
+        .exclude(id__in=ignore_sales)
+        .order_by("purchase_date", "id")
+    )
+    unfulfilled_conditions_of_sale_on_first_sale = ConditionOfSale.objects.filter(
+        new_ownership__sale_id=OuterRef("_first_sale_id"),
+        new_ownership__deleted__isnull=True,
+    )
+    housing_company = "sale__apartment__building__real_estate__housing_company"
+
+    return (
+        Ownership.objects.filter(owner_id__in=owner_ids)
+        .exclude(**{f"{housing_company}__hitas_type": HitasType.HALF_HITAS})
+        .annotate(
+            _apartment_id=F("sale__apartment_id"),
+            _regulation_status=F(f"{housing_company}__regulation_status"),
+            _hitas_type=F(f"{housing_company}__hitas_type"),
+            _first_sale_id=Subquery(first_sale.values("id")[:1]),
+            _first_sale_purchase_date=Subquery(first_sale.values("purchase_date")[:1]),
+            _is_new=Case(
+                When(
+                    condition=(
+                        Q(sale__apartment__completion_date__isnull=True)
+                        | Q(sale__apartment__completion_date__gt=today)
+                        | Q(_first_sale_id__isnull=True)
+                        | Q(_first_sale_purchase_date__gt=today)
+                        | Exists(unfulfilled_conditions_of_sale_on_first_sale)
+                    ),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+        )
+        # Same order as going through the owners' ownerships one owner at a time
+        .order_by("owner_id", "id")
+    )
+
+
+def determine_conditions_of_sale(ownerships: list[OwnershipWithConditionOfSaleFlags]) -> list[ConditionOfSale]:
+    """
+    Determine the conditions of sale between the given ownerships.
+    Ownerships are fetched with 'ownerships_for_conditions_of_sale', so that no further queries are needed.
+    """
+    # Conditions of sale are only created between ownerships to regulated housing companies,
+    # and only from ownerships to new apartments in non-half-hitas housing companies.
+    regulated: list[tuple[OwnershipWithConditionOfSaleFlags, int]] = []
+    new: list[tuple[OwnershipWithConditionOfSaleFlags, int]] = []
+    for ownership in ownerships:
+        apartment_id, is_regulated, is_new = _condition_of_sale_flags(ownership)
+        if is_regulated:
+            regulated.append((ownership, apartment_id))
+        if is_new:
+            new.append((ownership, apartment_id))
+
     to_save: dict[tuple[int, int], ConditionOfSale] = {}
     # Create conditions of sale for all ownerships to new apartments this owner has,
     # and all the additional ownerships given (if they are for new apartments).
-    for ownership in ownerships:
-        apartment = ownership.apartment
-
-        if (
-            # Don't create conditions of sale to unregulated housing companies.
-            apartment.housing_company.regulation_status != RegulationStatus.REGULATED
-            # No conditions of sale to half hitas apartments
-            or apartment.housing_company.hitas_type == HitasType.HALF_HITAS
-            # Conditions of sale are only created for first sales
-            or not apartment.is_new
-        ):
-            continue
-
-        for other_ownership in ownerships:
-            if (
-                # Don't create conditions of sale to unregulated housing companies.
-                other_ownership.apartment.housing_company.regulation_status != RegulationStatus.REGULATED
-                # Don't create circular conditions of sale
-                or ownership.id == other_ownership.id
-                # Don't create conditions of sale between two ownerships to the same apartment.
-                # They are in the same sale but for different owners.
-                or other_ownership.apartment == apartment
-                # No conditions of sale to half hitas apartments
-                or apartment.housing_company.hitas_type == HitasType.HALF_HITAS
-            ):
+    for ownership, apartment_id in new:
+        for other_ownership, other_apartment_id in regulated:
+            # Don't create conditions of sale between two ownerships to the same apartment.
+            # They are in the same sale but for different owners. This also prevents circular conditions of sale.
+            if other_apartment_id == apartment_id:
                 continue
 
             # Only one condition of sale between two new apartments
@@ -99,6 +165,15 @@ def determine_conditions_of_sale(ownerships: list[Ownership]) -> list[ConditionO
     return list(to_save.values())
 
 
+def _condition_of_sale_flags(ownership: OwnershipWithConditionOfSaleFlags) -> tuple[int, bool, bool]:
+    """Return the apartment id, whether the ownership is to a regulated apartment, and whether it is to a new one."""
+    # Don't create conditions of sale to unregulated housing companies.
+    regulated = ownership._regulation_status == RegulationStatus.REGULATED
+    # No conditions of sale to half hitas apartments, and conditions of sale are only created for first sales
+    new = regulated and ownership._hitas_type != HitasType.HALF_HITAS and ownership._is_new
+    return ownership._apartment_id, regulated, new
+
+
 def fulfill_conditions_of_sales_for_housing_companies(housing_companies: list[int]) -> None:
     ConditionOfSale.objects.filter(
         (
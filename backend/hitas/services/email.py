@@ -38,6 +38,7 @@
     prefetch_latest_sale,
 )
 from hitas.services.condition_of_sale import condition_of_sale_queryset
+from hitas.services.pdf_artifacts import get_confirmed_max_price_calculation_pdf
 from hitas.services.thirty_year_regulation import get_thirty_year_regulation_results_for_housing_company
 from hitas.utils import max_date_if_all_not_null, monthify
 from hitas.views.apartment import ApartmentDetailSerializer
@@ -78,14 +79,7 @@ def render_confirmed_max_price_calculation_pdf(
 ) -> tuple[str, bytes]:
     pdf_body = get_hitas_object_or_404(PDFBody, name=PDFBodyName.CONFIRMED_MAX_PRICE_CALCULATION)
     filename = f"Enimmäishintalaskelma {confirmed_max_price_calculation.apartment.address}.pdf"
-    context = {
-        "maximum_price_calculation": confirmed_max_price_calculation,
-        "user": user,
-        "body_parts": pdf_body.texts,
-        "title": filename,
-        "date_today": datetime.date.strftime(timezone.now().date(), "%d.%m.%Y"),
-    }
-    pdf = render_to_pdf(template="confirmed_maximum_price.jinja", context=context)
+    pdf = get_confirmed_max_price_calculation_pdf(confirmed_max_price_calculation, user, pdf_body.texts)
     return filename, pdf
 
 
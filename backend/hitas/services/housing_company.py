@@ -29,6 +29,7 @@
     get_first_sale_purchase_date,
 )
 from hitas.services.audit_log import last_modified
+from hitas.tracing import trace_phase
 from hitas.utils import max_date_if_all_not_null, roundup
 
 logger = logging.getLogger()
@@ -83,7 +84,7 @@ def get_completed_housing_companies(
             property_manager_last_edited=last_modified(
                 model=HousingCompany,
                 model_id="id",
-                changes__has_key="property_manager",
+                field="property_manager",
             ),
         )
         .filter(
@@ -105,13 +106,17 @@ def get_completed_housing_companies(
     else:
         housing_company_queryset = housing_company_queryset.exclude(hitas_type=HitasType.HALF_HITAS)
 
-    housing_companies = list(housing_company_queryset)
+    with trace_phase("housing_companies.fetch") as phase:
+        housing_companies = list(housing_company_queryset)
+        phase.set_data("housing_companies", len(housing_companies))
+
     if not housing_companies:
         return []
 
     logger.info(f"{len(housing_companies)} housing companies found!")
-    logger.info("Validating housing company apartment prices and surface areas...")
-    _validate_prices_and_surface_areas(housing_companies)
+    with trace_phase("housing_companies.validate", housing_companies=len(housing_companies)):
+        logger.info("Validating housing company apartment prices and surface areas...")
+        _validate_prices_and_surface_areas(housing_companies)
 
     return housing_companies
 
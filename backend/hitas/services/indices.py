@@ -30,6 +30,7 @@
     SurfaceAreaPriceCeilingResult,
 )
 from hitas.services.housing_company import get_completed_housing_companies, make_index_adjustment_for_housing_companies
+from hitas.tracing import trace_phase
 from hitas.utils import format_sheet, hitas_calculation_quarter, monthify, resize_columns, roundup
 
 logger = logging.getLogger()
@@ -50,13 +51,15 @@ def calculate_surface_area_price_ceiling(calculation_date: datetime.date) -> lis
 
     logger.info(f"Calculating surface area price ceiling for {calculation_month.isoformat()!r}...")
 
-    logger.info("Fetching housing companies...")
-    housing_companies = get_completed_housing_companies(
-        completion_month=calculation_month,
-        include_excluded_from_statistics=False,
-        include_rental_hitas=False,
-        select_half_hitas=False,
-    )
+    with trace_phase("surface_area_price_ceiling.fetch_companies") as phase:
+        logger.info("Fetching housing companies...")
+        housing_companies = get_completed_housing_companies(
+            completion_month=calculation_month,
+            include_excluded_from_statistics=False,
+            include_rental_hitas=False,
+            select_half_hitas=False,
+        )
+        phase.set_data("housing_companies", len(housing_companies))
 
     if not housing_companies:
         raise ModelConflict(
@@ -68,18 +71,22 @@ def calculate_surface_area_price_ceiling(calculation_date: datetime.date) -> lis
         housing_company.uuid.hex: housing_company.avg_price_per_square_meter for housing_company in housing_companies
     }
 
-    logger.info("Making index adjustments...")
-    indices = make_index_adjustment_for_housing_companies(housing_companies, calculation_month)
+    with trace_phase("surface_area_price_ceiling.index_adjustment", housing_companies=len(housing_companies)):
+        logger.info("Making index adjustments...")
+        indices = make_index_adjustment_for_housing_companies(housing_companies, calculation_month)
 
-    logger.info(
-        f"Setting surface area price ceiling for the next three months "
-        f"starting from {calculation_month.isoformat()!r}..."
-    )
-    total = _calculate_surface_area_price_ceiling_for_housing_companies(housing_companies)
-    results = _create_surface_area_price_ceiling_for_next_three_months(calculation_month, total)
+    with trace_phase("surface_area_price_ceiling.decision", housing_companies=len(housing_companies)) as phase:
+        logger.info(
+            f"Setting surface area price ceiling for the next three months "
+            f"starting from {calculation_month.isoformat()!r}..."
+        )
+        total = _calculate_surface_area_price_ceiling_for_housing_companies(housing_companies)
+        results = _create_surface_area_price_ceiling_for_next_three_months(calculation_month, total)
+        phase.set_data("surface_area_price_ceilings", len(results))
 
-    logger.info("Saving calculation data for later use...")
-    _save_calculation_data(calculation_month, housing_companies, indices, unadjusted_prices, results)
+    with trace_phase("surface_area_price_ceiling.persist", housing_companies=len(housing_companies)):
+        logger.info("Saving calculation data for later use...")
+        _save_calculation_data(calculation_month, housing_companies, indices, unadjusted_prices, results)
 
     logger.info("Surface area price ceiling calculation complete!")
     return results
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from auditlog.context import disable_auditlog
 from dateutil.relativedelta import relativedelta
 from django.db import models
@@ -23,9 +25,25 @@ def exclude_obfuscated_owners(owners: QuerySet[Owner]) -> QuerySet[Owner]:
     )
 
 
-def obfuscate_owners_without_regulated_apartments() -> list[OwnerT]:
-    """Remove any personal information from owners which do not own any regulated hitas apartments."""
-    owners: QuerySet[Owner] = Owner.objects.annotate(
+def obfuscate_owners_without_regulated_apartments(housing_company_ids: Optional[list[int]] = None) -> list[OwnerT]:
+    """
+    Remove any personal information from owners which do not own any regulated hitas apartments.
+
+    If `housing_company_ids` are given, only the owners of apartments in those housing companies are checked,
+    e.g. after the housing companies have been released from regulation. Otherwise, all owners are checked.
+    """
+    owners: QuerySet[Owner] = Owner.objects.all()
+    if housing_company_ids is not None:
+        if not housing_company_ids:
+            return []
+
+        owners = owners.filter(
+            id__in=Ownership.objects.filter(
+                sale__apartment__building__real_estate__housing_company__id__in=housing_company_ids,
+            ).values("owner_id"),
+        )
+
+    owners = owners.annotate(
         _owned_regulated_apartments=Coalesce(
             SQSum(
                 queryset=(
@@ -78,14 +96,9 @@ def obfuscate_owners_without_regulated_apartments() -> list[OwnerT]:
     )
     owners = exclude_obfuscated_owners(owners)
 
-    # 'non_disclosure' needs to be included temporarily so that we can determine
-    # if obfuscation is needed in 'hitas.models.owner.Owner.post_fetch_values_hook'
-    obfuscated_owners = list(owners.values("name", "identifier", "email", "non_disclosure"))
+    obfuscated_owners = list(owners.obfuscated_values("name", "identifier", "email"))
 
     if obfuscated_owners:
-        for owner in obfuscated_owners:
-            del owner["non_disclosure"]
-
         # No need to auditlog obfuscation
         with disable_auditlog():
             owners.update(
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+from typing import Iterator
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from hitas.models import ApartmentMaximumPriceCalculation
+from hitas.services.pdf_renderer import get_pdf_renderer, render_template_to_html
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+CONFIRMED_MAX_PRICE_CALCULATION_DIRECTORY = "confirmed_max_price_calculations"
+# Bump this when 'confirmed_maximum_price.jinja', the components it uses or the logo change,
+# so that the documents rendered with the previous version are not served anymore
+CONFIRMED_MAX_PRICE_CALCULATION_TEMPLATE_VERSION = 1
+
+
+def get_confirmed_max_price_calculation_pdf(
+    confirmed_max_price_calculation: ApartmentMaximumPriceCalculation,
+    user: User,
+    body_parts: list[str],
+) -> bytes:
+    """
+    Get the PDF document of a confirmed maximum price calculation.
+
+    A confirmed calculation never changes, so the rendered document is saved to the file storage,
+    and later requests for the same document are served from there. The document is identified by
+    the calculation, the template version, the PDF body texts, the signature block of the user,
+    and the apartment, housing company and owner details printed on it, since those can change after
+    the confirmation (e.g. when the owners are obfuscated).
+    """
+    path = confirmed_max_price_calculation_pdf_path(confirmed_max_price_calculation, user, body_parts)
+
+    if default_storage.exists(path):
+        return _read(path)
+
+    html = _render_confirmed_max_price_calculation_html(confirmed_max_price_calculation, user, body_parts)
+    pdf = get_pdf_renderer().render(html)
+    _save(path, pdf)
+    return pdf
+
+
+def get_confirmed_max_price_calculation_pdfs(
+    confirmed_max_price_calculations: list[ApartmentMaximumPriceCalculation],
+    user: User,
+    body_parts: list[str],
+) -> Iterator[bytes]:
+    """
+    Get the PDF documents of the given confirmed maximum price calculations, in the same order.
+
+    Documents not yet in the file storage are rendered in parallel, and saved like single documents.
+    """
+    paths = [
+        confirmed_max_price_calculation_pdf_path(calculation, user, body_parts)
+        for calculation in confirmed_max_price_calculations
+    ]
+    missing = {
+        path: calculation
+        for path, calculation in zip(paths, confirmed_max_price_calculations, strict=True)
+        if not default_storage.exists(path)
+    }
+
+    rendered = get_pdf_renderer().render_many(
+        _render_confirmed_max_price_calculation_html(calculation, user, body_parts) for calculation in missing.values()
+    )
+    for path in paths:
+        if path not in missing:
+            yield _read(path)
+            continue
+
+        pdf = next(rendered)
+        _save(path, pdf)
+        yield pdf
+
+
+def confirmed_max_price_calculation_pdf_path(
+    confirmed_max_price_calculation: ApartmentMaximumPriceCalculation,
+    user: User,
+    body_parts: list[str],
+) -> str:
+    # PDF bodies are edited in place, so the texts themselves are the version of the body
+    body_version = _digest(body_parts)
+    signature = _digest([user.first_name, user.last_name, user.title, user.phone])
+    details = _digest(_printed_details(confirmed_max_price_calculation))
+    return (
+        f"{CONFIRMED_MAX_PRICE_CALCULATION_DIRECTORY}/{confirmed_max_price_calculation.uuid.hex}/"
+        f"v{CONFIRMED_MAX_PRICE_CALCULATION_TEMPLATE_VERSION}-{body_version}-{signature}-{details}.pdf"
+    )
+
+
+def _printed_details(confirmed_max_price_calculation: ApartmentMaximumPriceCalculation) -> list:
+    """Details that the document prints from the database instead of the confirmed calculation"""
+    apartment = confirmed_max_price_calculation.apartment
+    housing_company = apartment.housing_company
+    latest_sale = apartment.latest_sale(include_first_sale=True)
+    return [
+        apartment.street_address,
+        str(apartment.postal_code),
+        apartment.city,
+        apartment.stair,
+        apartment.apartment_number,
+        apartment.share_number_start,
+        apartment.share_number_end,
+        apartment.rooms,
+        getattr(apartment.apartment_type, "value", None),
+        housing_company.official_name,
+        getattr(housing_company.property_manager, "name", None),
+        [
+            [ownership.owner.name, ownership.owner.non_disclosure, ownership.percentage]
+            for ownership in (latest_sale.ownerships.all() if latest_sale is not None else [])
+        ],
+    ]
+
+
+def _render_confirmed_max_price_calculation_html(
+    confirmed_max_price_calculation: ApartmentMaximumPriceCalculation,
+    user: User,
+    body_parts: list[str],
+) -> str:
+    filename = f"Enimmäishintalaskelma {confirmed_max_price_calculation.apartment.address}.pdf"
+    context = {
+        "maximum_price_calculation": confirmed_max_price_calculation,
+        "user": user,
+        "body_parts": body_parts,
+        "title": filename,
+        # Confirmed documents are dated to the confirmation instead of the day they are printed,
+        # so that a stored document is valid on any day
+        "date_today": timezone.localdate(confirmed_max_price_calculation.confirmed_at).strftime("%d.%m.%Y"),
+    }
+    return render_template_to_html("confirmed_maximum_price.jinja", context)
+
+
+def _read(path: str) -> bytes:
+    with default_storage.open(path, "rb") as file:
+        return file.read()
+
+
+def _save(path: str, pdf: bytes) -> None:
+    default_storage.save(path, ContentFile(pdf))
+    logger.debug(f"Saved PDF document {path!r}")
+
+
+def _digest(values: list) -> str:
+    return hashlib.sha256(json.dumps(values, cls=DjangoJSONEncoder).encode()).hexdigest()[:16]
@@ -0,0 +1,210 @@
+import base64
+import fcntl
+import logging
+import multiprocessing
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import cache
+from io import BytesIO
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.template.loader import get_template
+from rest_framework import exceptions
+from xhtml2pdf import pisa
+
+from hitas.exceptions import ServiceUnavailable
+
+logger = logging.getLogger(__name__)
+
+LOGO_PATH = "hitas/static/helsinki_kehystunnus_musta.png"
+# Seconds between the attempts to get a free slot, when waiting for one
+SLOT_POLL_INTERVAL = 0.1
+# Rendering processes are forked, so that the (uWSGI) process doesn't need to know the Python executable,
+# and the imported modules don't need to be loaded again for each document.
+_FORK_CONTEXT = multiprocessing.get_context("fork")
+
+
+class PDFRenderer:
+    """
+    Render HTML documents to PDF with xhtml2pdf in child processes, at most `max_concurrent` documents at a time.
+
+    Rendering is CPU heavy and ties up the (uWSGI) process serving the request, so the limit is shared
+    by all the processes on the host with lock files in `lock_dir`, one file per rendering slot.
+    A document waits at most `slot_timeout` seconds for a free slot before it is rejected,
+    so that a burst of downloads cannot take up all the processes. The operating system releases
+    the locks of a process that dies while rendering.
+
+    Each document is rendered in a forked child process, which is killed if the document is not ready
+    in `render_timeout` seconds. The child only converts the given HTML, so it doesn't use e.g. the
+    database connections it inherits, and exits without closing them.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int,
+        max_batch_concurrent: int,
+        render_timeout: float,
+        slot_timeout: float,
+        lock_dir: Path,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_batch_concurrent = max_batch_concurrent
+        self.render_timeout = render_timeout
+        self.slot_timeout = slot_timeout
+        self.lock_dir = Path(lock_dir)
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+
+    def render(self, html: str) -> bytes:
+        return self._finish(self._start(html, self._acquire_slot(wait=True)))
+
+    def render_many(self, htmls: Iterable[str]) -> Iterator[bytes]:
+        """
+        Render the documents in parallel, and yield them in the given order.
+
+        A batch renders at most `max_batch_concurrent` documents at a time, so that a large batch doesn't
+        take all the slots from single documents. When the batch already has documents being rendered,
+        the next one waits for them instead of a slot.
+        """
+        pending: deque[_RenderJob] = deque()
+        try:
+            for html in htmls:
+                if len(pending) >= self.max_batch_concurrent:
+                    yield self._finish(pending.popleft())
+
+                slot = self._acquire_slot(wait=not pending)
+                while slot is None:
+                    yield self._finish(pending.popleft())
+                    slot = self._acquire_slot(wait=not pending)
+                pending.append(self._start(html, slot))
+
+            while pending:
+                yield self._finish(pending.popleft())
+        finally:
+            for job in pending:
+                job.stop()
+
+    def _start(self, html: str, slot: IO) -> "_RenderJob":
+        try:
+            receiver, sender = _FORK_CONTEXT.Pipe(duplex=False)
+            process = _FORK_CONTEXT.Process(target=_render_in_child_process, args=(html, sender), daemon=True)
+            process.start()
+            sender.close()
+        except BaseException:
+            _release_slot(slot)
+            raise
+        return _RenderJob(process, receiver, slot, deadline=time.monotonic() + self.render_timeout)
+
+    def _finish(self, job: "_RenderJob") -> bytes:
+        try:
+            if not job.connection.poll(max(job.deadline - time.monotonic(), 0)):
+                logger.error(f"Rendering a PDF document took longer than {self.render_timeout} seconds")
+                raise ServiceUnavailable("Rendering the PDF document took too long. Try again later.")
+            try:
+                pdf, error = job.connection.recv()
+            except EOFError:
+                raise exceptions.APIException("Rendering the PDF document failed.") from None
+            return _check_errors(pdf, error)
+        finally:
+            job.stop()
+
+    def _acquire_slot(self, *, wait: bool) -> Optional[IO]:
+        """Lock a free slot. Without waiting, return None if there are no free slots."""
+        deadline = time.monotonic() + self.slot_timeout
+        while True:
+            for index in range(self.max_concurrent):
+                slot = open(self.lock_dir / f"slot-{index}.lock", "a")
+                try:
+                    fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    slot.close()
+                    continue
+                return slot
+
+            if not wait:
+                return None
+            if time.monotonic() >= deadline:
+                raise ServiceUnavailable("Too many PDF documents are being rendered at the moment. Try again later.")
+            time.sleep(SLOT_POLL_INTERVAL)
+
+
+@dataclass
+class _RenderJob:
+    process: BaseProcess
+    connection: Connection
+    slot: IO
+    deadline: float
+
+    def stop(self) -> None:
+        # Also stops a child process that is stuck on a pathological document
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+        _release_slot(self.slot)
+
+
+@cache
+def get_pdf_renderer() -> PDFRenderer:
+    return PDFRenderer(
+        max_concurrent=settings.PDF_RENDERER_MAX_CONCURRENT,
+        max_batch_concurrent=settings.PDF_RENDERER_MAX_BATCH_CONCURRENT,
+        render_timeout=settings.PDF_RENDERER_RENDER_TIMEOUT,
+        slot_timeout=settings.PDF_RENDERER_SLOT_TIMEOUT,
+        lock_dir=settings.PDF_RENDERER_LOCK_DIR,
+    )
+
+
+def render_template_to_html(template: str, context: dict[str, Any]) -> str:
+    return _get_template(template).render(
+        {
+            **context,
+            # Due to the limitations of the xhtml2pdf library, a Django static files url cannot be used.
+            # The logo is embedded to the document instead of a file system path, so that it is not read every time.
+            "logo_path": _logo_data_uri(),
+        },
+    )
+
+
+def _get_template(template: str):
+    # Jinja only checks the templates for changes in debug mode, so they can be kept in memory otherwise
+    if settings.DEBUG:
+        return get_template(template)
+    return _get_cached_template(template)
+
+
+@cache
+def _get_cached_template(template: str):
+    return get_template(template)
+
+
+@cache
+def _logo_data_uri() -> str:
+    logo = (settings.BASE_DIR / LOGO_PATH).read_bytes()
+    return f"data:image/png;base64,{base64.b64encode(logo).decode()}"
+
+
+def _check_errors(pdf: bytes, error: Any) -> bytes:
+    if error:
+        raise exceptions.APIException(error)
+    return pdf
+
+
+def _release_slot(slot: IO) -> None:
+    fcntl.flock(slot, fcntl.LOCK_UN)
+    slot.close()
+
+
+def _render_in_child_process(html: str, connection: Connection) -> None:
+    connection.send(_html_to_pdf(html))
+
+
+def _html_to_pdf(html: str) -> tuple[bytes, Any]:
+    result = BytesIO()
+    pdf = pisa.pisaDocument(BytesIO(html.encode("UTF-8")), dest=result)
+    return result.getvalue(), pdf.err
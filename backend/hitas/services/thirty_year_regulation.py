@@ -44,6 +44,7 @@
 from hitas.services.housing_company import get_completed_housing_companies, make_index_adjustment_for_housing_companies
 from hitas.services.indices import subquery_appropriate_cpi
 from hitas.services.owner import obfuscate_owners_without_regulated_apartments
+from hitas.tracing import trace_phase
 from hitas.utils import (
     business_quarter,
     format_sheet,
@@ -60,6 +61,10 @@
 
 logger = logging.getLogger()
 
+# Owners can lose their last regulated apartment outside regulation runs too (e.g. when they sell it),
+# so all the owners are checked once a year, in the regulation of the calculation quarter starting in this month
+FULL_OWNER_OBFUSCATION_MONTH = 2
+
 
 class AddressInfo(TypedDict):
     street_address: str
@@ -138,27 +143,30 @@ def perform_thirty_year_regulation(
 
     logger.info(f"Checking regulation need for housing companies completed before {regulation_month.isoformat()!r}...")
 
-    # Select regular housing companies
-    logger.info("Fetching housing companies...")
-    housing_companies = get_completed_housing_companies(
-        completion_month=regulation_month,
-        include_excluded_from_statistics=True,
-        include_rental_hitas=True,
-        select_half_hitas=False,
-    )
+    with trace_phase("regulation.fetch_companies") as phase:
+        # Select regular housing companies
+        logger.info("Fetching housing companies...")
+        housing_companies = get_completed_housing_companies(
+            completion_month=regulation_month,
+            include_excluded_from_statistics=True,
+            include_rental_hitas=True,
+            select_half_hitas=False,
+        )
 
-    # Half-Hitas housing companies require another query as they are not included above query,
-    # since they can be released from regulation after only 2 years instead of 30.
-    logger.info("Fetching half-hitas housing companies...")
-    half_hitas_regulation_month = calculation_month - relativedelta(years=2)
-    half_hitas_housing_companies = get_completed_housing_companies(
-        completion_month=half_hitas_regulation_month,
-        include_excluded_from_statistics=True,
-        include_rental_hitas=True,
-        select_half_hitas=True,
-    )
+        # Half-Hitas housing companies require another query as they are not included above query,
+        # since they can be released from regulation after only 2 years instead of 30.
+        logger.info("Fetching half-hitas housing companies...")
+        half_hitas_regulation_month = calculation_month - relativedelta(years=2)
+        half_hitas_housing_companies = get_completed_housing_companies(
+            completion_month=half_hitas_regulation_month,
+            include_excluded_from_statistics=True,
+            include_rental_hitas=True,
+            select_half_hitas=True,
+        )
 
-    housing_companies = housing_companies + half_hitas_housing_companies
+        housing_companies = housing_companies + half_hitas_housing_companies
+        phase.set_data("housing_companies", len(housing_companies))
+        phase.set_data("half_hitas_housing_companies", len(half_hitas_housing_companies))
 
     if not housing_companies:
         logger.info("No housing companies to check regulation for.")
@@ -182,29 +190,33 @@ def perform_thirty_year_regulation(
             obfuscated_owners=[],
         )
 
-        logger.info("Updating housing company states...")
-        freed_housing_companies = _free_housing_companies_from_regulation(split_housing_companies, results)
-
-        logger.info("Fulfilling conditions of sale for apartments in released housing companies...")
-        fulfill_conditions_of_sales_for_housing_companies(freed_housing_companies)
-
-        logger.info("Obfuscating owners without regulated apartments...")
-        results["obfuscated_owners"] = obfuscate_owners_without_regulated_apartments()
-
-        logger.info("Saving regulation results for reporting...")
-        _save_regulation_results(
-            results=results,
-            calculation_month=calculation_month,
-            regulation_month=regulation_month,
-            housing_companies=split_housing_companies,
-            surface_area_price_ceiling=None,
-            unadjusted_prices=None,
-            indices=None,
-            sales_data=None,
-            external_sales_data=None,
-            price_by_area=None,
-            replacement_postal_codes=replacement_postal_codes,
-        )
+        with trace_phase("regulation.persist") as phase:
+            logger.info("Updating housing company states...")
+            freed_housing_companies = _free_housing_companies_from_regulation(split_housing_companies, results)
+
+            logger.info("Fulfilling conditions of sale for apartments in released housing companies...")
+            fulfill_conditions_of_sales_for_housing_companies(freed_housing_companies)
+            phase.set_data("freed_housing_companies", len(freed_housing_companies))
+
+        with trace_phase("regulation.obfuscate") as phase:
+            results["obfuscated_owners"] = _obfuscate_owners(calculation_month, freed_housing_companies)
+            phase.set_data("obfuscated_owners", len(results["obfuscated_owners"]))
+
+        with trace_phase("regulation.save_results"):
+            logger.info("Saving regulation results for reporting...")
+            _save_regulation_results(
+                results=results,
+                calculation_month=calculation_month,
+                regulation_month=regulation_month,
+                housing_companies=split_housing_companies,
+                surface_area_price_ceiling=None,
+                unadjusted_prices=None,
+                indices=None,
+                sales_data=None,
+                external_sales_data=None,
+                price_by_area=None,
+                replacement_postal_codes=replacement_postal_codes,
+            )
 
         logger.info("Regulation check complete!")
         return results
@@ -218,33 +230,40 @@ def perform_thirty_year_regulation(
         housing_company.uuid.hex: housing_company.avg_price_per_square_meter for housing_company in housing_companies
     }
 
-    logger.info("Making index adjustments...")
-    indices = make_index_adjustment_for_housing_companies(housing_companies, calculation_month)
+    with trace_phase("regulation.index_adjustment", housing_companies=len(housing_companies)):
+        logger.info("Making index adjustments...")
+        indices = make_index_adjustment_for_housing_companies(housing_companies, calculation_month)
 
-    logger.info(f"Fetching surface area price ceiling for {calculation_month.isoformat()!r}...")
-    surface_area_price_ceiling = get_hitas_object_or_404(SurfaceAreaPriceCeiling, month=calculation_month)
+        logger.info(f"Fetching surface area price ceiling for {calculation_month.isoformat()!r}...")
+        surface_area_price_ceiling = get_hitas_object_or_404(SurfaceAreaPriceCeiling, month=calculation_month)
 
-    logger.info("Determining comparison values for housing companies...")
-    comparison_values = _get_comparison_values(housing_companies, surface_area_price_ceiling.value)
+        logger.info("Determining comparison values for housing companies...")
+        comparison_values = _get_comparison_values(housing_companies, surface_area_price_ceiling.value)
 
     postal_codes: set[PostalCodeT] = set(comparison_values) | {
         postal_code for postal_codes in replacement_postal_codes.values() for postal_code in postal_codes
     }
 
-    logger.info(
-        f"Fetching HITAS sales data between {this_quarter_previous_year.isoformat()} (inclusive) "
-        f"and {this_quarter.isoformat()} (exclusive)..."
-    )
-    sales_data = get_sales_data(this_quarter_previous_year, this_quarter, postal_codes)
+    with trace_phase("regulation.sales_data", postal_codes=len(postal_codes)) as phase:
+        logger.info(
+            f"Fetching HITAS sales data between {this_quarter_previous_year.isoformat()} (inclusive) "
+            f"and {this_quarter.isoformat()} (exclusive)..."
+        )
+        sales_data = get_sales_data(this_quarter_previous_year, this_quarter, postal_codes)
 
-    logger.info("Fetching external sales data for the last four quarters...")
-    external_sales_data = get_external_sales_data(to_quarter(this_quarter), postal_codes)
+        logger.info("Fetching external sales data for the last four quarters...")
+        external_sales_data = get_external_sales_data(to_quarter(this_quarter), postal_codes)
 
-    logger.info("Combining HITAS and external sales data for each postal code...")
-    price_by_area = combine_sales_data(sales_data, external_sales_data)
+        logger.info("Combining HITAS and external sales data for each postal code...")
+        price_by_area = combine_sales_data(sales_data, external_sales_data)
+        phase.set_data("postal_codes_with_prices", len(price_by_area))
 
-    logger.info("Determining regulation need for housing companies...")
-    results = _determine_regulation_need(comparison_values, price_by_area, replacement_postal_codes)
+    with trace_phase("regulation.decision", postal_codes=len(comparison_values)) as phase:
+        logger.info("Determining regulation need for housing companies...")
+        results = _determine_regulation_need(comparison_values, price_by_area, replacement_postal_codes)
+        phase.set_data("released_from_regulation", len(results["released_from_regulation"]))
+        phase.set_data("stays_regulated", len(results["stays_regulated"]))
+        phase.set_data("skipped", len(results["skipped"]))
 
     if results["skipped"]:
         logger.info(
@@ -268,29 +287,33 @@ def perform_thirty_year_regulation(
 
     housing_companies += split_housing_companies
 
-    logger.info("Updating housing company states...")
-    freed_housing_companies = _free_housing_companies_from_regulation(housing_companies, results)
+    with trace_phase("regulation.persist", housing_companies=len(housing_companies)) as phase:
+        logger.info("Updating housing company states...")
+        freed_housing_companies = _free_housing_companies_from_regulation(housing_companies, results)
 
-    logger.info("Fulfilling conditions of sale for apartments in released housing companies...")
-    fulfill_conditions_of_sales_for_housing_companies(freed_housing_companies)
+        logger.info("Fulfilling conditions of sale for apartments in released housing companies...")
+        fulfill_conditions_of_sales_for_housing_companies(freed_housing_companies)
+        phase.set_data("freed_housing_companies", len(freed_housing_companies))
 
-    logger.info("Obfuscating owners without regulated apartments...")
-    results["obfuscated_owners"] = obfuscate_owners_without_regulated_apartments()
+    with trace_phase("regulation.obfuscate") as phase:
+        results["obfuscated_owners"] = _obfuscate_owners(calculation_month, freed_housing_companies)
+        phase.set_data("obfuscated_owners", len(results["obfuscated_owners"]))
 
-    logger.info("Saving regulation results for reporting...")
-    _save_regulation_results(
-        results=results,
-        calculation_month=calculation_month,
-        regulation_month=regulation_month,
-        housing_companies=housing_companies,
-        surface_area_price_ceiling=surface_area_price_ceiling.value,
-        unadjusted_prices=unadjusted_prices,
-        indices=indices,
-        sales_data=sales_data,
-        external_sales_data=external_sales_data,
-        price_by_area=price_by_area,
-        replacement_postal_codes=replacement_postal_codes,
-    )
+    with trace_phase("regulation.save_results", housing_companies=len(housing_companies)):
+        logger.info("Saving regulation results for reporting...")
+        _save_regulation_results(
+            results=results,
+            calculation_month=calculation_month,
+            regulation_month=regulation_month,
+            housing_companies=housing_companies,
+            surface_area_price_ceiling=surface_area_price_ceiling.value,
+            unadjusted_prices=unadjusted_prices,
+            indices=indices,
+            sales_data=sales_data,
+            external_sales_data=external_sales_data,
+            price_by_area=price_by_area,
+            replacement_postal_codes=replacement_postal_codes,
+        )
 
     logger.info("Regulation check complete!")
     return results
@@ -639,6 +662,15 @@ def _free_housing_companies_from_regulation(
     return freed_housing_companies
 
 
+def _obfuscate_owners(calculation_month: datetime.date, freed_housing_companies: list[int]) -> list["OwnerT"]:
+    if calculation_month.month == FULL_OWNER_OBFUSCATION_MONTH:
+        logger.info("Obfuscating all owners without regulated apartments...")
+        return obfuscate_owners_without_regulated_apartments()
+
+    logger.info("Obfuscating owners without regulated apartments in released housing companies...")
+    return obfuscate_owners_without_regulated_apartments(freed_housing_companies)
+
+
 def _save_regulation_results(  # NOSONAR
     results: RegulationResults,
     calculation_month: datetime.date,
@@ -743,7 +775,7 @@ def get_thirty_year_regulation_results(calculation_date: datetime.date) -> Thirt
                     last_modified=last_modified(
                         model=HousingCompany,
                         model_id="housing_company__id",
-                        changes__has_key="property_manager",
+                        field="property_manager",
                     ),
                 )
                 .order_by("regulation_result", "completion_date"),
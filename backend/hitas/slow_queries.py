@@ -0,0 +1,138 @@
+import logging
+import sys
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from crum import get_current_request
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+logger = logging.getLogger(__name__)
+
+# Only read-only statements are explained, since 'EXPLAIN ANALYZE' executes the statement again.
+# Common table expressions are not explained, since they can contain data-modifying statements.
+EXPLAINABLE_STATEMENTS = ("SELECT",)
+
+
+class SlowQueryExplainWrapper:
+    """
+    Database execute wrapper that runs 'EXPLAIN (ANALYZE, BUFFERS)' on queries
+    slower than the given threshold, and logs the plan together with the view
+    and the service function where the query originated from.
+
+    At most `max_per_minute` plans are captured per process, so that a slow endpoint
+    hammered with requests doesn't double the load on the database.
+    """
+
+    def __init__(self, threshold_ms: int, max_per_minute: int) -> None:
+        self.threshold_ms = threshold_ms
+        self.max_per_minute = max_per_minute
+        self._lock = threading.Lock()
+        self._window_start = 0.0
+        self._window_count = 0
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+        start = time.monotonic()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.monotonic() - start) * 1000
+
+        if duration_ms >= self.threshold_ms and not many and self._is_explainable(sql) and self._acquire():
+            self._explain(sql, params, duration_ms, context["connection"])
+
+        return result
+
+    @staticmethod
+    def _is_explainable(sql: str) -> bool:
+        return sql.lstrip().upper().startswith(EXPLAINABLE_STATEMENTS)
+
+    def _acquire(self) -> bool:
+        """Fixed window rate limit for captured plans."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 60:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count >= self.max_per_minute:
+                return False
+            self._window_count += 1
+            return True
+
+    def _explain(self, sql: str, params: Any, duration_ms: float, connection: BaseDatabaseWrapper) -> None:
+        # Use the raw DB-API connection, so that the results of the original cursor are not
+        # overwritten, and so that the explain query does not go through this wrapper again.
+        # A savepoint makes sure a failing explain doesn't break the surrounding transaction.
+        with connection.connection.cursor() as cursor:
+            in_transaction = connection.in_atomic_block
+            try:
+                if in_transaction:
+                    cursor.execute("SAVEPOINT hitas_slow_query_explain")
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) {sql}", params)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except Exception as error:
+                if in_transaction:
+                    cursor.execute("ROLLBACK TO SAVEPOINT hitas_slow_query_explain")
+                logger.warning("Could not explain slow query: %s", error)
+                return
+
+            if in_transaction:
+                cursor.execute("RELEASE SAVEPOINT hitas_slow_query_explain")
+
+        view = get_current_view()
+        service_function = get_current_service_function()
+        logger.warning(
+            "Slow query (%.0f ms) in view %r from %r",
+            duration_ms,
+            view,
+            service_function,
+            extra={
+                "duration_ms": round(duration_ms, 2),
+                "view": view,
+                "service_function": service_function,
+                "sql": sql,
+                "plan": plan,
+            },
+        )
+
+
+def get_current_view() -> Optional[str]:
+    request = get_current_request()
+    if request is None:
+        return None
+
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return f"{request.method} {request.path}"
+    return f"{request.method} {resolver_match.view_name}"
+
+
+def get_current_service_function() -> Optional[str]:
+    """Find the innermost function in 'hitas.services' from the current call stack."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module: str = frame.f_globals.get("__name__", "")
+        if module.startswith("hitas.services."):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+_wrapper: Optional[SlowQueryExplainWrapper] = None
+
+
+def install_slow_query_wrapper(connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    """Add the explain wrapper to new database connections. Connected to the 'connection_created' signal."""
+    global _wrapper
+
+    if connection.vendor != "postgresql":
+        return
+
+    # Share the wrapper between connections so that the rate limit is per process.
+    if _wrapper is None:
+        _wrapper = SlowQueryExplainWrapper(
+            threshold_ms=settings.SLOW_QUERY_EXPLAIN_THRESHOLD_MS,
+            max_per_minute=settings.SLOW_QUERY_EXPLAIN_MAX_PER_MINUTE,
+        )
+
+    if _wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_wrapper)
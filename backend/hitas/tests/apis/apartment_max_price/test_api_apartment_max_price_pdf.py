@@ -1,11 +1,21 @@
+import datetime
+import io
+import re
+import zipfile
+from unittest.mock import patch
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
 
-from hitas.models import ApartmentMaximumPriceCalculation
+from hitas.exceptions import ServiceUnavailable
+from hitas.models import Apartment, ApartmentMaximumPriceCalculation, JobPerformance, Owner
+from hitas.models.job_performance import JobPerformanceSource
 from hitas.models.pdf_body import PDFBodyName
+from hitas.services import pdf_artifacts
+from hitas.services.pdf_artifacts import CONFIRMED_MAX_PRICE_CALCULATION_DIRECTORY
 from hitas.tests.apis.helpers import HitasAPIClient
-from hitas.tests.factories import PDFBodyFactory
+from hitas.tests.factories import ApartmentFactory, PDFBodyFactory
 from hitas.tests.factories.apartment import create_apartment_max_price_calculation
 
 
@@ -79,3 +89,159 @@ def test__api__apartment_max_price_pdf__retrieve__migrated(api_client: HitasAPIC
         format="json",
     )
     assert response.status_code == status.HTTP_404_NOT_FOUND, response.json()
+
+
+@pytest.mark.django_db
+def test__api__apartment_max_price_pdf__retrieve__from_storage(api_client: HitasAPIClient, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    mpc: ApartmentMaximumPriceCalculation = create_apartment_max_price_calculation()
+    PDFBodyFactory.create(name=PDFBodyName.CONFIRMED_MAX_PRICE_CALCULATION, texts=["||foo||"])
+    url = (
+        reverse(
+            "hitas:apartment-detail",
+            args=[mpc.apartment.housing_company.uuid.hex, mpc.apartment.uuid.hex],
+        )
+        + "/reports/download-latest-confirmed-prices"
+    )
+
+    response = api_client.post(url, data={"request_date": "2022-01-01"}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+
+    # Rendered document is saved to the file storage...
+    saved_files = list((tmp_path / CONFIRMED_MAX_PRICE_CALCULATION_DIRECTORY / mpc.uuid.hex).iterdir())
+    assert len(saved_files) == 1
+    assert saved_files[0].read_bytes() == response.content
+    # ...named by the template version and the digests of what is printed on it, but not by the day
+    assert re.fullmatch(r"v[0-9]+-[0-9a-f]{16}-[0-9a-f]{16}-[0-9a-f]{16}\.pdf", saved_files[0].name)
+
+    # ...and served from there on the next download
+    with patch("hitas.services.pdf_artifacts.get_pdf_renderer") as get_pdf_renderer:
+        response = api_client.post(url, data={"request_date": "2022-01-01"}, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == saved_files[0].read_bytes()
+    get_pdf_renderer.assert_not_called()
+
+
+@pytest.mark.django_db
+def test__api__apartment_max_price_pdf__retrieve__from_storage__changed(
+    api_client: HitasAPIClient, settings, tmp_path, monkeypatch
+):
+    settings.MEDIA_ROOT = tmp_path
+    mpc: ApartmentMaximumPriceCalculation = create_apartment_max_price_calculation()
+    PDFBodyFactory.create(name=PDFBodyName.CONFIRMED_MAX_PRICE_CALCULATION, texts=["||foo||"])
+    url = (
+        reverse(
+            "hitas:apartment-detail",
+            args=[mpc.apartment.housing_company.uuid.hex, mpc.apartment.uuid.hex],
+        )
+        + "/reports/download-latest-confirmed-prices"
+    )
+    directory = tmp_path / CONFIRMED_MAX_PRICE_CALCULATION_DIRECTORY / mpc.uuid.hex
+
+    response = api_client.post(url, data={"request_date": "2022-01-01"}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert len(list(directory.iterdir())) == 1
+
+    # Owner details printed on the document are not part of the confirmed calculation
+    Owner.objects.filter(ownerships__sale__apartment=mpc.apartment).update(name="")
+    response = api_client.post(url, data={"request_date": "2022-01-01"}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert len(list(directory.iterdir())) == 2
+
+    # Template changes bump the version
+    monkeypatch.setattr(pdf_artifacts, "CONFIRMED_MAX_PRICE_CALCULATION_TEMPLATE_VERSION", 2)
+    response = api_client.post(url, data={"request_date": "2022-01-01"}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert len(list(directory.iterdir())) == 3
+
+
+@pytest.mark.django_db
+def test__api__apartment_max_price_pdf__housing_company_zip(api_client: HitasAPIClient, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    mpc_1: ApartmentMaximumPriceCalculation = create_apartment_max_price_calculation()
+    apartment_2: Apartment = ApartmentFactory.create(
+        building=mpc_1.apartment.building,
+        completion_date=mpc_1.apartment.completion_date,
+    )
+    mpc_2 = create_apartment_max_price_calculation(
+        apartment=apartment_2,
+        calculation_date=mpc_1.calculation_date,
+        create_indices=False,
+    )
+    # Older confirmed calculation is not included
+    create_apartment_max_price_calculation(
+        apartment=apartment_2,
+        calculation_date=mpc_1.calculation_date,
+        create_indices=False,
+        confirmed_at=mpc_2.confirmed_at - datetime.timedelta(days=1),
+    )
+    PDFBodyFactory.create(name=PDFBodyName.CONFIRMED_MAX_PRICE_CALCULATION, texts=["||foo||"])
+    housing_company = mpc_1.apartment.housing_company
+
+    response = api_client.post(
+        reverse("hitas:housing-company-detail", args=[housing_company.uuid.hex])
+        + "/reports/download-latest-confirmed-prices",
+        data={"request_date": "2022-01-01"},
+        format="json",
+        openapi_validate_response=False,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.get("content-type") == "application/zip"
+
+    zip_file = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+    assert sorted(zip_file.namelist()) == sorted(
+        f"Laskelma {housing_company.display_name} {mpc.apartment.stair} {mpc.apartment.apartment_number}.pdf"
+        for mpc in [mpc_1, mpc_2]
+    )
+    for name in zip_file.namelist():
+        assert zip_file.read(name).startswith(b"%PDF")
+
+    assert JobPerformance.objects.filter(source=JobPerformanceSource.CONFIRMED_MAX_PRICE).count() == 2
+
+    # Downloading again on the same day doesn't record the job performances again
+    response = api_client.post(
+        reverse("hitas:housing-company-detail", args=[housing_company.uuid.hex])
+        + "/reports/download-latest-confirmed-prices",
+        data={"request_date": "2022-01-01"},
+        format="json",
+        openapi_validate_response=False,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert JobPerformance.objects.filter(source=JobPerformanceSource.CONFIRMED_MAX_PRICE).count() == 2
+
+
+@pytest.mark.django_db
+def test__api__apartment_max_price_pdf__housing_company_zip__rendering_fails(
+    api_client: HitasAPIClient, settings, tmp_path
+):
+    settings.MEDIA_ROOT = tmp_path
+    mpc: ApartmentMaximumPriceCalculation = create_apartment_max_price_calculation()
+    PDFBodyFactory.create(name=PDFBodyName.CONFIRMED_MAX_PRICE_CALCULATION, texts=["||foo||"])
+
+    with patch("hitas.services.pdf_artifacts.get_pdf_renderer") as get_pdf_renderer:
+        get_pdf_renderer.return_value.render_many.side_effect = ServiceUnavailable("Too many PDF documents")
+        response = api_client.post(
+            reverse("hitas:housing-company-detail", args=[mpc.apartment.housing_company.uuid.hex])
+            + "/reports/download-latest-confirmed-prices",
+            data={"request_date": "2022-01-01"},
+            format="json",
+            openapi_validate_response=False,
+        )
+
+    # Error is returned instead of a truncated ZIP, and nothing was delivered
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert not JobPerformance.objects.exists()
+
+
+@pytest.mark.django_db
+def test__api__apartment_max_price_pdf__housing_company_zip__no_calculations(api_client: HitasAPIClient):
+    apartment: Apartment = ApartmentFactory.create()
+
+    response = api_client.post(
+        reverse("hitas:housing-company-detail", args=[apartment.housing_company.uuid.hex])
+        + "/reports/download-latest-confirmed-prices",
+        data={"request_date": "2022-01-01"},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND, response.json()
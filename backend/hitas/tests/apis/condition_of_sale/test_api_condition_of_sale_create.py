@@ -898,3 +898,48 @@ def test__api__condition_of_sale__create__not_to_half_hitas(api_client: HitasAPI
     assert len(response.json().get("conditions_of_sale", [])) == 0, response.json()
     conditions_of_sale: list[ConditionOfSale] = list(ConditionOfSale.objects.all())
     assert len(conditions_of_sale) == 0
+
+
+@pytest.mark.django_db
+def test__api__condition_of_sale__create__many_ownerships__queries_do_not_grow(
+    api_client: HitasAPIClient,
+    freezer,
+    django_assert_max_num_queries,
+):
+    freezer.move_to("2023-01-01 00:00:00+00:00")
+
+    # given:
+    # - An owner with ownerships to five new apartments and five old apartments
+    owner: Owner = OwnerFactory.create()
+    OwnershipFactory.create_batch(
+        5,
+        owner=owner,
+        sale__apartment__completion_date=None,
+        sale__apartment__building__real_estate__housing_company__regulation_status=RegulationStatus.REGULATED,
+        sale__apartment__building__real_estate__housing_company__hitas_type=HitasType.NEW_HITAS_I,
+    )
+    OwnershipFactory.create_batch(
+        5,
+        owner=owner,
+        sale__apartment__completion_date=datetime.date(2022, 1, 1),
+        sale__purchase_date=datetime.date(2022, 1, 1),
+        sale__apartment__building__real_estate__housing_company__regulation_status=RegulationStatus.REGULATED,
+        sale__apartment__building__real_estate__housing_company__hitas_type=HitasType.NEW_HITAS_I,
+    )
+
+    # when:
+    # - New conditions of sale are created for this owner as a household
+    data = {"household": [owner.uuid.hex]}
+    url = reverse("hitas:conditions-of-sale-list")
+    # - The number of queries doesn't depend on the number of ownerships
+    #   (nine queries, and the savepoints of the request and of creating the conditions of sale)
+    with django_assert_max_num_queries(13):
+        response = api_client.post(url, data=data, format="json")
+
+    # then:
+    # - Conditions of sale are created between each new apartment and every other apartment, once:
+    #   - 5 * 5 conditions of sale between the new and the old apartments
+    #   - 5 * 4 / 2 conditions of sale between the new apartments
+    assert response.status_code == status.HTTP_201_CREATED, response.json()
+    assert len(response.json().get("conditions_of_sale", [])) == 35, response.json()
+    assert ConditionOfSale.objects.count() == 35
@@ -53,12 +53,10 @@ def test__api__apartment__list(api_client: HitasAPIClient):
 
     # Database queries performed:
     # 1. Pagination count query
-    # 2. Fetch apartment
-    # 3. Join first sale
-    # 4. Join ownerships on first sale
-    # 5. Join conditions of sale where one of the ownerships is a "new ownership"
-    # 6. Join conditions of sale where one of the ownerships is an "old ownership"
-    with count_queries(6):
+    # 2. Fetch apartment (sell by date and grace period are annotated)
+    # 3. Join latest sale
+    # 4. Join ownerships on latest sale
+    with count_queries(4):
         response = api_client.get(reverse("hitas:apartment-list"))
 
     assert response.status_code == status.HTTP_200_OK, response.json()
@@ -211,12 +209,10 @@ def test__api__apartment__list__condition_of_sale(api_client: HitasAPIClient):
 
     # Database queries performed:
     # 1. Pagination count query
-    # 2. Fetch apartment
-    # 3. Join first sale
-    # 4. Join ownerships on first sale
-    # 5. Join conditions of sale where one of the ownerships is a "new ownership"
-    # 6. Join conditions of sale where one of the ownerships is an "old ownership"
-    with count_queries(6):
+    # 2. Fetch apartment (sell by date and grace period are annotated)
+    # 3. Join latest sale
+    # 4. Join ownerships on latest sale
+    with count_queries(4):
         response = api_client.get(reverse("hitas:apartment-list"))
 
     assert response.status_code == status.HTTP_200_OK, response.json()
@@ -228,6 +224,64 @@ def test__api__apartment__list__condition_of_sale(api_client: HitasAPIClient):
     assert contents[1]["has_grace_period"] is True
 
 
+@pytest.mark.django_db
+def test__api__apartment__list__condition_of_sale__earliest_unfulfilled_sell_by_date(api_client: HitasAPIClient):
+    owner: Owner = OwnerFactory.create()
+    old_apartment: Apartment = ApartmentFactory.create(apartment_number=1, completion_date=date(2020, 1, 1), sales=[])
+    new_apartment_1: Apartment = ApartmentFactory.create(apartment_number=2, completion_date=date(2023, 1, 1), sales=[])
+    new_apartment_2: Apartment = ApartmentFactory.create(apartment_number=3, completion_date=date(2022, 1, 1), sales=[])
+    new_apartment_3: Apartment = ApartmentFactory.create(apartment_number=4, completion_date=date(2021, 1, 1), sales=[])
+
+    old_sale: ApartmentSale = ApartmentSaleFactory.create(
+        apartment=old_apartment, purchase_date=date(2020, 1, 1), ownerships=[]
+    )
+    old_ownership: Ownership = OwnershipFactory.create(owner=owner, sale=old_sale)
+    # Sold after completion, so the sell by date is calculated from the purchase date
+    new_sale_1: ApartmentSale = ApartmentSaleFactory.create(
+        apartment=new_apartment_1, purchase_date=date(2023, 2, 1), ownerships=[]
+    )
+    new_ownership_1: Ownership = OwnershipFactory.create(owner=owner, sale=new_sale_1)
+    new_sale_2: ApartmentSale = ApartmentSaleFactory.create(
+        apartment=new_apartment_2, purchase_date=date(2021, 1, 1), ownerships=[]
+    )
+    new_ownership_2: Ownership = OwnershipFactory.create(owner=owner, sale=new_sale_2)
+    new_sale_3: ApartmentSale = ApartmentSaleFactory.create(
+        apartment=new_apartment_3, purchase_date=date(2021, 1, 1), ownerships=[]
+    )
+    new_ownership_3: Ownership = OwnershipFactory.create(owner=owner, sale=new_sale_3)
+
+    ConditionOfSaleFactory.create(
+        new_ownership=new_ownership_1,
+        old_ownership=old_ownership,
+        grace_period=GracePeriod.SIX_MONTHS,
+    )
+    ConditionOfSaleFactory.create(
+        new_ownership=new_ownership_2,
+        old_ownership=old_ownership,
+        grace_period=GracePeriod.NOT_GIVEN,
+    )
+    # Fulfilled conditions of sale are not counted
+    fulfilled: ConditionOfSale = ConditionOfSaleFactory.create(
+        new_ownership=new_ownership_3,
+        old_ownership=old_ownership,
+        grace_period=GracePeriod.THREE_MONTHS,
+    )
+    fulfilled.delete()
+
+    response = api_client.get(reverse("hitas:apartment-list"))
+
+    assert response.status_code == status.HTTP_200_OK, response.json()
+    contents = {apartment["id"]: apartment for apartment in response.json()["contents"]}
+    assert contents[old_apartment.uuid.hex]["sell_by_date"] == str(date(2022, 1, 1))
+    assert contents[old_apartment.uuid.hex]["has_grace_period"] is True
+    assert contents[new_apartment_1.uuid.hex]["sell_by_date"] == str(date(2023, 8, 1))
+    assert contents[new_apartment_1.uuid.hex]["has_grace_period"] is True
+    assert contents[new_apartment_2.uuid.hex]["sell_by_date"] == str(date(2022, 1, 1))
+    assert contents[new_apartment_2.uuid.hex]["has_grace_period"] is False
+    assert contents[new_apartment_3.uuid.hex]["sell_by_date"] is None
+    assert contents[new_apartment_3.uuid.hex]["has_grace_period"] is False
+
+
 # Filter tests
 
 
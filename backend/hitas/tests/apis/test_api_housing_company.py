@@ -19,6 +19,7 @@
     HousingCompany,
     HousingCompanyConstructionPriceImprovement,
     HousingCompanyMarketPriceImprovement,
+    Ownership,
     PropertyManager,
     RealEstate,
 )
@@ -41,6 +42,7 @@
     HousingCompanyConstructionPriceImprovementFactory,
     HousingCompanyFactory,
     HousingCompanyMarketPriceImprovementFactory,
+    OwnershipFactory,
     PropertyManagerFactory,
     RealEstateFactory,
 )
@@ -1148,6 +1150,34 @@ def test__api__housing_company__update__no_changes(api_client: HitasAPIClient):
     assert response.status_code == status.HTTP_200_OK, response.json()
 
 
+@pytest.mark.django_db
+def test__api__housing_company__update__obfuscate_owners_on_release(api_client: HitasAPIClient):
+    ownership: Ownership = OwnershipFactory.create(
+        sale__apartment__building__real_estate__housing_company__regulation_status=RegulationStatus.REGULATED,
+        sale__apartment__building__real_estate__housing_company__hitas_type=HitasType.NEW_HITAS_I,
+    )
+    # Owner with an apartment in another regulated housing company is not obfuscated
+    other_ownership: Ownership = OwnershipFactory.create(
+        sale__apartment__building__real_estate__housing_company=ownership.apartment.housing_company,
+    )
+    OwnershipFactory.create(
+        owner=other_ownership.owner,
+        sale__apartment__building__real_estate__housing_company__regulation_status=RegulationStatus.REGULATED,
+        sale__apartment__building__real_estate__housing_company__hitas_type=HitasType.NEW_HITAS_I,
+    )
+
+    data = {"regulation_status": RegulationStatus.RELEASED_BY_PLOT_DEPARTMENT.value}
+    url = reverse("hitas:housing-company-detail", kwargs={"uuid": ownership.apartment.housing_company.uuid.hex})
+    response = api_client.patch(url, data=data, format="json")
+    assert response.status_code == status.HTTP_200_OK, response.json()
+
+    ownership.owner.refresh_from_db()
+    assert ownership.owner.name == ""
+    assert ownership.owner.identifier is None
+    other_ownership.owner.refresh_from_db()
+    assert other_ownership.owner.name != ""
+
+
 @pytest.mark.django_db
 def test__api__housing_company__update__fulfill_condition_of_sale(api_client: HitasAPIClient):
     apartment_1: Apartment = ApartmentFactory.create(
@@ -187,6 +187,38 @@ def test__api__sales_catalog(api_client: HitasAPIClient):
     }
 
 
+@pytest.mark.django_db
+def test__api__sales_catalog__file_too_large(api_client: HitasAPIClient, settings):
+    housing_company: HousingCompany = HousingCompanyFactory.create()
+
+    url = reverse(
+        "hitas:sales-catalog-validate-list",
+        kwargs={
+            "housing_company_uuid": housing_company.uuid.hex,
+        },
+    )
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    path = Path(__file__).parent.parent / "static" / "myyntihintaluettelo_esimerkki.xlsx"
+    data = path.read_bytes()
+    settings.EXCEL_UPLOAD_MAX_SIZE = len(data) - 1
+
+    response = api_client.post(
+        url,
+        data=data,
+        content_type=content_type,
+        openapi_validate_request=False,  # cannot validate requests with bytes
+    )
+
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, response.json()
+    assert response.json() == {
+        "error": "request_entity_too_large",
+        "message": f"Excel file is too large. Maximum size is {len(data) - 1} bytes.",
+        "reason": "Request Entity Too Large",
+        "status": 413,
+    }
+
+
 @pytest.mark.django_db
 def test__api__sales_catalog__missing_apartment_types(api_client: HitasAPIClient):
     housing_company: HousingCompany = HousingCompanyFactory.create()
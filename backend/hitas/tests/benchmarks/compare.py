@@ -0,0 +1,49 @@
+"""
+Compare two benchmark result files.
+
+Usage: python -m hitas.tests.benchmarks.compare <baseline.json> <results.json> [--threshold 0.2]
+"""
+
+import argparse
+import json
+import sys
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline", help="Benchmark results to compare against.")
+    parser.add_argument("results", help="New benchmark results.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown of the median that counts as a regression (default: 0.2).",
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        results = json.load(f)
+
+    sys.stdout.write(f"{'Benchmark':<80} {baseline['commit']:>10} {results['commit']:>10} {'change':>8}" "\n")
+
+    regressions = 0
+    for name, result in sorted(results["results"].items()):
+        if name not in baseline["results"]:
+            sys.stdout.write(f"{name:<80} {'-':>10} {result['median']:>10.4f} {'new':>8}" "\n")
+            continue
+
+        old = baseline["results"][name]["median"]
+        change = (result["median"] - old) / old if old else 0.0
+        marker = ""
+        if change > args.threshold:
+            regressions += 1
+            marker = " <- regression"
+        sys.stdout.write(f"{name:<80} {old:>10.4f} {result['median']:>10.4f} {change:>+8.1%}{marker}" "\n")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
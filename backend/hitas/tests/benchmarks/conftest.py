@@ -0,0 +1,82 @@
+import datetime
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+import pytest
+from django.db import transaction
+
+from hitas.tests.benchmarks.utils import BENCHMARK_DIR_ENV
+
+T = TypeVar("T")
+
+
+class Benchmark:
+    def __init__(self, name: str, results: dict[str, dict[str, Any]], rounds: int = 5) -> None:
+        self.name = name
+        self.results = results
+        self.rounds = rounds
+
+    def __call__(self, func: Callable[..., T], *args: Any, rollback: bool = False, **kwargs: Any) -> T:
+        """
+        Call the function `rounds` times and record the timings.
+
+        :param rollback: Run each round in a transaction that is rolled back, for functions that modify
+                         the database in a way that prevents running them again (e.g. the regulation).
+        """
+        timings: list[float] = []
+        result: T = None  # type: ignore[assignment]
+        for _ in range(self.rounds):
+            # Benchmarks without database access cannot open a transaction
+            with transaction.atomic() if rollback else nullcontext():
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                timings.append(time.perf_counter() - start)
+                if rollback:
+                    transaction.set_rollback(True)
+
+        self.results[self.name] = {
+            "rounds": self.rounds,
+            "min": min(timings),
+            "max": max(timings),
+            "mean": statistics.mean(timings),
+            "median": statistics.median(timings),
+        }
+        return result
+
+
+def _current_commit() -> str:
+    git = shutil.which("git")
+    if git is None:
+        return "unknown"
+    try:
+        return subprocess.check_output([git, "rev-parse", "--short", "HEAD"], text=True).strip()  # noqa: S603
+    except Exception:
+        return "unknown"
+
+
+@pytest.fixture(scope="session")
+def benchmark_results():
+    results: dict[str, dict[str, Any]] = {}
+    yield results
+
+    if not results or os.getenv(BENCHMARK_DIR_ENV) is None:
+        return
+
+    commit = _current_commit()
+    directory = Path(os.environ[BENCHMARK_DIR_ENV])
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    with open(path, "w") as f:
+        json.dump({"commit": commit, "results": results}, f, indent=2, sort_keys=True)
+
+
+@pytest.fixture()
+def benchmark(request, benchmark_results) -> Benchmark:
+    return Benchmark(request.node.name, benchmark_results)
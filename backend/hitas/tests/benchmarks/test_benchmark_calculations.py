@@ -0,0 +1,158 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.db.models import Sum
+
+from hitas.calculations.construction_time_interest import Payment, total_construction_time_interest
+from hitas.calculations.depreciation_percentage import depreciation_multiplier
+from hitas.calculations.improvements.common import ImprovementData
+from hitas.calculations.improvements.rules_pre_2011_mpi import (
+    calculate_apartment_improvements_pre_2011_market_price_index,
+)
+from hitas.calculations.max_prices.max_price import calculate_max_price, fetch_apartment
+from hitas.models import Apartment, HousingCompany
+from hitas.models.housing_company import HitasType
+from hitas.tests.benchmarks.utils import skip_unless_benchmarking
+from hitas.tests.factories import (
+    ApartmentFactory,
+    ApartmentMarketPriceImprovementFactory,
+    HousingCompanyMarketPriceImprovementFactory,
+)
+from hitas.tests.factories.indices import (
+    ConstructionPriceIndex2005Equal100Factory,
+    ConstructionPriceIndexFactory,
+    MarketPriceIndex2005Equal100Factory,
+    MarketPriceIndexFactory,
+    SurfaceAreaPriceCeilingFactory,
+)
+from hitas.utils import max_date_if_all_not_null, monthify
+
+pytestmark = skip_unless_benchmarking
+
+# Fixed dataset sizes, so that results are comparable between commits
+APARTMENTS_PER_HOUSING_COMPANY = 50
+IMPROVEMENTS = 50
+PAYMENTS = 100
+CALCULATION_DATE = datetime.date(2022, 9, 7)
+
+
+def _create_housing_company(hitas_type: HitasType, completion_date: datetime.date) -> Apartment:
+    apartment: Apartment = ApartmentFactory.create(
+        completion_date=completion_date,
+        sales__purchase_date=completion_date,
+        building__real_estate__housing_company__hitas_type=hitas_type,
+    )
+    ApartmentFactory.create_batch(
+        APARTMENTS_PER_HOUSING_COMPANY - 1,
+        completion_date=completion_date,
+        sales__purchase_date=completion_date,
+        building=apartment.building,
+    )
+    ApartmentMarketPriceImprovementFactory.create_batch(
+        IMPROVEMENTS,
+        apartment=apartment,
+        completion_date=completion_date,
+    )
+    HousingCompanyMarketPriceImprovementFactory.create_batch(
+        IMPROVEMENTS,
+        housing_company=apartment.housing_company,
+        completion_date=completion_date,
+    )
+    return apartment
+
+
+def _benchmark_max_price(benchmark, apartment: Apartment):
+    housing_company = HousingCompany.objects.annotate(
+        _completion_date=max_date_if_all_not_null("real_estates__buildings__apartments__completion_date"),
+        sum_surface_area=Sum("real_estates__buildings__apartments__surface_area"),
+    ).get(uuid=apartment.housing_company.uuid)
+
+    def calculate():
+        return calculate_max_price(
+            housing_company=housing_company,
+            apartment=fetch_apartment(
+                housing_company=housing_company,
+                apartment_uuid=apartment.uuid,
+                calculation_month=monthify(CALCULATION_DATE),
+            ),
+            calculation_date=CALCULATION_DATE,
+            apartment_share_of_housing_company_loans=0,
+            apartment_share_of_housing_company_loans_date=CALCULATION_DATE,
+        )
+
+    calculation = benchmark(calculate)
+    assert calculation["maximum_price"] > 0
+
+
+@pytest.mark.django_db
+def test__benchmark__calculate_max_price__2011_onwards(benchmark):
+    completion_date = datetime.date(2019, 11, 1)
+    apartment = _create_housing_company(HitasType.NEW_HITAS_I, completion_date)
+
+    for index_factory in [ConstructionPriceIndex2005Equal100Factory, MarketPriceIndex2005Equal100Factory]:
+        index_factory.create(month=completion_date, value=130)
+        index_factory.create(month=monthify(CALCULATION_DATE), value=150)
+    SurfaceAreaPriceCeilingFactory.create(month=monthify(CALCULATION_DATE), value=4869)
+
+    _benchmark_max_price(benchmark, apartment)
+
+
+@pytest.mark.django_db
+def test__benchmark__calculate_max_price__pre_2011(benchmark):
+    completion_date = datetime.date(2003, 5, 1)
+    apartment = _create_housing_company(HitasType.HITAS_I, completion_date)
+
+    for index_factory in [ConstructionPriceIndexFactory, MarketPriceIndexFactory]:
+        index_factory.create(month=completion_date, value=250)
+        index_factory.create(month=monthify(CALCULATION_DATE), value=500)
+    SurfaceAreaPriceCeilingFactory.create(month=monthify(CALCULATION_DATE), value=4872)
+
+    _benchmark_max_price(benchmark, apartment)
+
+
+def test__benchmark__calculate_apartment_improvements_pre_2011_market_price_index(benchmark):
+    improvements = [
+        ImprovementData(
+            name=f"Improvement {i}",
+            value=Decimal(10_000 + i),
+            completion_date=datetime.date(2003, 5, 1) + datetime.timedelta(days=30 * i),
+            completion_date_index=Decimal("263.60"),
+            no_deductions=i % 5 == 0,
+        )
+        for i in range(IMPROVEMENTS)
+    ]
+
+    result = benchmark(
+        calculate_apartment_improvements_pre_2011_market_price_index,
+        improvements,
+        calculation_date=CALCULATION_DATE,
+        calculation_date_index=Decimal("583.3"),
+        apartment_surface_area=Decimal("54.5"),
+    )
+    assert len(result.items) == IMPROVEMENTS
+
+
+def test__benchmark__total_construction_time_interest(benchmark):
+    payments = [
+        Payment(date=datetime.date(2000, 1, 1) + datetime.timedelta(days=7 * i), percentage=Decimal("1"))
+        for i in range(PAYMENTS)
+    ]
+
+    result = benchmark(
+        total_construction_time_interest,
+        loan_rate=Decimal("6.0"),
+        apartment_completion_date=datetime.date(2003, 1, 1),
+        apartment_transfer_price=Decimal("200000"),
+        apartment_loans_during_construction=Decimal("50000"),
+        payments=payments,
+    )
+    assert result > 0
+
+
+def test__benchmark__depreciation_multiplier(benchmark):
+    def calculate_all():
+        return [depreciation_multiplier(months) for months in range(0, 12 * 40)]
+
+    result = benchmark(calculate_all)
+    assert len(result) == 12 * 40
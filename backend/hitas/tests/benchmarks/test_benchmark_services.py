@@ -0,0 +1,239 @@
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from hitas.models import Apartment, HousingCompany
+from hitas.models.housing_company import HitasType, RegulationStatus
+from hitas.models.property_manager import PropertyManager
+from hitas.services.apartment_sale import find_sales_on_interval_for_reporting
+from hitas.services.housing_company import (
+    find_half_hitas_housing_companies_for_reporting,
+    find_housing_companies_for_state_reporting,
+    find_regulated_housing_companies_for_reporting,
+    find_unregulated_housing_companies_for_reporting,
+)
+from hitas.services.indices import (
+    build_surface_area_price_ceiling_report_excel,
+    calculate_surface_area_price_ceiling,
+    get_surface_area_price_ceiling_results,
+)
+from hitas.services.owner import (
+    find_owners_with_multiple_ownerships,
+    find_ownerships_by_housing_company,
+    find_regulated_ownerships,
+)
+from hitas.services.reports import (
+    build_apartments_by_housing_companies_report_excel,
+    build_housing_company_state_report_excel,
+    build_multiple_ownerships_report_excel,
+    build_owners_by_housing_companies_report_excel,
+    build_property_managers_report_excel,
+    build_regulated_housing_companies_report_excel,
+    build_regulated_ownerships_report_excel,
+    build_sales_and_maximum_prices_report_excel,
+    build_sales_by_postal_code_and_area_report_excel,
+    build_sales_report_excel,
+    build_unregulated_housing_companies_report_excel,
+)
+from hitas.services.thirty_year_regulation import (
+    build_thirty_year_regulation_report_excel,
+    get_thirty_year_regulation_results,
+    perform_thirty_year_regulation,
+)
+from hitas.tests.apis.thirty_year_regulation.utils import (
+    create_high_price_sale_for_apartment,
+    create_necessary_indices,
+    create_new_apartment,
+    create_no_external_sales_data,
+    create_thirty_year_old_housing_company,
+    get_relevant_dates,
+)
+from hitas.tests.benchmarks.utils import skip_unless_benchmarking
+from hitas.tests.factories import ApartmentFactory, ApartmentSaleFactory
+from hitas.tests.factories.indices import MarketPriceIndex2005Equal100Factory
+
+pytestmark = skip_unless_benchmarking
+
+# Fixed dataset sizes, so that results are comparable between commits
+HOUSING_COMPANIES = 20
+APARTMENTS_PER_HOUSING_COMPANY = 10
+
+
+@pytest.fixture()
+def dataset(freezer) -> list[HousingCompany]:
+    """Regulated housing companies with completed and sold apartments."""
+    this_month, _, _ = get_relevant_dates(freezer)
+    completion_month = this_month - relativedelta(years=1)
+
+    MarketPriceIndex2005Equal100Factory.create(month=completion_month, value=100)
+    MarketPriceIndex2005Equal100Factory.create(month=this_month, value=200)
+
+    housing_companies: list[HousingCompany] = []
+    for _ in range(HOUSING_COMPANIES):
+        apartment: Apartment = ApartmentFactory.create(
+            completion_date=completion_month,
+            sales__purchase_date=completion_month,
+            building__real_estate__housing_company__hitas_type=HitasType.NEW_HITAS_I,
+            building__real_estate__housing_company__regulation_status=RegulationStatus.REGULATED,
+        )
+        apartments = ApartmentFactory.create_batch(
+            APARTMENTS_PER_HOUSING_COMPANY - 1,
+            completion_date=completion_month,
+            sales__purchase_date=completion_month,
+            building=apartment.building,
+        )
+        for resold_apartment in apartments[::2]:
+            ApartmentSaleFactory.create(
+                apartment=resold_apartment,
+                purchase_date=completion_month + relativedelta(months=6),
+            )
+        housing_companies.append(apartment.housing_company)
+
+    return housing_companies
+
+
+@pytest.mark.django_db
+def test__benchmark__perform_thirty_year_regulation(benchmark, freezer):
+    this_month, _, _ = get_relevant_dates(freezer)
+    create_necessary_indices()
+    for _ in range(HOUSING_COMPANIES):
+        create_thirty_year_old_housing_company()
+    for _ in range(APARTMENTS_PER_HOUSING_COMPANY):
+        create_high_price_sale_for_apartment(create_new_apartment())
+    create_no_external_sales_data()
+
+    results = benchmark(perform_thirty_year_regulation, this_month, rollback=True)
+    assert len(results["stays_regulated"]) == HOUSING_COMPANIES
+
+
+@pytest.mark.django_db
+def test__benchmark__build_thirty_year_regulation_report_excel(benchmark, freezer):
+    this_month, _, _ = get_relevant_dates(freezer)
+    create_necessary_indices()
+    for _ in range(HOUSING_COMPANIES):
+        create_thirty_year_old_housing_company()
+    for _ in range(APARTMENTS_PER_HOUSING_COMPANY):
+        create_high_price_sale_for_apartment(create_new_apartment())
+    create_no_external_sales_data()
+    perform_thirty_year_regulation(this_month)
+
+    benchmark(lambda: build_thirty_year_regulation_report_excel(get_thirty_year_regulation_results(this_month)))
+
+
+@pytest.mark.django_db
+def test__benchmark__calculate_surface_area_price_ceiling(benchmark, freezer, dataset):
+    this_month, _, _ = get_relevant_dates(freezer)
+
+    results = benchmark(calculate_surface_area_price_ceiling, this_month, rollback=True)
+    assert len(results) == 3
+
+
+@pytest.mark.django_db
+def test__benchmark__build_surface_area_price_ceiling_report_excel(benchmark, freezer, dataset):
+    this_month, _, _ = get_relevant_dates(freezer)
+    calculate_surface_area_price_ceiling(this_month)
+
+    benchmark(lambda: build_surface_area_price_ceiling_report_excel(get_surface_area_price_ceiling_results(this_month)))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "build_report",
+    [
+        build_sales_report_excel,
+        build_sales_and_maximum_prices_report_excel,
+        build_sales_by_postal_code_and_area_report_excel,
+    ],
+    ids=lambda func: func.__name__,
+)
+def test__benchmark__sales_reports(benchmark, freezer, dataset, build_report):
+    this_month, _, _ = get_relevant_dates(freezer)
+    start = this_month - relativedelta(years=2)
+
+    benchmark(lambda: build_report(find_sales_on_interval_for_reporting(start, this_month)))
+
+
+@pytest.mark.django_db
+def test__benchmark__regulated_housing_companies_report(benchmark, dataset):
+    benchmark(
+        lambda: build_regulated_housing_companies_report_excel(
+            find_regulated_housing_companies_for_reporting(),
+        )
+    )
+
+
+@pytest.mark.django_db
+def test__benchmark__half_hitas_housing_companies_report(benchmark, dataset):
+    benchmark(
+        lambda: build_regulated_housing_companies_report_excel(
+            find_half_hitas_housing_companies_for_reporting(),
+        )
+    )
+
+
+@pytest.mark.django_db
+def test__benchmark__unregulated_housing_companies_report(benchmark, dataset):
+    benchmark(
+        lambda: build_unregulated_housing_companies_report_excel(
+            find_unregulated_housing_companies_for_reporting(),
+        )
+    )
+
+
+@pytest.mark.django_db
+def test__benchmark__housing_company_state_report(benchmark, dataset):
+    benchmark(
+        lambda: build_housing_company_state_report_excel(
+            find_housing_companies_for_state_reporting(),
+        )
+    )
+
+
+@pytest.mark.django_db
+def test__benchmark__property_managers_report(benchmark, dataset):
+    def build_report():
+        housing_companies = list(
+            HousingCompany.objects.filter(
+                property_manager__isnull=False,
+                regulation_status=RegulationStatus.REGULATED,
+            )
+            .select_related("property_manager")
+            .order_by("property_manager__name")
+        )
+        property_managers_with_no_housing_company = list(
+            PropertyManager.objects.filter(housing_companies__isnull=True).order_by("name")
+        )
+        return build_property_managers_report_excel(housing_companies, property_managers_with_no_housing_company)
+
+    benchmark(build_report)
+
+
+@pytest.mark.django_db
+def test__benchmark__regulated_ownerships_report(benchmark, dataset):
+    benchmark(lambda: build_regulated_ownerships_report_excel(find_regulated_ownerships()))
+
+
+@pytest.mark.django_db
+def test__benchmark__multiple_ownerships_report(benchmark, dataset):
+    benchmark(lambda: build_multiple_ownerships_report_excel(find_owners_with_multiple_ownerships()))
+
+
+@pytest.mark.django_db
+def test__benchmark__owners_by_housing_company_report(benchmark, dataset):
+    housing_company = dataset[0]
+
+    benchmark(
+        lambda: build_owners_by_housing_companies_report_excel(find_ownerships_by_housing_company(housing_company.id))
+    )
+
+
+@pytest.mark.django_db
+def test__benchmark__apartments_by_housing_company_report(benchmark, dataset):
+    housing_company = dataset[0]
+
+    benchmark(
+        lambda: build_apartments_by_housing_companies_report_excel(
+            Apartment.objects.filter(
+                building__real_estate__housing_company_id=housing_company.id,
+            ).order_by("apartment_number_integer")
+        )
+    )
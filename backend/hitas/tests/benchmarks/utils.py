@@ -0,0 +1,11 @@
+import os
+
+import pytest
+
+# Benchmarks are skipped unless this environment variable points to a directory where to save the results
+BENCHMARK_DIR_ENV = "HITAS_BENCHMARK_DIR"
+
+skip_unless_benchmarking = pytest.mark.skipif(
+    os.getenv(BENCHMARK_DIR_ENV) is None,
+    reason=f"Benchmarks are only run when '{BENCHMARK_DIR_ENV}' is set.",
+)
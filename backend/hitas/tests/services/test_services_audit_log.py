@@ -0,0 +1,233 @@
+import datetime
+import importlib
+
+import pytest
+from auditlog.models import LogEntry
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from hitas.models import HousingCompany, LastModified, PropertyManager
+from hitas.services.audit_log import (
+    _parse_partition_bound,
+    create_log_entry_partitions,
+    find_log_entry_partitions,
+    last_modified,
+    log_entries_are_partitioned,
+    update_last_modified,
+)
+from hitas.tests.factories import HousingCompanyFactory, PropertyManagerFactory
+
+UTC = datetime.timezone.utc
+
+
+@pytest.mark.parametrize(
+    ["bound", "expected"],
+    [
+        (
+            "FOR VALUES FROM ('2024-01-01 00:00:00+00') TO ('2024-02-01 00:00:00+00')",
+            (datetime.datetime(2024, 1, 1, tzinfo=UTC), datetime.datetime(2024, 2, 1, tzinfo=UTC), False),
+        ),
+        (
+            "FOR VALUES FROM (MINVALUE) TO ('2024-02-01 00:00:00+00')",
+            (None, datetime.datetime(2024, 2, 1, tzinfo=UTC), False),
+        ),
+        ("DEFAULT", (None, None, True)),
+    ],
+)
+def test_parse_partition_bound(bound, expected):
+    assert _parse_partition_bound(bound) == expected
+
+
+def test_parse_partition_bound__unsupported():
+    with pytest.raises(ValueError):
+        _parse_partition_bound("FOR VALUES IN (1, 2)")
+
+
+@pytest.mark.django_db
+def test_partition_log_entries__migration():
+    migration = importlib.import_module("hitas.migrations.0022_partition_auditlog_logentry")
+    housing_company: HousingCompany = HousingCompanyFactory.create()
+    LogEntry.objects.update(timestamp=datetime.datetime(2023, 1, 15, tzinfo=UTC))
+    assert not log_entries_are_partitioned()
+
+    # Tables with pending deferred foreign key checks cannot be altered
+    with connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    with connection.schema_editor() as schema_editor:
+        migration.partition_log_entries(apps, schema_editor)
+
+    assert log_entries_are_partitioned()
+    partitions = find_log_entry_partitions()
+    # Monthly partitions from the oldest entry, so that they can be archived month by month
+    assert partitions[0].name == "auditlog_logentry_p202301"
+    assert partitions[0].start == datetime.datetime(2023, 1, 1, tzinfo=UTC)
+    assert partitions[1].name == "auditlog_logentry_p202302"
+    assert partitions[-1].is_default
+
+    # Check constraints of the original table apply to all the partitions
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'c'",
+            [partitions[0].name],
+        )
+        assert cursor.fetchone()[0] > 0
+
+    # Existing entries are copied to the partitions, and new entries can be added
+    housing_company.notes = "foo"
+    housing_company.save()
+    assert LogEntry.objects.get_for_object(housing_company).count() == 2
+
+    # Partitions for the following months are only created once
+    assert create_log_entry_partitions(months_ahead=3) == []
+    assert len(create_log_entry_partitions(months_ahead=4)) == 1
+
+
+@pytest.fixture
+def migration_connection(django_db_setup, django_db_blocker):
+    # Migrations are not run for the test database, so they are run in a database of their own.
+    # Data migrations use the default connection, so it is switched to that database for the test.
+    with django_db_blocker.unblock():
+        test_database = connection.settings_dict["NAME"]
+        migration_database = f"{test_database}_migrations"
+        with connection._nodb_cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS {migration_database}")
+            cursor.execute(f"CREATE DATABASE {migration_database}")
+
+        connection.close()
+        connection.settings_dict["NAME"] = migration_database
+        try:
+            yield connection
+        finally:
+            connection.close()
+            connection.settings_dict["NAME"] = test_database
+
+        with connection._nodb_cursor() as cursor:
+            cursor.execute(f"DROP DATABASE {migration_database}")
+
+
+def test_partition_log_entries__migrate(migration_connection, settings):
+    # Migrations are disabled for the tests with '--nomigrations'
+    settings.MIGRATION_MODULES = {}
+    executor = MigrationExecutor(migration_connection)
+    executor.migrate([("hitas", "0021_update_external_report_view"), ("auditlog", "0017_add_actor_email")])
+
+    with migration_connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO django_content_type (app_label, model) VALUES ('hitas', 'housingcompany') RETURNING id"
+        )
+        content_type_id = cursor.fetchone()[0]
+        for timestamp in ["2023-01-15T12:00:00+00:00", "2023-03-15T12:00:00+00:00"]:
+            cursor.execute(
+                """
+                INSERT INTO auditlog_logentry (object_pk, object_id, object_repr, action, "timestamp",
+                    content_type_id, changes_text)
+                VALUES ('1', 1, 'Housing company', 0, %s, %s, '')
+                """,
+                [timestamp, content_type_id],
+            )
+
+    executor.loader.build_graph()
+    executor.migrate([("hitas", "0022_partition_auditlog_logentry")])
+
+    with migration_connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = 'auditlog_logentry'")
+        assert cursor.fetchone()[0] == "p"
+
+        # Existing entries are in the partitions of their months
+        cursor.execute("SELECT tableoid::regclass::text FROM auditlog_logentry ORDER BY id")
+        assert [row[0] for row in cursor.fetchall()] == ["auditlog_logentry_p202301", "auditlog_logentry_p202303"]
+
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'auditlog_logentry'")
+        indexes = {row[0] for row in cursor.fetchall()}
+        assert {
+            "auditlog_logentry_pkey_partitioned",
+            "auditlog_logentry_object_timestamp_idx",
+            "auditlog_logentry_action_timestamp_idx",
+            "auditlog_logentry_p_timestamp_idx",
+        } <= indexes
+
+        # Indexes of the partitioned table are created for each partition
+        cursor.execute("SELECT COUNT(*) FROM pg_indexes WHERE tablename = 'auditlog_logentry_p202302'")
+        assert cursor.fetchone()[0] == len(indexes)
+
+        # New entries get ids after the existing ones
+        cursor.execute(
+            """
+            INSERT INTO auditlog_logentry (object_pk, object_id, object_repr, action, "timestamp",
+                content_type_id, changes_text)
+            VALUES ('1', 1, 'Housing company', 1, now(), %s, '')
+            RETURNING id
+            """,
+            [content_type_id],
+        )
+        assert cursor.fetchone()[0] == 3
+
+
+@pytest.mark.django_db
+def test_last_modified__updated_on_save(freezer):
+    freezer.move_to("2024-01-01 12:00:00+00:00")
+    housing_company: HousingCompany = HousingCompanyFactory.create()
+    created_at = LogEntry.objects.get_for_object(housing_company).order_by("-timestamp").first().timestamp
+
+    assert last_modified(HousingCompany, model_id=housing_company.id) == created_at
+    assert last_modified(HousingCompany, model_id=housing_company.id, field="property_manager") == created_at
+
+    # Modifying some other field does not change when the property manager was last modified
+    freezer.move_to("2024-02-01 12:00:00+00:00")
+    housing_company.notes = "foo"
+    housing_company.save()
+    updated_at = LogEntry.objects.get_for_object(housing_company).order_by("-timestamp").first().timestamp
+
+    assert last_modified(HousingCompany, model_id=housing_company.id) == updated_at
+    assert last_modified(HousingCompany, model_id=housing_company.id, field="property_manager") == created_at
+
+    freezer.move_to("2024-03-01 12:00:00+00:00")
+    housing_company.property_manager = PropertyManagerFactory.create()
+    housing_company.save()
+    changed_at = LogEntry.objects.get_for_object(housing_company).order_by("-timestamp").first().timestamp
+
+    assert last_modified(HousingCompany, model_id=housing_company.id) == changed_at
+    assert last_modified(HousingCompany, model_id=housing_company.id, field="property_manager") == changed_at
+    assert housing_company.property_manager_changed_at == changed_at
+
+
+@pytest.mark.django_db
+def test_last_modified__updated_on_bulk_create():
+    property_managers = PropertyManager.objects.bulk_create(PropertyManagerFactory.build_batch(3))
+
+    last_modified_rows = LastModified.objects.filter(content_type=ContentType.objects.get_for_model(PropertyManager))
+    assert sorted(row.object_id for row in last_modified_rows) == sorted(pm.id for pm in property_managers)
+    assert all(row.field == "" for row in last_modified_rows)
+
+
+@pytest.mark.django_db
+def test_last_modified__not_moved_backwards(freezer):
+    freezer.move_to("2024-01-01 12:00:00+00:00")
+    housing_company: HousingCompany = HousingCompanyFactory.create()
+    created_at = last_modified(HousingCompany, model_id=housing_company.id)
+
+    # Older entries written afterwards, and access log entries, do not change the last modified time
+    content_type = ContentType.objects.get_for_model(HousingCompany)
+    update_last_modified(
+        [
+            LogEntry(
+                content_type=content_type,
+                object_pk=str(housing_company.id),
+                object_id=housing_company.id,
+                action=LogEntry.Action.UPDATE,
+                changes={"notes": ["None", "foo"]},
+                timestamp=datetime.datetime(2023, 1, 1, tzinfo=UTC),
+            ),
+            LogEntry(
+                content_type=content_type,
+                object_pk=str(housing_company.id),
+                object_id=housing_company.id,
+                action=LogEntry.Action.ACCESS,
+                timestamp=datetime.datetime(2025, 1, 1, tzinfo=UTC),
+            ),
+        ]
+    )
+
+    assert last_modified(HousingCompany, model_id=housing_company.id) == created_at
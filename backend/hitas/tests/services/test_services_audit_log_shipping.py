@@ -0,0 +1,93 @@
+import json
+
+import pytest
+from auditlog.models import LogEntry
+from resilient_logger.sources import DjangoAuditLogSource
+
+from hitas.models import AuditLogShippingWatermark
+from hitas.services.audit_log_shipping import (
+    AuditLogShipper,
+    BulkLogTarget,
+    BulkSubmitResult,
+    FileLogTarget,
+    PreparedLogEntry,
+)
+from hitas.tests.factories import PropertyManagerFactory
+
+
+class FlakyLogTarget(BulkLogTarget):
+    """Rejects the first attempt of every batch as retryable, and always fails the given entries."""
+
+    def __init__(self, failing_ids: set[int] = frozenset()) -> None:
+        super().__init__(required=True)
+        self.failing_ids = failing_ids
+        self.attempts = 0
+
+    def submit_batch(self, entries: list[PreparedLogEntry]) -> BulkSubmitResult:
+        self.attempts += 1
+        if self.attempts % 2 == 1:
+            return BulkSubmitResult(retryable=entries)
+        return BulkSubmitResult(sent={entry.id for entry in entries if entry.id not in self.failing_ids})
+
+
+@pytest.mark.django_db
+def test_audit_log_shipping__file_target(tmp_path):
+    PropertyManagerFactory.create_batch(5)
+    log_entries = list(LogEntry.objects.order_by("timestamp", "id"))
+    path = tmp_path / "audit_log.jsonl"
+
+    shipper = AuditLogShipper([FileLogTarget(path=str(path))], bulk_size=2, concurrency=2)
+    result = shipper.ship()
+
+    assert result.sent == len(log_entries)
+    assert result.failed == 0
+    assert result.watermark == log_entries[-1].timestamp
+    assert AuditLogShippingWatermark.objects.get().timestamp == log_entries[-1].timestamp
+
+    documents = [json.loads(line) for line in path.read_text().splitlines()]
+    assert sorted(document["audit_event"]["extra"]["source_pk"] for document in documents) == sorted(
+        log_entry.id for log_entry in log_entries
+    )
+    assert all(log_entry.additional_data["is_sent"] for log_entry in LogEntry.objects.all())
+
+    # Nothing is shipped twice
+    assert shipper.ship().sent == 0
+
+
+@pytest.mark.django_db
+def test_audit_log_shipping__file_target__single_entry(tmp_path):
+    PropertyManagerFactory.create()
+    log_entry = LogEntry.objects.get()
+    path = tmp_path / "audit_log.jsonl"
+
+    # Single entries are submitted e.g. by the 'submit_unsent_entries' command of 'resilient_logger'
+    assert FileLogTarget(path=str(path)).submit(DjangoAuditLogSource(log_entry))
+
+    document = json.loads(path.read_text())
+    assert document["audit_event"]["extra"]["source_pk"] == log_entry.id
+
+
+@pytest.mark.django_db
+def test_audit_log_shipping__retry_and_failure():
+    PropertyManagerFactory.create_batch(6)
+    log_entries = list(LogEntry.objects.order_by("timestamp", "id"))
+    failing = log_entries[3]
+
+    target = FlakyLogTarget(failing_ids={failing.id})
+    shipper = AuditLogShipper([target], bulk_size=2, concurrency=1, max_in_flight=1, backoff=0)
+    result = shipper.ship()
+
+    # Retried batches are sent, but shipping stops after the batch with the failed entry,
+    # and the watermark stays before it
+    assert result.sent == 3
+    assert result.failed == 1
+    assert result.watermark == log_entries[1].timestamp
+
+    unsent = LogEntry.objects.exclude(additional_data__is_sent=True).order_by("timestamp", "id")
+    assert list(unsent.values_list("id", flat=True)) == [log_entry.id for log_entry in log_entries[3:]]
+
+    # The next run continues from the watermark
+    target.failing_ids = set()
+    result = shipper.ship()
+    assert result.sent == len(log_entries) - 3
+    assert result.watermark == log_entries[-1].timestamp
@@ -0,0 +1,103 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from auditlog.models import LogEntry
+from django.contrib.contenttypes.models import ContentType
+
+from hitas.models import Apartment, ApartmentSale, Owner, Ownership
+from hitas.services.bulk_load import copy_bulk_create
+from hitas.tests.factories import ApartmentFactory, OwnerFactory
+
+
+@pytest.mark.django_db
+def test_copy_bulk_create():
+    apartment: Apartment = ApartmentFactory.create(sales=[])
+    sales = [
+        ApartmentSale(
+            apartment=apartment,
+            notification_date=datetime.date(2020, 1, i),
+            purchase_date=datetime.date(2020, 1, i),
+            purchase_price=Decimal("100000.50"),
+            apartment_share_of_housing_company_loans=Decimal(i),
+            exclude_from_statistics=i % 2 == 0,
+        )
+        for i in range(1, 4)
+    ]
+
+    created = copy_bulk_create(ApartmentSale, sales, batch_size=2)
+
+    assert created == sales
+    assert all(sale.pk is not None for sale in sales)
+    for sale in sales:
+        saved = ApartmentSale.objects.get(pk=sale.pk)
+        assert saved.uuid == sale.uuid
+        assert saved.apartment == apartment
+        assert saved.purchase_date == sale.purchase_date
+        assert saved.purchase_price == sale.purchase_price
+        assert saved.apartment_share_of_housing_company_loans == sale.apartment_share_of_housing_company_loans
+        assert saved.exclude_from_statistics == sale.exclude_from_statistics
+
+    # Created sales are audit logged like with 'bulk_create'
+    log_entries = LogEntry.objects.filter(
+        content_type=ContentType.objects.get_for_model(ApartmentSale),
+        action=LogEntry.Action.CREATE,
+    )
+    assert sorted(log_entry.object_id for log_entry in log_entries) == sorted(sale.pk for sale in sales)
+
+
+@pytest.mark.django_db
+def test_copy_bulk_create__related_objects_saved_after_assignment():
+    apartment: Apartment = ApartmentFactory.create(sales=[])
+    sale = ApartmentSale(
+        apartment=apartment,
+        notification_date=datetime.date(2020, 1, 1),
+        purchase_date=datetime.date(2020, 1, 1),
+        purchase_price=Decimal(100000),
+        apartment_share_of_housing_company_loans=Decimal(0),
+    )
+    owner = Owner(name="Testi\tTestinen\\\n", identifier=None, email="")
+    ownership = Ownership(owner=owner, sale=sale, percentage=Decimal(100))
+
+    copy_bulk_create(ApartmentSale, [sale])
+    copy_bulk_create(Owner, [owner])
+    copy_bulk_create(Ownership, [ownership])
+
+    saved: Ownership = Ownership.objects.get(pk=ownership.pk)
+    assert saved.sale_id == sale.pk
+    assert saved.owner_id == owner.pk
+    # NULLs, empty strings and special characters are kept as they are
+    saved_owner = Owner.objects.get(pk=owner.pk)
+    assert saved_owner.identifier is None
+    assert saved_owner.email == ""
+    assert saved_owner.name == "Testi\tTestinen\\\n"
+
+
+@pytest.mark.django_db
+def test_copy_bulk_create__resolve_foreign_keys():
+    apartment: Apartment = ApartmentFactory.create(sales=[])
+    sale = ApartmentSale(
+        apartment=apartment,
+        notification_date=datetime.date(2020, 1, 1),
+        purchase_date=datetime.date(2020, 1, 1),
+        purchase_price=Decimal(100000),
+        apartment_share_of_housing_company_loans=Decimal(0),
+    )
+    copy_bulk_create(ApartmentSale, [sale])
+    owner: Owner = OwnerFactory.create()
+
+    # Owner is looked up in the database by the UUID, not by the primary key of this instance
+    ownership = Ownership(owner=Owner(uuid=owner.uuid), sale=sale, percentage=Decimal(100))
+    copy_bulk_create(Ownership, [ownership], resolve={"owner": "uuid"})
+
+    assert Ownership.objects.get(pk=ownership.pk).owner_id == owner.pk
+    # Resolved foreign keys are set to the objects as well, and the audit log has the actual values
+    assert ownership.owner_id == owner.pk
+    assert ownership.owner == owner
+    log_entry = LogEntry.objects.get_for_object(ownership).get()
+    assert log_entry.changes["owner"] == ["None", str(owner.pk)]
+
+
+def test_copy_bulk_create__resolve_by_non_unique_field():
+    with pytest.raises(ValueError):
+        copy_bulk_create(Ownership, [Ownership()], resolve={"owner": "identifier"})
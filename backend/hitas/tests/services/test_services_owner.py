@@ -1,3 +1,4 @@
+import datetime
 from typing import NamedTuple
 
 import pytest
@@ -9,6 +10,7 @@
 from hitas.models.housing_company import HitasType, RegulationStatus
 from hitas.services.housing_company import get_number_of_unsold_apartments
 from hitas.services.owner import obfuscate_owners_without_regulated_apartments
+from hitas.services.thirty_year_regulation import FULL_OWNER_OBFUSCATION_MONTH, _obfuscate_owners
 from hitas.tests.apis.helpers import HitasAPIClient, parametrize_helper
 from hitas.tests.factories import OwnerFactory, OwnershipFactory
 from hitas.tests.factories.apartment import ApartmentFactory
@@ -137,6 +139,34 @@ def test_obfuscate_owners_without_regulated_apartments__one_owns_regulated():
     assert owners[0]["email"] == ownership.owner.email
 
 
+@pytest.mark.django_db
+def test_obfuscate_owners_without_regulated_apartments__only_given_housing_companies():
+    released_ownership: Ownership = OwnershipFactory.create(
+        sale__apartment__building__real_estate__housing_company__regulation_status=RegulationStatus.RELEASED_BY_HITAS,
+        sale__apartment__building__real_estate__housing_company__hitas_type=HitasType.NEW_HITAS_I,
+    )
+    OwnershipFactory.create(
+        sale__apartment__building__real_estate__housing_company__regulation_status=RegulationStatus.RELEASED_BY_HITAS,
+        sale__apartment__building__real_estate__housing_company__hitas_type=HitasType.NEW_HITAS_I,
+    )
+    OwnerFactory.create()
+
+    assert obfuscate_owners_without_regulated_apartments(housing_company_ids=[]) == []
+
+    owners = obfuscate_owners_without_regulated_apartments(
+        housing_company_ids=[released_ownership.apartment.housing_company.id],
+    )
+
+    # Owners of other housing companies, or without any ownerships, are not checked
+    assert len(owners) == 1
+    assert owners[0]["name"] == released_ownership.owner.name
+    assert owners[0]["identifier"] == released_ownership.owner.identifier
+    assert owners[0]["email"] == released_ownership.owner.email
+
+    # Full check obfuscates the rest
+    assert len(obfuscate_owners_without_regulated_apartments()) == 2
+
+
 @pytest.mark.django_db
 def test_obfuscate_owners_without_regulated_apartments__one_owns_one_regulated_and_one_released():
     ownership_1: Ownership = OwnershipFactory.create(
@@ -208,3 +238,26 @@ def test_obfuscate_owners_without_regulated_apartments__half_hitas_sales_after_r
     # See that owner is obfuscated in the next regulation round
     owners = obfuscate_owners_without_regulated_apartments()
     assert len(owners) == 1
+
+
+@pytest.mark.parametrize("calculation_month", [datetime.date(2023, 2, 1), datetime.date(2023, 5, 1)])
+@pytest.mark.django_db
+def test_thirty_year_regulation__obfuscate_owners(calculation_month):
+    released_ownership: Ownership = OwnershipFactory.create(
+        sale__apartment__building__real_estate__housing_company__regulation_status=RegulationStatus.RELEASED_BY_HITAS,
+        sale__apartment__building__real_estate__housing_company__hitas_type=HitasType.NEW_HITAS_I,
+    )
+    # E.g. a housing company released manually before the regulation
+    OwnershipFactory.create(
+        sale__apartment__building__real_estate__housing_company__regulation_status=RegulationStatus.RELEASED_BY_HITAS,
+        sale__apartment__building__real_estate__housing_company__hitas_type=HitasType.NEW_HITAS_I,
+    )
+
+    owners = _obfuscate_owners(calculation_month, [released_ownership.apartment.housing_company.id])
+
+    # Once a year, all owners are checked instead of only the ones in the released housing companies
+    if calculation_month.month == FULL_OWNER_OBFUSCATION_MONTH:
+        assert len(owners) == 2
+    else:
+        assert len(owners) == 1
+        assert owners[0]["name"] == released_ownership.owner.name
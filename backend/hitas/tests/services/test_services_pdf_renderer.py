@@ -0,0 +1,114 @@
+import fcntl
+import time
+
+import pytest
+from rest_framework import exceptions
+
+from hitas.exceptions import ServiceUnavailable
+from hitas.services import pdf_renderer
+from hitas.services.pdf_renderer import PDFRenderer, render_template_to_html
+
+HTML = "<html><body><p>Hitas</p></body></html>"
+
+
+def create_renderer(lock_dir, **options) -> PDFRenderer:
+    return PDFRenderer(
+        **{
+            "max_concurrent": 1,
+            "max_batch_concurrent": 1,
+            "render_timeout": 60,
+            "slot_timeout": 0.2,
+            "lock_dir": lock_dir,
+            **options,
+        }
+    )
+
+
+@pytest.fixture
+def occupy_slot(tmp_path):
+    # Simulate another process rendering a document, lock files are locked per open file
+    slot = open(tmp_path / "slot-0.lock", "a")
+    fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    yield
+    slot.close()
+
+
+def test_pdf_renderer__render(tmp_path):
+    renderer = create_renderer(tmp_path)
+
+    # Second document gets the slot of the first one
+    assert renderer.render(HTML).startswith(b"%PDF")
+    assert renderer.render(HTML).startswith(b"%PDF")
+
+
+def test_pdf_renderer__render__too_many_documents(tmp_path, occupy_slot):
+    renderer = create_renderer(tmp_path)
+
+    with pytest.raises(ServiceUnavailable):
+        renderer.render(HTML)
+
+
+def test_pdf_renderer__render__free_slot(tmp_path, occupy_slot):
+    renderer = create_renderer(tmp_path, max_concurrent=2)
+
+    pdf = renderer.render(HTML)
+
+    assert pdf.startswith(b"%PDF")
+
+
+def test_pdf_renderer__render__timeout(tmp_path, monkeypatch):
+    renderer = create_renderer(tmp_path, render_timeout=0.5)
+    # Rendering process is forked, so it uses the patched function as well
+    monkeypatch.setattr(pdf_renderer, "_html_to_pdf", lambda html: time.sleep(60))
+
+    with pytest.raises(ServiceUnavailable):
+        renderer.render(HTML)
+
+    # Rendering process is killed, and its slot released
+    assert renderer._acquire_slot(wait=False) is not None
+
+
+def test_pdf_renderer__render__rendering_process_fails(tmp_path, monkeypatch):
+    renderer = create_renderer(tmp_path)
+    monkeypatch.setattr(pdf_renderer, "_html_to_pdf", lambda html: 1 / 0)
+
+    with pytest.raises(exceptions.APIException):
+        renderer.render(HTML)
+
+
+def test_pdf_renderer__render_many(tmp_path):
+    renderer = create_renderer(tmp_path, max_concurrent=2, max_batch_concurrent=2)
+
+    pdfs = list(renderer.render_many([f"<html><body><p>{i}</p></body></html>" for i in range(5)]))
+
+    assert len(pdfs) == 5
+    assert all(pdf.startswith(b"%PDF") for pdf in pdfs)
+    # All the slots are released after the batch
+    assert renderer._acquire_slot(wait=False) is not None
+    assert renderer._acquire_slot(wait=False) is not None
+
+
+def test_pdf_renderer__render_many__in_order(tmp_path, monkeypatch):
+    renderer = create_renderer(tmp_path, max_concurrent=3, max_batch_concurrent=3)
+
+    def html_to_pdf(html: str):
+        # Earlier documents take longer to render than the later ones
+        time.sleep(0.1 * (3 - int(html)))
+        return html.encode(), 0
+
+    monkeypatch.setattr(pdf_renderer, "_html_to_pdf", html_to_pdf)
+
+    assert list(renderer.render_many(["0", "1", "2"])) == [b"0", b"1", b"2"]
+
+
+def test_pdf_renderer__render_many__no_free_slot(tmp_path, occupy_slot):
+    renderer = create_renderer(tmp_path)
+
+    with pytest.raises(ServiceUnavailable):
+        list(renderer.render_many([HTML]))
+
+
+def test_render_template_to_html__logo_embedded():
+    html = render_template_to_html("components/base.jinja", {"title": "Hitas"})
+
+    assert 'src="data:image/png;base64,' in html
@@ -1,10 +1,11 @@
 import datetime
 
 import pytest
+from auditlog.diff import model_instance_diff
 from auditlog.models import LogEntry
 from django.contrib.contenttypes.models import ContentType
 
-from hitas.models import Owner, SurfaceAreaPriceCeilingCalculationData
+from hitas.models import Owner, PropertyManager, SurfaceAreaPriceCeilingCalculationData
 from hitas.models.utils import deobfuscate
 from hitas.tests.factories import OwnerFactory
 
@@ -152,6 +153,32 @@ def test_activity_log__bulk_create():
     assert activity_log[1].action == LogEntry.Action.CREATE
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize("ignore_conflicts", [False, True])
+def test_activity_log__bulk_create__changes(ignore_conflicts):
+    objs = PropertyManager.objects.bulk_create(
+        objs=[
+            PropertyManager(name="Isännöitsijä 1", email="foo@example.com"),
+            PropertyManager(name="Isännöitsijä 2", email="bar@example.com"),
+        ],
+        ignore_conflicts=ignore_conflicts,
+    )
+    property_managers: list[PropertyManager] = list(PropertyManager.objects.order_by("id"))
+    if not ignore_conflicts:
+        assert [obj.pk for obj in objs] == [obj.pk for obj in property_managers]
+
+    # Changes should be the same as when logging the objects one by one
+    activity_log: list[LogEntry] = list(LogEntry.objects.order_by("object_id"))
+    assert len(activity_log) == 2
+    for log_entry, property_manager in zip(activity_log, property_managers, strict=True):
+        assert log_entry.content_type == ContentType.objects.get_for_model(PropertyManager)
+        assert log_entry.object_id == property_manager.pk
+        assert log_entry.action == LogEntry.Action.CREATE
+        assert log_entry.changes == {
+            field: list(values) for field, values in model_instance_diff(None, property_manager).items()
+        }
+
+
 @pytest.mark.django_db
 def test_activity_log__bulk_update():
     activity_log: list[LogEntry] = list(LogEntry.objects.all())
@@ -191,6 +218,46 @@ def test_activity_log__qs_update():
     assert activity_log[1].action == LogEntry.Action.UPDATE
 
 
+@pytest.mark.django_db
+def test_activity_log__qs_update__masked():
+    owner: Owner = OwnerFactory.create(name="Testi Testinen", identifier="123456-789A")
+
+    Owner.objects.filter(pk=owner.pk).update(name="Testi Testinen 2", identifier=None)
+
+    activity_log: list[LogEntry] = list(LogEntry.objects.filter(action=LogEntry.Action.UPDATE).all())
+    assert len(activity_log) == 1
+    assert activity_log[0].changes == {
+        "name": ["*" * len("Testi Testinen"), "*" * len("Testi Testinen 2")],
+        "identifier": ["*" * len("123456-789A"), "None"],
+    }
+
+
+@pytest.mark.django_db
+def test_activity_log__bulk_create__masked():
+    Owner.objects.bulk_create(objs=[Owner(name="Testi Testinen", identifier="123456-789A")])
+
+    activity_log: list[LogEntry] = list(LogEntry.objects.all())
+    assert len(activity_log) == 1
+    assert activity_log[0].changes["name"] == ["None", "*" * len("Testi Testinen")]
+    assert activity_log[0].changes["identifier"] == ["None", "*" * len("123456-789A")]
+    assert activity_log[0].changes["email"] == ["None", "None"]
+
+
+@pytest.mark.django_db
+def test_activity_log__qs_update__chunked(monkeypatch):
+    monkeypatch.setattr("hitas.models._base.AUDIT_LOG_CHUNK_SIZE", 2)
+
+    owners: list[Owner] = OwnerFactory.create_batch(5, bypass_conditions_of_sale=False)
+
+    updated = Owner.objects.filter(pk__in=[owner.pk for owner in owners]).update(bypass_conditions_of_sale=True)
+    assert updated == 5
+
+    activity_log: list[LogEntry] = list(LogEntry.objects.filter(action=LogEntry.Action.UPDATE).order_by("object_id"))
+    assert [log_entry.object_id for log_entry in activity_log] == sorted(owner.pk for owner in owners)
+    for log_entry in activity_log:
+        assert log_entry.changes == {"bypass_conditions_of_sale": ["False", "True"]}
+
+
 @pytest.mark.django_db
 def test_activity_log__qs_soft_delete():
     activity_log: list[LogEntry] = list(LogEntry.objects.all())
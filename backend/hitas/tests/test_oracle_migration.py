@@ -0,0 +1,182 @@
+import pytest
+
+from hitas.models import Apartment, Building, HousingCompany, MigrationDone, Owner, RealEstate
+from hitas.tests.factories import ApartmentFactory
+
+# The Oracle migration dependencies are in an optional dependency group
+pytest.importorskip("sqlalchemy")
+
+from hitas.oracle_migration import runner
+from hitas.oracle_migration.checkpoint import CheckpointError, MigrationCheckpoint
+from hitas.oracle_migration.local_database import LocalDatabaseSize, create_local_database
+
+LOCAL_DATABASE_SIZE = LocalDatabaseSize(housing_companies=4, apartments_per_housing_company=3, property_managers=2)
+
+
+@pytest.fixture
+def oracle_url(tmp_path) -> str:
+    url = f"sqlite:///{tmp_path / 'oracle.sqlite'}"
+    create_local_database(url, LOCAL_DATABASE_SIZE)
+    return url
+
+
+CHECKPOINT_OPTIONS = {"anonymize": True, "minimal_dataset": False, "regulated_only": False}
+
+
+def run_migration(oracle_url: str, checkpoint_path: str, **options) -> None:
+    runner.run(
+        oracle_host="",
+        oracle_port="",
+        oracle_user="",
+        oracle_pw="",
+        debug=False,
+        anonymize=True,
+        truncate=False,
+        truncate_only=False,
+        minimal_dataset=False,
+        regulated_only=False,
+        checkpoint_path=checkpoint_path,
+        oracle_url=oracle_url,
+        **options,
+    )
+
+
+@pytest.mark.django_db
+def test__oracle_migration__local_database(oracle_url, tmp_path):
+    checkpoint_path = tmp_path / "hitasmigrate.checkpoint"
+
+    run_migration(oracle_url, str(checkpoint_path))
+
+    assert HousingCompany.objects.count() == LOCAL_DATABASE_SIZE.housing_companies
+    assert RealEstate.objects.count() == LOCAL_DATABASE_SIZE.housing_companies
+    assert Apartment.objects.count() == (
+        LOCAL_DATABASE_SIZE.housing_companies * LOCAL_DATABASE_SIZE.apartments_per_housing_company
+    )
+    assert Owner.objects.exists()
+    assert MigrationDone.objects.exists()
+    # Checkpoint is removed after a successful migration
+    assert not checkpoint_path.exists()
+
+
+# Worker processes use their own database connections, so the data must be committed
+@pytest.mark.django_db(transaction=True)
+def test__oracle_migration__workers(oracle_url, tmp_path):
+    run_migration(oracle_url, str(tmp_path / "hitasmigrate.checkpoint"), workers=2)
+
+    # Housing company contents are created in the worker processes
+    for housing_company in HousingCompany.objects.all():
+        assert housing_company.real_estates.count() == 1
+        assert (
+            Apartment.objects.filter(building__real_estate__housing_company=housing_company).count()
+            == LOCAL_DATABASE_SIZE.apartments_per_housing_company
+        )
+    # Owners and sales are created for the apartments returned from the workers
+    assert Apartment.objects.filter(sales__ownerships__isnull=False).exists()
+    assert MigrationDone.objects.exists()
+
+
+@pytest.mark.django_db
+def test__oracle_migration__resume(oracle_url, tmp_path, monkeypatch):
+    checkpoint_path = tmp_path / "hitasmigrate.checkpoint"
+
+    def fail(connection, converted_data):
+        raise RuntimeError("Migration failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(runner, "create_apartment_sales", fail)
+        with pytest.raises(RuntimeError):
+            run_migration(oracle_url, str(checkpoint_path))
+
+    checkpoint = MigrationCheckpoint.resume(checkpoint_path, CHECKPOINT_OPTIONS)
+    assert checkpoint.completed_steps[-1] == "owners_and_ownerships"
+    assert not MigrationDone.objects.exists()
+
+    run_migration(oracle_url, str(checkpoint_path), resume=True)
+
+    # Completed steps are not run again
+    assert HousingCompany.objects.count() == LOCAL_DATABASE_SIZE.housing_companies
+    assert Apartment.objects.count() == (
+        LOCAL_DATABASE_SIZE.housing_companies * LOCAL_DATABASE_SIZE.apartments_per_housing_company
+    )
+    assert Apartment.objects.filter(sales__isnull=False).exists()
+    assert MigrationDone.objects.exists()
+    assert not checkpoint_path.exists()
+
+
+def test__oracle_migration__checkpoint(tmp_path):
+    checkpoint_path = tmp_path / "hitasmigrate.checkpoint"
+    checkpoint = MigrationCheckpoint.start(checkpoint_path, CHECKPOINT_OPTIONS)
+
+    checkpoint.complete("users", {"users_by_username": {"test": 1}})
+    checkpoint.complete("codebooks", {"users_by_username": {"test": 2}})
+
+    resumed = MigrationCheckpoint.resume(checkpoint_path, CHECKPOINT_OPTIONS)
+    assert resumed.completed_steps == ["users", "codebooks"]
+    assert resumed.converted_data == {"users_by_username": {"test": 2}}
+    assert resumed.is_completed("codebooks")
+    assert not resumed.is_completed("indices")
+
+
+def test__oracle_migration__checkpoint__not_found(tmp_path):
+    with pytest.raises(CheckpointError, match="not found"):
+        MigrationCheckpoint.resume(tmp_path / "hitasmigrate.checkpoint", CHECKPOINT_OPTIONS)
+
+
+def test__oracle_migration__checkpoint__different_options(tmp_path):
+    checkpoint_path = tmp_path / "hitasmigrate.checkpoint"
+    MigrationCheckpoint.start(checkpoint_path, CHECKPOINT_OPTIONS).complete("users", None)
+
+    with pytest.raises(CheckpointError, match="different options"):
+        MigrationCheckpoint.resume(checkpoint_path, {**CHECKPOINT_OPTIONS, "anonymize": False})
+
+
+def test__oracle_migration__checkpoint__invalid_signature(tmp_path):
+    checkpoint_path = tmp_path / "hitasmigrate.checkpoint"
+    MigrationCheckpoint.start(checkpoint_path, CHECKPOINT_OPTIONS).complete("users", None)
+    content = checkpoint_path.read_bytes()
+    checkpoint_path.write_bytes(content[:-1] + bytes([content[-1] ^ 1]))
+
+    with pytest.raises(CheckpointError, match="invalid signature"):
+        MigrationCheckpoint.resume(checkpoint_path, CHECKPOINT_OPTIONS)
+
+
+@pytest.mark.django_db
+def test__oracle_migration__delete_housing_company_contents():
+    apartment: Apartment = ApartmentFactory.create()
+    housing_company = apartment.housing_company
+    other_apartment: Apartment = ApartmentFactory.create()
+
+    converted_data = runner.ConvertedData(
+        created_housing_companies_by_oracle_id={1: runner.CreatedHousingCompany(value=housing_company)},
+    )
+    runner.delete_housing_company_contents(converted_data)
+
+    # Housing company itself is kept, since it was created in an earlier step
+    assert HousingCompany.objects.filter(pk=housing_company.pk).exists()
+    assert not RealEstate.objects.all_with_deleted().filter(housing_company=housing_company).exists()
+    assert not Building.objects.all_with_deleted().filter(real_estate__housing_company=housing_company).exists()
+    assert not Apartment.objects.all_with_deleted().filter(pk=apartment.pk).exists()
+    assert Apartment.objects.filter(pk=other_apartment.pk).exists()
+
+
+@pytest.mark.parametrize("atomic", [False, True])
+@pytest.mark.django_db
+def test__oracle_migration__run_migration_steps__cleanup_on_resume(tmp_path, atomic):
+    checkpoint = MigrationCheckpoint.start(tmp_path / "hitasmigrate.checkpoint", CHECKPOINT_OPTIONS)
+    checkpoint.complete("first", None)
+    calls = []
+    steps = [
+        runner.MigrationStep("first", lambda: calls.append("first")),
+        # Failed run might have been parallel, even if the resumed one is atomic
+        runner.MigrationStep(
+            "second",
+            lambda: calls.append("second"),
+            atomic=atomic,
+            cleanup=lambda: calls.append("cleanup"),
+        ),
+    ]
+
+    runner.run_migration_steps(steps, checkpoint, None, resume=True)
+
+    assert calls == ["cleanup", "second"]
+    assert checkpoint.completed_steps == ["first", "second"]
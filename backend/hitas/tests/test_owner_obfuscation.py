@@ -2,8 +2,8 @@
 
 import pytest
 
-from hitas.models import Owner
-from hitas.tests.factories import OwnerFactory
+from hitas.models import NonObfuscatedOwner, Owner, Ownership
+from hitas.tests.factories import OwnerFactory, OwnershipFactory
 
 
 @pytest.mark.django_db
@@ -195,3 +195,50 @@ def test_owner_obfuscation__values_list_flat__pk():
     )
 
     assert len(Owner.objects.all()) == 2
+
+
+@pytest.mark.django_db
+def test_owner_obfuscation__obfuscated_values():
+    OwnerFactory.create(name="Testi Testinen", identifier="123456-789A", email="testi@example.com", non_disclosure=True)
+    OwnerFactory.create(name="Matti Meikäläinen", identifier="010101-123N", email=None, non_disclosure=False)
+
+    # 'non_disclosure' is not needed, since the values are obfuscated in the database
+    owners = list(Owner.objects.order_by("id").obfuscated_values("name", "identifier", "email"))
+
+    assert owners == [
+        {"name": "", "identifier": None, "email": None},
+        {"name": "Matti Meikäläinen", "identifier": "010101-123N", "email": None},
+    ]
+
+
+@pytest.mark.django_db
+def test_owner_obfuscation__obfuscated_values_list():
+    OwnerFactory.create(name="Testi Testinen", identifier="123456-789A", non_disclosure=True)
+    OwnerFactory.create(name="Matti Meikäläinen", identifier="010101-123N", non_disclosure=False)
+
+    queryset = Owner.objects.order_by("id")
+    assert list(queryset.obfuscated_values_list("name", "identifier")) == [
+        ("", None),
+        ("Matti Meikäläinen", "010101-123N"),
+    ]
+    assert list(queryset.obfuscated_values_list("name", flat=True)) == ["", "Matti Meikäläinen"]
+    assert list(queryset.obfuscated_values_list("name", flat=True).iterator()) == ["", "Matti Meikäläinen"]
+
+    # Filtering uses the actual values
+    assert list(queryset.filter(name="Testi Testinen").obfuscated_values_list("name", flat=True)) == [""]
+
+
+@pytest.mark.django_db
+def test_owner_obfuscation__obfuscated_values__related():
+    ownership = OwnershipFactory.create(owner__name="Testi Testinen", owner__non_disclosure=True)
+
+    values = Ownership.objects.filter(id=ownership.id).obfuscated_values("owner__name", "percentage").get()
+
+    assert values == {"owner__name": "", "percentage": ownership.percentage}
+
+
+@pytest.mark.django_db
+def test_owner_obfuscation__obfuscated_values__non_obfuscated_owner():
+    OwnerFactory.create(name="Testi Testinen", non_disclosure=True)
+
+    assert list(NonObfuscatedOwner.objects.obfuscated_values_list("name", flat=True)) == ["Testi Testinen"]
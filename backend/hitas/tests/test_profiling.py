@@ -0,0 +1,72 @@
+import pstats
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from hitas.profiling import PROFILE_FILE_HEADER, RequestProfilerMiddleware
+from hitas.tests.factories import UserFactory
+
+
+def _view(request):
+    return HttpResponse("ok")
+
+
+@pytest.mark.django_db
+def test__request_profiler__not_requested():
+    request = RequestFactory().get("/api/v1/housing-companies")
+    request.user = UserFactory.create(is_staff=True)
+
+    response = RequestProfilerMiddleware(_view)(request)
+
+    assert response.content == b"ok"
+    assert PROFILE_FILE_HEADER not in response
+
+
+@pytest.mark.django_db
+def test__request_profiler__anonymous_user():
+    request = RequestFactory().get("/api/v1/housing-companies", HTTP_X_HITAS_PROFILE="1")
+    request.user = AnonymousUser()
+
+    response = RequestProfilerMiddleware(_view)(request)
+
+    assert response.content == b"ok"
+    assert PROFILE_FILE_HEADER not in response
+
+
+@pytest.mark.django_db
+def test__request_profiler__non_staff_user():
+    request = RequestFactory().get("/api/v1/housing-companies", HTTP_X_HITAS_PROFILE="1")
+    request.user = UserFactory.create(is_staff=False)
+
+    response = RequestProfilerMiddleware(_view)(request)
+
+    assert response.content == b"ok"
+    assert PROFILE_FILE_HEADER not in response
+
+
+@pytest.mark.django_db
+def test__request_profiler__save_to_directory(settings, tmp_path):
+    settings.REQUEST_PROFILING_DIR = tmp_path
+    request = RequestFactory().get("/api/v1/housing-companies", HTTP_X_HITAS_PROFILE="1")
+    request.user = UserFactory.create(is_staff=True)
+
+    response = RequestProfilerMiddleware(_view)(request)
+
+    assert response.content == b"ok"
+    assert response[PROFILE_FILE_HEADER].endswith("-GET-api-v1-housing-companies.prof")
+    assert (tmp_path / response[PROFILE_FILE_HEADER]).exists()
+
+
+@pytest.mark.django_db
+def test__request_profiler__download(tmp_path):
+    request = RequestFactory().get("/api/v1/housing-companies", {"_profile": "download"})
+    request.user = UserFactory.create(is_staff=True)
+
+    response = RequestProfilerMiddleware(_view)(request)
+
+    assert response["Content-Disposition"].startswith("attachment; filename=")
+    path = tmp_path / "download.prof"
+    path.write_bytes(response.content)
+    assert pstats.Stats(str(path)).total_calls > 0
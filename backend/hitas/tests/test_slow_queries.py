@@ -0,0 +1,65 @@
+import logging
+
+import pytest
+from django.db import connection
+
+from hitas.models import HousingCompany
+from hitas.slow_queries import SlowQueryExplainWrapper
+from hitas.tests.factories import HousingCompanyFactory
+
+
+@pytest.mark.django_db
+def test__slow_queries__explain_logged(caplog):
+    HousingCompanyFactory.create()
+
+    with caplog.at_level(logging.WARNING, logger="hitas.slow_queries"):
+        with connection.execute_wrapper(SlowQueryExplainWrapper(threshold_ms=0, max_per_minute=10)):
+            housing_companies = list(HousingCompany.objects.all())
+
+    assert len(housing_companies) == 1
+    records = [record for record in caplog.records if record.name == "hitas.slow_queries"]
+    assert len(records) == 1
+    assert "Seq Scan" in records[0].plan or "Index Scan" in records[0].plan
+    assert records[0].view is None
+
+
+@pytest.mark.django_db
+def test__slow_queries__rate_limited(caplog):
+    HousingCompanyFactory.create()
+
+    with caplog.at_level(logging.WARNING, logger="hitas.slow_queries"):
+        with connection.execute_wrapper(SlowQueryExplainWrapper(threshold_ms=0, max_per_minute=1)):
+            list(HousingCompany.objects.all())
+            list(HousingCompany.objects.all())
+
+    records = [record for record in caplog.records if record.name == "hitas.slow_queries"]
+    assert len(records) == 1
+
+
+@pytest.mark.django_db
+def test__slow_queries__writes_not_explained(caplog):
+    HousingCompanyFactory.create()
+
+    with caplog.at_level(logging.WARNING, logger="hitas.slow_queries"):
+        with connection.execute_wrapper(SlowQueryExplainWrapper(threshold_ms=0, max_per_minute=10)):
+            with connection.cursor() as cursor:
+                cursor.execute("UPDATE hitas_housingcompany SET id = id")
+
+    records = [record for record in caplog.records if record.name == "hitas.slow_queries"]
+    assert records == []
+
+
+@pytest.mark.django_db
+def test__slow_queries__data_modifying_cte_not_explained(caplog):
+    HousingCompanyFactory.create()
+
+    with caplog.at_level(logging.WARNING, logger="hitas.slow_queries"):
+        with connection.execute_wrapper(SlowQueryExplainWrapper(threshold_ms=0, max_per_minute=10)):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "WITH updated AS (UPDATE hitas_housingcompany SET id = id RETURNING id) "
+                    "SELECT count(*) FROM updated"
+                )
+
+    records = [record for record in caplog.records if record.name == "hitas.slow_queries"]
+    assert records == []
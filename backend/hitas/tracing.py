@@ -0,0 +1,45 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import sentry_sdk
+from sentry_sdk.tracing import Span
+
+logger = logging.getLogger(__name__)
+
+
+class TracedPhase:
+    def __init__(self, name: str, span: Span) -> None:
+        self.name = name
+        self.span = span
+        self.data: dict[str, Any] = {}
+
+    def set_data(self, key: str, value: Any) -> None:
+        """Attach e.g. row counts to the phase."""
+        self.span.set_data(key, value)
+        self.data[key] = value
+
+
+@contextmanager
+def trace_phase(name: str, **data: Any) -> Iterator[TracedPhase]:
+    """
+    Time a phase of a longer calculation.
+
+    The phase is recorded as a Sentry span under the current transaction (if tracing is enabled),
+    and its duration and data are logged, so that the slow phases can be found even without Sentry.
+    """
+    with sentry_sdk.start_span(op="hitas.phase", name=name) as span:
+        phase = TracedPhase(name, span)
+        for key, value in data.items():
+            phase.set_data(key, value)
+
+        start = time.monotonic()
+        try:
+            yield phase
+        finally:
+            duration_ms = round((time.monotonic() - start) * 1000, 2)
+            logger.info(
+                f"Phase {name!r} took {duration_ms} ms",
+                extra={"phase": name, "duration_ms": duration_ms, **phase.data},
+            )
@@ -8,7 +8,7 @@
 
 from dateutil.relativedelta import relativedelta
 from django.db import models
-from django.db.models import Case, Count, F, Max, Model, OuterRef, Q, Subquery, When
+from django.db.models import Case, Count, F, Func, Max, Model, OuterRef, Q, Subquery, When
 from django.db.models.functions import NullIf
 from django.utils import timezone
 from openpyxl.cell import Cell
@@ -271,6 +271,16 @@ def __init__(self, queryset, output_field=None, *, sum_field="", **extra):
         super().__init__(queryset, output_field, **extra)
 
 
+class AddMonths(Func):
+    """Add the given number of months to a date, like 'date + relativedelta(months=months)'."""
+
+    template = "CAST(%(expressions)s + MAKE_INTERVAL(months => %(months)d) AS date)"
+    output_field = models.DateField()
+
+    def __init__(self, expression, months: int, **extra):
+        super().__init__(expression, months=months, **extra)
+
+
 def index_of(tup: tuple[Any, ...], value: Any) -> Optional[int]:
     """Get the index of a value in a tuple or None if item is not in the tuple."""
     try:
@@ -50,11 +50,14 @@
     get_first_sale_loan_amount,
     get_first_sale_purchase_date,
     get_first_sale_purchase_price,
+    get_has_grace_period,
     get_latest_sale_purchase_date,
     get_latest_sale_purchase_price,
+    get_sell_by_date,
     prefetch_latest_sale,
 )
 from hitas.services.condition_of_sale import condition_of_sale_queryset
+from hitas.services.pdf_artifacts import get_confirmed_max_price_calculation_pdf
 from hitas.services.validation import lookup_model_id_by_uuid
 from hitas.utils import (
     check_for_overlap,
@@ -866,14 +869,6 @@ def get_base_queryset():
                     "sales__ownerships",
                     Ownership.objects.select_related("owner"),
                 ),
-                Prefetch(
-                    "sales__ownerships__conditions_of_sale_new",
-                    condition_of_sale_queryset(),
-                ),
-                Prefetch(
-                    "sales__ownerships__conditions_of_sale_old",
-                    condition_of_sale_queryset(),
-                ),
             )
             .select_related(
                 "building",
@@ -900,6 +895,8 @@ def get_base_queryset():
                     default=False,
                     output_field=models.BooleanField(),
                 ),
+                _sell_by_date=get_sell_by_date("id"),
+                _has_grace_period=get_has_grace_period("id"),
             )
             .order_by("-has_conditions_of_sale", "apartment_number_integer", "id")
         )
@@ -925,12 +922,25 @@ def get_detail_queryset(self):
             self.request.query_params.get("calculation_date") or self.request.data.get("calculation_date")
         )
 
-        qs = self.get_list_queryset().annotate(
-            _first_sale_purchase_price=get_first_sale_purchase_price("id"),
-            _first_sale_share_of_housing_company_loans=get_first_sale_loan_amount("id"),
-            _first_purchase_date=get_first_sale_purchase_date("id"),
-            _latest_sale_purchase_price=get_latest_sale_purchase_price("id"),
-            _latest_purchase_date=get_latest_sale_purchase_date("id"),
+        qs = (
+            self.get_list_queryset()
+            # Conditions of sale are only needed for the detail view
+            .prefetch_related(
+                Prefetch(
+                    "sales__ownerships__conditions_of_sale_new",
+                    condition_of_sale_queryset(),
+                ),
+                Prefetch(
+                    "sales__ownerships__conditions_of_sale_old",
+                    condition_of_sale_queryset(),
+                ),
+            ).annotate(
+                _first_sale_purchase_price=get_first_sale_purchase_price("id"),
+                _first_sale_share_of_housing_company_loans=get_first_sale_loan_amount("id"),
+                _first_purchase_date=get_first_sale_purchase_date("id"),
+                _latest_sale_purchase_price=get_latest_sale_purchase_price("id"),
+                _latest_purchase_date=get_latest_sale_purchase_date("id"),
+            )
         )
         return annotate_apartment_unconfirmed_prices(
             apartment_uuid=self.kwargs["uuid"],
@@ -1025,12 +1035,11 @@ def download_latest_confirmed_prices(self, request, **kwargs) -> HttpResponse:
             f"Laskelma {mpc.apartment.housing_company.display_name}"
             f" {mpc.apartment.stair} {mpc.apartment.apartment_number}.pdf"
         )
-        context = {
-            "maximum_price_calculation": mpc,
-            "user": request.user,
-            "body_parts": body_parts,
-        }
-        pdf = get_pdf_response(filename=filename, template="confirmed_maximum_price.jinja", context=context)
+        pdf = HttpResponse(
+            get_confirmed_max_price_calculation_pdf(mpc, request.user, body_parts),
+            content_type="application/pdf",
+        )
+        pdf.headers["Content-Disposition"] = f"attachment; filename={filename}"
 
         JobPerformance.objects.get_or_create(
             user=request.user,
@@ -4,7 +4,7 @@
 from dateutil.relativedelta import relativedelta
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models import Prefetch
 from django.utils import timezone
 from rest_framework import serializers
 
@@ -154,22 +154,10 @@ def create(self, validated_data: dict[str, Any]) -> ApartmentSale:
 
         if apartment.housing_company.hitas_type != HitasType.HALF_HITAS and apartment.is_new:
             owners = [ownership.owner for ownership in ownerships]
-            prefetch_related_objects(
-                owners,
-                Prefetch(
-                    "ownerships",
-                    Ownership.objects.select_related("sale__apartment__building__real_estate__housing_company").exclude(
-                        sale__apartment__building__real_estate__housing_company__hitas_type=HitasType.HALF_HITAS,
-                    ),
-                ),
+            for owner in owners:
                 # Ignore the sale we just created so that apartments sold for the first time
                 # after they have been completed are treated as new at this moment.
-                prefetch_first_sale(lookup_prefix="ownerships__sale__apartment__", ignore=[instance.id]),
-                "ownerships__sale__apartment__sales__ownerships",
-                "ownerships__sale__apartment__sales__ownerships__conditions_of_sale_new",
-            )
-            for owner in owners:
-                cos = create_conditions_of_sale(owners=[owner])
+                cos = create_conditions_of_sale(owners=[owner], ignore_sales=[instance.id])
                 if cos:
                     self.context["conditions_of_sale_created"] = True
 
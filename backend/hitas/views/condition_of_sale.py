@@ -3,17 +3,14 @@
 from typing import Any, Optional
 
 from django.core.exceptions import ValidationError
-from django.db.models import Prefetch
 from enumfields.drf import EnumField, EnumSupportSerializerMixin
 from rest_framework import serializers
 from safedelete import HARD_DELETE
 
 from hitas.models.apartment import Apartment
 from hitas.models.condition_of_sale import ConditionOfSale, GracePeriod
-from hitas.models.housing_company import HitasType
 from hitas.models.owner import Owner
 from hitas.models.ownership import Ownership
-from hitas.services.apartment import prefetch_first_sale
 from hitas.services.condition_of_sale import condition_of_sale_queryset, create_conditions_of_sale
 from hitas.views.utils import ApartmentHitasAddressSerializer, HitasModelSerializer, HitasModelViewSet, UUIDField
 
@@ -95,21 +92,9 @@ def validate_household(self, value: list[uuid.UUID]) -> list[Owner]:
 
     @staticmethod
     def get_household(owner_uuids: list[uuid.UUID]) -> list[Owner]:
-        # Check that owners exists and prefetch required fields for creating
-        # conditions of sale between their ownerships
-        owners = list(
-            Owner.objects.prefetch_related(
-                Prefetch(
-                    "ownerships",
-                    Ownership.objects.select_related("sale__apartment__building__real_estate__housing_company").exclude(
-                        sale__apartment__building__real_estate__housing_company__hitas_type=HitasType.HALF_HITAS,
-                    ),
-                ),
-                prefetch_first_sale(lookup_prefix="ownerships__sale__apartment__"),
-                "ownerships__sale__apartment__sales__ownerships",
-                "ownerships__sale__apartment__sales__ownerships__conditions_of_sale_new",
-            ).filter(uuid__in=owner_uuids)
-        )
+        # Check that owners exists. Everything needed for creating conditions of sale
+        # between their ownerships is fetched when the conditions of sale are created.
+        owners = list(Owner.objects.filter(uuid__in=owner_uuids))
 
         if len(owners) != len(owner_uuids):
             found_uuids: set[str] = {owner.uuid.hex for owner in owners}
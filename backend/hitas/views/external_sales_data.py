@@ -2,7 +2,7 @@
 
 from dateutil.relativedelta import relativedelta
 from openpyxl.workbook import Workbook
-from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
 from rest_framework import serializers, status
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
@@ -93,7 +93,7 @@ class ExternalSalesDataView(ViewSet):
 
     def create(self, request, *args, **kwargs) -> Response:
         workbook: Workbook = request.data
-        worksheet: Worksheet = workbook.worksheets[0]
+        worksheet: ReadOnlyWorksheet = workbook.worksheets[0]
         sheet_data: CostAreaSalesCatalogData = parse_sheet(
             worksheet,
             row_data_key="areas",
@@ -2,8 +2,10 @@
 from typing import Any, Dict, Optional
 
 from dateutil.relativedelta import relativedelta
+from django.contrib.contenttypes.models import ContentType
 from django.db.models import F, Prefetch, Q, Sum
 from django.db.models.functions import Round
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django_filters.rest_framework import BooleanFilter
 from enumfields.drf.serializers import EnumSupportSerializerMixin
@@ -14,23 +16,31 @@
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
-from hitas.exceptions import ModelConflict
+from hitas.exceptions import HitasModelNotFound, ModelConflict, get_hitas_object_or_404
 from hitas.models import (
     Apartment,
+    ApartmentMaximumPriceCalculation,
     Building,
     HousingCompany,
     HousingCompanyConstructionPriceImprovement,
     HousingCompanyMarketPriceImprovement,
+    JobPerformance,
+    PDFBody,
     RealEstate,
 )
 from hitas.models.housing_company import HitasType, RegulationStatus
+from hitas.models.job_performance import JobPerformanceSource
+from hitas.models.pdf_body import PDFBodyName
 from hitas.models.utils import validate_business_id
 from hitas.services.apartment import get_first_sale_acquisition_price
-from hitas.services.audit_log import last_log
+from hitas.services.audit_log import last_modified_entry
 from hitas.services.condition_of_sale import fulfill_conditions_of_sales_for_housing_companies
 from hitas.services.housing_company import get_regulation_release_date
+from hitas.services.owner import obfuscate_owners_without_regulated_apartments
+from hitas.services.pdf_artifacts import get_confirmed_max_price_calculation_pdfs
 from hitas.services.validation import lookup_id_to_uuid
 from hitas.utils import max_date_if_all_not_null
+from hitas.views.apartment import ConfirmedPriceSerializer
 from hitas.views.codes import (
     ReadOnlyBuildingTypeSerializer,
     ReadOnlyDeveloperSerializer,
@@ -51,6 +61,7 @@
     ValueOrNullField,
 )
 from hitas.views.utils.merge import merge_model
+from hitas.views.utils.pdf import get_pdf_zip_response
 from hitas.views.utils.serializers import YearMonthSerializer
 
 
@@ -252,6 +263,8 @@ def update(self, instance: HousingCompany, validated_data: dict[str, Any]):
 
         if should_fulfill_conditions_of_sale:
             fulfill_conditions_of_sales_for_housing_companies([instance.id])
+            # Like in the regulation, owners might not have any regulated apartments left after the release
+            obfuscate_owners_without_regulated_apartments([instance.id])
 
         if mpi is not None:
             merge_model(
@@ -306,15 +319,15 @@ def get_summary(obj: HousingCompany) -> Dict[str, int]:
 
     @staticmethod
     def get_last_modified(obj: HousingCompany) -> Dict[str, Any]:
-        log = last_log(HousingCompany, model_id=obj.id)
-        actor = getattr(log, "actor", None)
+        entry = last_modified_entry(HousingCompany, model_id=obj.id)
+        actor = getattr(entry, "actor", None)
         return {
             "user": {
                 "username": getattr(actor, "username", None),
                 "first_name": getattr(actor, "first_name", None),
                 "last_name": getattr(actor, "last_name", None),
             },
-            "datetime": getattr(log, "timestamp", None),
+            "datetime": getattr(entry, "timestamp", None),
         }
 
     @staticmethod
@@ -502,6 +515,76 @@ def batch_complete_apartments(self, request, **kwargs) -> Response:
         }
         return Response(data=result, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=["POST"], url_path="reports/download-latest-confirmed-prices")
+    def download_latest_confirmed_prices(self, request, **kwargs) -> StreamingHttpResponse:
+        input_data = ConfirmedPriceSerializer(data=request.data)
+        input_data.is_valid(raise_exception=True)
+
+        housing_company_uuid = lookup_id_to_uuid(self.kwargs["uuid"], HousingCompany)
+        housing_company = get_hitas_object_or_404(HousingCompany, uuid=housing_company_uuid)
+
+        # Latest confirmed calculation for each apartment of the housing company
+        calculations: list[ApartmentMaximumPriceCalculation] = list(
+            ApartmentMaximumPriceCalculation.objects.filter(
+                apartment__building__real_estate__housing_company=housing_company,
+                apartment__deleted__isnull=True,
+                json_version=ApartmentMaximumPriceCalculation.CURRENT_JSON_VERSION,
+            )
+            .exclude(confirmed_at=None)
+            .select_related(
+                "apartment__building__real_estate__housing_company__postal_code",
+                "apartment__building__real_estate__housing_company__property_manager",
+            )
+            .order_by("apartment__stair", "apartment__apartment_number_integer", "apartment_id", "-confirmed_at")
+            .distinct("apartment__stair", "apartment__apartment_number_integer", "apartment_id")
+        )
+
+        if not calculations:
+            raise HitasModelNotFound(model=ApartmentMaximumPriceCalculation)
+
+        body_parts: Optional[list[str]] = (
+            PDFBody.objects.filter(name=PDFBodyName.CONFIRMED_MAX_PRICE_CALCULATION)
+            .values_list("texts", flat=True)
+            .first()
+        )
+        if body_parts is None:
+            raise ModelConflict("Missing body template", error_code="missing")
+
+        filenames = [
+            f"Laskelma {housing_company.display_name} {mpc.apartment.stair} {mpc.apartment.apartment_number}.pdf"
+            for mpc in calculations
+        ]
+        # Render all the documents before responding, so that a failure is returned as an error
+        # instead of a truncated ZIP, and job performances are recorded only for delivered documents
+        pdfs = list(get_confirmed_max_price_calculation_pdfs(calculations, request.user, body_parts))
+
+        # Like 'get_or_create' in the single apartment download, but for all the calculations at once
+        job_performance = {
+            "user": request.user,
+            "request_date": input_data.validated_data["request_date"],
+            "delivery_date": timezone.now().date(),
+            "source": JobPerformanceSource.CONFIRMED_MAX_PRICE,
+            "object_type": ContentType.objects.get_for_model(ApartmentMaximumPriceCalculation),
+        }
+        recorded = set(
+            JobPerformance.objects.filter(
+                **job_performance,
+                object_id__in=[calculation.id for calculation in calculations],
+            ).values_list("object_id", flat=True)
+        )
+        JobPerformance.objects.bulk_create(
+            [
+                JobPerformance(**job_performance, object_id=calculation.id)
+                for calculation in calculations
+                if calculation.id not in recorded
+            ]
+        )
+
+        return get_pdf_zip_response(
+            filename=f"Laskelmat {housing_company.display_name}.zip",
+            pdfs=list(zip(filenames, pdfs, strict=True)),
+        )
+
 
 class BatchCompleteApartmentsSerializer(serializers.Serializer):
     completion_date = serializers.DateField(allow_null=True)
@@ -3,7 +3,7 @@
 from typing import Optional, TypedDict, Union
 
 from openpyxl.workbook import Workbook
-from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
 from rest_framework import serializers, status
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
@@ -98,7 +98,7 @@ class SalesCatalogValidateView(ViewSet):
 
     def create(self, request, *args, **kwargs) -> Response:
         workbook: Workbook = request.data
-        worksheet: Worksheet = workbook.worksheets[0]
+        worksheet: ReadOnlyWorksheet = workbook.worksheets[0]
         data = parse_sheet(
             worksheet,
             row_data_key="apartments",
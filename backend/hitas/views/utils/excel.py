@@ -1,19 +1,20 @@
-from io import BytesIO
-from tempfile import NamedTemporaryFile
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
 from typing import Any, Literal, Optional, Protocol, TypeAlias
 
+from django.conf import settings
 from django.core.handlers.wsgi import WSGIRequest
 from django.http import HttpResponse
-from openpyxl.cell import Cell
 from openpyxl.reader.excel import load_workbook
 from openpyxl.utils import column_index_from_string
 from openpyxl.workbook import Workbook
-from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
 from rest_framework.exceptions import ErrorDetail, ValidationError
 from rest_framework.parsers import BaseParser
 from rest_framework.renderers import BaseRenderer
 from rest_framework.serializers import Serializer
 
+from hitas.exceptions import RequestEntityTooLarge
+
 
 def get_excel_response(filename: str, excel: Workbook) -> HttpResponse:
     with NamedTemporaryFile() as tmp:
@@ -58,8 +59,29 @@ def render(
         return data
 
 
+EXCEL_UPLOAD_CHUNK_SIZE: int = 64 * 1024
+
+
 def parse_excel_from_bytes(request: WSGIRequest) -> Workbook:
-    return load_workbook(filename=BytesIO(request.read()), data_only=True)
+    """
+    Open the uploaded Excel file in read-only mode, so that the sheets are read row by row when iterated.
+
+    The upload is spooled to a temporary file instead of kept in memory if it's large,
+    and uploads larger than 'EXCEL_UPLOAD_MAX_SIZE' are rejected.
+    """
+    file = SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+    size = 0
+    while chunk := request.read(EXCEL_UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > settings.EXCEL_UPLOAD_MAX_SIZE:
+            file.close()
+            raise RequestEntityTooLarge(
+                f"Excel file is too large. Maximum size is {settings.EXCEL_UPLOAD_MAX_SIZE} bytes.",
+            )
+        file.write(chunk)
+
+    file.seek(0)
+    return load_workbook(filename=file, read_only=True, data_only=True)
 
 
 # fmt: off
@@ -86,7 +108,7 @@ def __call__(self, row_data: list[dict[str, Any]], row_format: RowFormat, errors
 
 
 def parse_sheet(  # NOSONAR
-    worksheet: Worksheet,
+    worksheet: ReadOnlyWorksheet,
     *,
     row_data_key: str,
     row_format: RowFormat,
@@ -97,6 +119,8 @@ def parse_sheet(  # NOSONAR
 ) -> dict[str, Any]:
     """Parse an Excel sheet using json instructions.
 
+    The sheet is read one row at a time, and the errors are collected as the rows are read.
+
     :param worksheet: Worksheet to parse.
     :param row_format: Mapping of field name to column letter for row data.
     :param row_serializer: Serializer for data rows.
@@ -128,30 +152,33 @@ def parse_sheet(  # NOSONAR
     row_data: list[dict[str, Any]] = []
     extra_data: dict[str, Any] = {}
 
-    cells: tuple[Cell, ...]
-    for cells in worksheet.iter_rows():
-        row_number: RowNumber = str(cells[0].row)  # type: ignore
+    values: tuple[Any, ...]
+    for row, values in enumerate(worksheet.iter_rows(values_only=True), start=1):
+        row_number: RowNumber = str(row)  # type: ignore
 
         rules = extra_format.get(row_number)
         if rules is not None:
             for key, column in rules.items():
                 try:
-                    extra_data[key] = cells[column_index_from_string(column) - 1].value
+                    extra_data[key] = values[column_index_from_string(column) - 1]
                 except IndexError:
                     errors[f"{field_name_to_cell[key]}.{key}"] = [MISSING_DATA_ERROR]
             continue
 
-        final_row = all(cells[i].value is None for i in range(len(cells)) if i not in non_empty_columns)
+        final_row = all(values[i] is None for i in range(len(values)) if i not in non_empty_columns)
         if final_row:
             for key, column in extra_format.get("final", {}).items():
                 field_name_to_cell[key] += row_number  # add row number for error formatting
                 try:
-                    extra_data[key] = cells[column_index_from_string(column) - 1].value
+                    extra_data[key] = values[column_index_from_string(column) - 1]
                 except IndexError:
                     errors[f"{field_name_to_cell[key]}.{key}"] = [MISSING_DATA_ERROR]
             break
 
-        row_data.append(_parse_row(cells, row_format, row_serializer, errors))
+        row_data.append(_parse_row(values, row, row_format, row_serializer, errors))
+
+    # Rest of the sheet is not needed, so the uploaded file can be released
+    worksheet.parent.close()
 
     # Row post validation
     for validator in row_post_validators:
@@ -178,17 +205,18 @@ def parse_sheet(  # NOSONAR
 
 
 def _parse_row(
-    cells: tuple[Cell, ...],
+    values: tuple[Any, ...],
+    row_number: int,
     row_format: RowFormat,
     row_serializer: type[Serializer],
     errors: ErrorData,
 ) -> dict[str, Any]:
     row_data: dict[str, Any] = {}
-    row_data["row"] = row_number = cells[0].row  # add row number for post validators
+    row_data["row"] = row_number  # add row number for post validators
 
     for field_name, column in row_format.items():
         try:
-            row_data[field_name] = cells[column_index_from_string(column) - 1].value
+            row_data[field_name] = values[column_index_from_string(column) - 1]
         except IndexError:
             errors[error_key(field_name, row_number, row_format)] = [MISSING_DATA_ERROR]
             continue
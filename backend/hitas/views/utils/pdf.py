@@ -1,30 +1,17 @@
+import zipfile
 from datetime import datetime
-from io import BytesIO
-from typing import Any
+from typing import Any, Iterable, Iterator
 
-from django.conf import settings
-from django.http import HttpResponse
-from django.template.loader import get_template
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
-from rest_framework import exceptions
-from xhtml2pdf import pisa
+
+from hitas.services.pdf_renderer import get_pdf_renderer, render_template_to_html
 
 
 def render_to_pdf(template: str, context: dict[str, Any]) -> bytes:
     """Render given template to a pdf"""
-    result = BytesIO()
-    template = get_template(template).render(
-        {
-            **context,
-            # Due to the limitations of the xhtml2pdf library a file system path
-            # is required instead of a Django static files url.
-            "logo_path": settings.BASE_DIR / "hitas/static/helsinki_kehystunnus_musta.png",
-        },
-    )
-    pdf = pisa.pisaDocument(BytesIO(template.encode("UTF-8")), dest=result)
-    if pdf.err:
-        raise exceptions.APIException(pdf.err)
-    return result.getvalue()
+    html = render_template_to_html(template, context)
+    return get_pdf_renderer().render(html)
 
 
 def get_pdf_response(filename: str, template: str, context: dict[str, Any]) -> HttpResponse:
@@ -39,3 +26,48 @@ def get_pdf_response(filename: str, template: str, context: dict[str, Any]) -> H
     response = HttpResponse(pdf, content_type="application/pdf")
     response.headers["Content-Disposition"] = f"attachment; filename={filename}"
     return response
+
+
+def get_pdf_zip_response(filename: str, pdfs: list[tuple[str, bytes]]) -> StreamingHttpResponse:
+    """
+    Stream the given PDF documents to the client as a ZIP file, one document at a time,
+    so that the whole ZIP file is never in memory at once.
+    """
+    response = StreamingHttpResponse(_stream_zip(pdfs), content_type="application/zip")
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+
+class _ZipStream:
+    """Writable file object for 'zipfile', which hands out the written bytes in chunks."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _stream_zip(pdfs: Iterable[tuple[str, bytes]]) -> Iterator[bytes]:
+    stream = _ZipStream()
+    # PDF documents are already compressed
+    with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_STORED) as zip_file:
+        for name, pdf in pdfs:
+            zip_file.writestr(name, pdf)
+            yield stream.pop()
+
+    yield stream.pop()